@@ -65,7 +65,11 @@ class Flavor_Pairing_Graph_Adapter {
 	}
 
 	/**
-	 * Stubbed query runner.
+	 * Query runner.
+	 *
+	 * With the `local` vendor the query is answered by the Python pairing
+	 * service (`scripts/pairing_service.py`) at the configured endpoint, using
+	 * the `name` and optional `limit` parameters. Other vendors are not wired up yet.
 	 *
 	 * @param string $query Query string.
 	 * @param array  $params Optional parameters.
@@ -73,12 +77,46 @@ class Flavor_Pairing_Graph_Adapter {
 	 * @return array
 	 */
 	public function run_query( $query, $params = array() ) {
-		// @todo Replace with vendor-specific client implementation.
-		return array(
+		$result = array(
 			'query'  => $query,
 			'params' => $params,
 			'data'   => array(),
 		);
+
+		if ( 'local' !== $this->settings['vendor'] || empty( $this->settings['endpoint'] ) || empty( $params['name'] ) ) {
+			// @todo Replace with vendor-specific client implementation.
+			return $result;
+		}
+
+		$url = add_query_arg(
+			'limit',
+			isset( $params['limit'] ) ? absint( $params['limit'] ) : 10,
+			trailingslashit( $this->settings['endpoint'] ) . 'pairings/' . rawurlencode( sanitize_title( $params['name'] ) )
+		);
+
+		$headers = array( 'Accept' => 'application/json' );
+		if ( ! empty( $this->settings['token'] ) ) {
+			$headers['Authorization'] = 'Bearer ' . $this->settings['token'];
+		}
+
+		$response = wp_remote_get(
+			$url,
+			array(
+				'timeout' => 2,
+				'headers' => $headers,
+			)
+		);
+
+		if ( is_wp_error( $response ) || 200 !== wp_remote_retrieve_response_code( $response ) ) {
+			return $result;
+		}
+
+		$body = json_decode( wp_remote_retrieve_body( $response ), true );
+		if ( is_array( $body ) && isset( $body['data'] ) && is_array( $body['data'] ) ) {
+			$result['data'] = $body['data'];
+		}
+
+		return $result;
 	}
 
 	/**
@@ -0,0 +1,229 @@
+"""Inverted index over the books' Flavor Affinities sets.
+
+Usage:
+    python scripts/affinity_index.py avocado lime
+    python scripts/affinity_index.py basil garlic tomatoes --complete
+    python scripts/affinity_index.py --benchmark
+
+Each distinct affinity set (e.g. ``anchovies + lemon + olive oil + rosemary``)
+gets an integer id; sets listed more than once, or in both books, are merged
+and keep a count plus a source bitmask. Every ingredient maps to a Python
+integer used as a bitset over set ids, so "sets containing all of these" is a
+chain of ``&`` operations. Pairwise edges implied by the sets are generated on
+demand instead of being stored.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import time
+from itertools import combinations
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+
+from build_canonical_registry import SOURCE_FILES
+from canonical_names import canonicalize_name
+from flavor_graph import SOURCE_BITS, source_names
+
+
+class AffinitySet(NamedTuple):
+    items: Tuple[str, ...]
+    occurrences: int
+    mask: int
+
+    @property
+    def sources(self) -> List[str]:
+        return source_names(self.mask)
+
+
+class Completion(NamedTuple):
+    ingredient: str
+    support: int
+    sets: int
+
+
+def iter_bits(bits: int) -> Iterator[int]:
+    while bits:
+        low = bits & -bits
+        yield low.bit_length() - 1
+        bits ^= low
+
+
+class AffinityIndex:
+    def __init__(self) -> None:
+        self.sets: List[Tuple[int, ...]] = []
+        self.occurrences: List[int] = []
+        self.masks: List[int] = []
+        self.names: List[str] = []
+        self.ids: Dict[str, int] = {}
+        self.postings: List[int] = []
+        self._set_ids: Dict[Tuple[int, ...], int] = {}
+
+    @classmethod
+    def load(cls, book_files: Sequence[Tuple[str, Path]] = tuple(SOURCE_FILES)) -> "AffinityIndex":
+        index = cls()
+        for source, path in book_files:
+            if path.exists():
+                index.add_records(json.loads(path.read_text(encoding="utf-8")), source)
+        return index
+
+    def _node(self, name: str) -> int:
+        node_id = self.ids.get(name)
+        if node_id is None:
+            node_id = len(self.names)
+            self.ids[name] = node_id
+            self.names.append(name)
+            self.postings.append(0)
+        return node_id
+
+    def add_set(self, items: Iterable[str], source: str) -> Optional[int]:
+        members = tuple(dict.fromkeys(self._node(item) for item in items if item))
+        if len(members) < 2:
+            return None
+        key = tuple(sorted(members))
+        set_id = self._set_ids.get(key)
+        if set_id is None:
+            set_id = len(self.sets)
+            self._set_ids[key] = set_id
+            self.sets.append(members)
+            self.occurrences.append(0)
+            self.masks.append(0)
+            bit = 1 << set_id
+            for member in members:
+                self.postings[member] |= bit
+        self.occurrences[set_id] += 1
+        self.masks[set_id] |= SOURCE_BITS[source]
+        return set_id
+
+    def add_records(self, records: Iterable[Dict[str, object]], source: str) -> None:
+        for record in records:
+            for affinity in record.get("flavor_affinities") or []:
+                self.add_set(affinity.get("items") or [], source)
+
+    def __len__(self) -> int:
+        return len(self.sets)
+
+    def node_id(self, name: str) -> Optional[int]:
+        node_id = self.ids.get(name)
+        if node_id is None:
+            canonical, _ = canonicalize_name(name)
+            node_id = self.ids.get(canonical) if canonical else None
+        return node_id
+
+    def affinity_set(self, set_id: int) -> AffinitySet:
+        return AffinitySet(
+            tuple(self.names[member] for member in self.sets[set_id]),
+            self.occurrences[set_id],
+            self.masks[set_id],
+        )
+
+    def matching_bits(self, names: Sequence[str]) -> int:
+        """Bitset of the sets that contain every ingredient in ``names``."""
+        if not names:
+            return 0
+        bits = -1
+        for name in names:
+            node_id = self.node_id(name)
+            if node_id is None:
+                return 0
+            bits &= self.postings[node_id]
+            if not bits:
+                return 0
+        return bits
+
+    def containing(self, names: Sequence[str]) -> List[AffinitySet]:
+        return [self.affinity_set(set_id) for set_id in iter_bits(self.matching_bits(names))]
+
+    def count_containing(self, names: Sequence[str]) -> int:
+        return self.matching_bits(names).bit_count()
+
+    def complete(self, names: Sequence[str], limit: int = 10) -> List[Completion]:
+        """Best additions to ``names``: ingredients that share the most sets with all of them.
+
+        ``support`` counts every listing of a matching set (so a combination
+        printed under several headings, or in both books, counts more);
+        ``sets`` counts distinct sets.
+        """
+        given = {self.node_id(name) for name in names}
+        support: Dict[int, int] = {}
+        distinct: Dict[int, int] = {}
+        for set_id in iter_bits(self.matching_bits(names)):
+            weight = self.occurrences[set_id]
+            for member in self.sets[set_id]:
+                if member not in given:
+                    support[member] = support.get(member, 0) + weight
+                    distinct[member] = distinct.get(member, 0) + 1
+        ranked = sorted(support, key=lambda member: (-support[member], -distinct[member], self.names[member]))
+        return [Completion(self.names[member], support[member], distinct[member]) for member in ranked[:limit]]
+
+    def iter_pairs(self, names: Sequence[str] = ()) -> Iterator[Tuple[str, str, int]]:
+        """Yield ``(a, b, set_id)`` for each ingredient pair implied by a set.
+
+        Restricted to the sets containing ``names`` when given; nothing is
+        materialised, so callers can stop early or stream into an exporter.
+        """
+        bits = self.matching_bits(names) if names else (1 << len(self.sets)) - 1
+        for set_id in iter_bits(bits):
+            for left, right in combinations(self.sets[set_id], 2):
+                yield self.names[left], self.names[right], set_id
+
+    def co_occurrence(self, name: str, other: str) -> int:
+        """Number of distinct sets listing both ingredients."""
+        return self.count_containing([name, other])
+
+
+def run_benchmark(repeat: int) -> None:
+    started = time.perf_counter()
+    index = AffinityIndex.load()
+    elapsed = (time.perf_counter() - started) * 1000
+    print(f"Indexed {len(index)} affinity sets over {len(index.names)} ingredients in {elapsed:.1f} ms")
+
+    pairs = [(index.names[a], index.names[b]) for members in index.sets for a, b in combinations(members, 2)]
+    triples = [tuple(index.names[m] for m in members[:3]) for members in index.sets if len(members) >= 4]
+    stages = [
+        ("containing(pair)", pairs, index.containing),
+        ("co_occurrence", pairs, lambda pair: index.co_occurrence(*pair)),
+        ("complete(triple)", triples, index.complete),
+    ]
+    for label, items, query in stages:
+        best = float("inf")
+        for _ in range(repeat):
+            started = time.perf_counter()
+            for item in items:
+                query(list(item))
+            best = min(best, time.perf_counter() - started)
+        print(f"  {label:<20} {best / max(len(items), 1) * 1e6:10.2f} us/query ({len(items)} queries)")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Query Flavor Affinities sets across both books.")
+    parser.add_argument("ingredients", nargs="*", help="Ingredients that must all appear in a set")
+    parser.add_argument("--complete", action="store_true", help="Suggest the best next ingredient instead")
+    parser.add_argument("--limit", type=int, default=10)
+    parser.add_argument("--benchmark", action="store_true", help="Time queries over every indexed set")
+    parser.add_argument("--repeat", type=int, default=3, help="Benchmark passes (best one is reported)")
+    args = parser.parse_args()
+
+    if args.benchmark:
+        run_benchmark(max(args.repeat, 1))
+        return
+    if not args.ingredients:
+        parser.error("at least one ingredient is required unless --benchmark is given")
+
+    index = AffinityIndex.load()
+    missing = [name for name in args.ingredients if index.node_id(name) is None]
+    if missing:
+        print(f"[WARN] Not found in any affinity set: {', '.join(missing)}", file=sys.stderr)
+        sys.exit(1)
+    if args.complete:
+        for completion in index.complete(args.ingredients, args.limit):
+            print(f"{completion.ingredient}\t{completion.support}\t{completion.sets}")
+        return
+    for affinity in index.containing(args.ingredients)[: args.limit or None]:
+        print(f"{' + '.join(affinity.items)}\t{','.join(affinity.sources)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,309 @@
+"""Time the book ingestion pipeline on generated EPUB-shaped fixtures.
+
+Usage:
+    python scripts/benchmark_pipeline.py
+    python scripts/benchmark_pipeline.py --scales 1,10,100 --repeat 3
+    python scripts/benchmark_pipeline.py --compare build/benchmarks/pipeline-abc1234.json
+
+The extracted EPUB text is not in the repository, so the benchmark writes
+synthetic chapters in the markup each parser reads: *Flavor Bible*
+`FlavorBible_chap-3*.html` files (`<p class="h">` headings, `bl1` lines,
+`<strong>` tiers and `Label:` metadata) and vegetarian `chapter003*.xhtml` /
+`A-Z.xhtml` files (`recipe-title` headings, `headnote` labels, `ingredient`
+lines). Fixtures are seeded, so a scale always produces the same files.
+
+For each scale and book the stages are timed separately, best of
+``--repeat`` runs:
+    - iter_entries   splitting the chapter files into entries
+    - parse_entry    turning those entries into records
+    - canonicalize   `canonicalize_name` + `slugify` on every heading and pairing
+    - write_output   writing the dataset through `RecordWriter`
+    - registry       `build_registry` + `summarize_conflicts` over both books
+Results go to `build/benchmarks/pipeline-<commit>.json`; `--compare` prints the
+ratio against an earlier result file so regressions show up across commits.
+"""
+
+from __future__ import annotations
+
+import argparse
+import gc
+import json
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import parse_flavor_bible
+import parse_vegetarian_flavor_bible
+from build_canonical_registry import ROOT, build_registry, load_sources, summarize_conflicts
+from canonical_names import canonicalize_name, clear_cache, slugify
+from record_writer import RecordWriter
+
+OUTPUT_DIR = ROOT / "build" / "benchmarks"
+DEFAULT_SCALES = (1, 10, 100)
+ENTRIES_PER_FILE = 20
+FLAVOR_BIBLE_FILES = ("FlavorBible_chap-3a.html", "FlavorBible_chap-3b.html", "FlavorBible_chap-3c.html")
+VEGETARIAN_FILES = ("chapter003a.xhtml", "chapter003b.xhtml", "A-Z.xhtml")
+STAGES = ("iter_entries", "parse_entry", "canonicalize", "write_output", "registry")
+
+XHTML = (
+    '<?xml version="1.0" encoding="utf-8"?>\n'
+    '<html xmlns="http://www.w3.org/1999/xhtml"><head><title>{title}</title></head><body>\n{body}\n</body></html>\n'
+)
+HEADINGS = [
+    "basil", "lemon", "garlic", "ginger", "chiles", "olive oil", "thyme", "honey", "almonds", "scallions",
+    "mint", "yogurt", "cumin", "tomatoes", "fennel", "leeks", "walnuts", "sage", "miso", "quinoa",
+]
+PAIRINGS = [
+    "apple", "basil", "lemon juice", "garlic", "ginger", "chiles, jalapeño", "olive oil", "sea salt", "thyme",
+    "honey", "almonds", "vinegar, balsamic", "scallions", "mint", "yogurt", "cumin", "pepper, black",
+    "tomatoes", "crème fraîche", "parmesan cheese", "soy sauce", "cilantro", "maple syrup", "shallots",
+]
+
+
+def _pairing_line(rng: random.Random, tag: str) -> str:
+    word = rng.choice(PAIRINGS)
+    style = rng.randrange(4)
+    if style == 0:
+        return f"<p {tag}><strong>{word.upper()}*</strong></p>"
+    if style == 1:
+        return f"<p {tag}><strong>{word.upper()}</strong></p>"
+    if style == 2:
+        return f"<p {tag}><strong>{word}</strong>, e.g., <em>{rng.choice(PAIRINGS)}</em></p>"
+    return f"<p {tag}>{word} and {rng.choice(PAIRINGS)}</p>"
+
+
+def flavor_bible_chapter(entries: int, seed: int) -> str:
+    rng = random.Random(seed)
+    lines: List[str] = []
+    for index in range(entries):
+        name = f"{rng.choice(HEADINGS).upper()} {seed}-{index}"
+        if index % 5 == 0:
+            name += f" (see also {rng.choice(HEADINGS).upper()})"
+        lines.append(f'<p class="h">{name}</p>')
+        lines.append('<p class="bl1"><strong>Season:</strong> autumn–winter</p>')
+        lines.append('<p class="bl1"><strong>Taste:</strong> sweet, sour</p>')
+        lines.append('<p class="bl1"><strong>Techniques:</strong> braise, roast, sauté</p>')
+        lines.extend(_pairing_line(rng, 'class="bl1"') for _ in range(15))
+        lines.append('<p class="bl1"><strong>AVOID:</strong> ketchup, mayonnaise</p>')
+        lines.append('<p class="h2"><strong>Flavor Affinities</strong></p>')
+        lines.extend(
+            f'<p class="bl1">{" + ".join(rng.sample(PAIRINGS, 3))}</p>' for _ in range(3)
+        )
+    return XHTML.format(title="The Flavor Bible", body="\n".join(lines))
+
+
+def vegetarian_chapter(entries: int, seed: int) -> str:
+    rng = random.Random(seed)
+    lines: List[str] = []
+    for index in range(entries):
+        name = f"{rng.choice(HEADINGS).upper()} {seed}-{index}"
+        if index % 4 == 0:
+            name += f" (aka {rng.choice(HEADINGS).upper()})"
+        lines.append(f'<div class="recipe"><h1 class="recipe-title">{name}</h1>')
+        lines.append('<div class="headnote"><p><strong>Season:</strong> summer</p></div>')
+        lines.append('<div class="headnote"><p><strong>Flavor:</strong> sweet, with notes of <em>honey</em></p></div>')
+        lines.append('<div class="headnote"><p><strong>Possible substitutes:</strong> kale, chard</p></div>')
+        lines.append('<div class="headnote"><p><strong>Tips:</strong> Use sparingly.</p></div>')
+        lines.append('<div class="ingredients">')
+        lines.extend(_pairing_line(rng, 'class="ingredient"') for _ in range(15))
+        lines.append('</div><div class="ingredients"><h1 class="ingredients-title">Flavor Affinities</h1>')
+        lines.extend(
+            f'<p class="ingredient">{" + ".join(rng.sample(PAIRINGS, 3))}</p>' for _ in range(3)
+        )
+        lines.append("</div></div>")
+    return XHTML.format(title="The Vegetarian Flavor Bible", body="\n".join(lines))
+
+
+def write_fixtures(directory: Path, scale: int, entries_per_file: int = ENTRIES_PER_FILE) -> Dict[str, List[Path]]:
+    """Write both books' chapter files for ``scale`` and return their paths per book."""
+    entries = entries_per_file * scale
+    books = {
+        "flavor-bible": (directory / "flavor-bible" / "OEBPS" / "Text", FLAVOR_BIBLE_FILES, flavor_bible_chapter),
+        "vegetarian-flavor-bible": (
+            directory / "vegetarian-flavor-bible" / "OEBPS",
+            VEGETARIAN_FILES,
+            vegetarian_chapter,
+        ),
+    }
+    paths: Dict[str, List[Path]] = {}
+    for book, (text_dir, names, render) in books.items():
+        text_dir.mkdir(parents=True, exist_ok=True)
+        paths[book] = []
+        for seed, name in enumerate(names, start=1):
+            path = text_dir / name
+            path.write_text(render(entries, seed), encoding="utf-8")
+            paths[book].append(path)
+    return paths
+
+
+def best_of(repeat: int, func: Callable[[], Any], setup: Optional[Callable[[], None]] = None) -> Tuple[float, Any]:
+    best = float("inf")
+    result = None
+    for _ in range(max(repeat, 1)):
+        if setup is not None:
+            setup()
+        gc.collect()
+        started = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - started)
+    return best, result
+
+
+def canonicalize_all(entries: Sequence[Any], records: Sequence[Dict[str, Any]]) -> int:
+    calls = 0
+    names = [entry.heading for entry in entries]
+    names.extend(pairing["display_name"] for record in records for pairing in record.get("pairings") or [])
+    for name in names:
+        canonical, _ = canonicalize_name(name)
+        if canonical:
+            slugify(canonical)
+        calls += 1
+    return calls
+
+
+def write_records(path: Path, records: Sequence[Dict[str, Any]]) -> int:
+    with RecordWriter(path, rebuild=True) as writer:
+        for record in records:
+            writer.add(record)
+    return path.stat().st_size
+
+
+def registry_stage(source_files: Sequence[Tuple[str, Path]]) -> int:
+    registry, alias_index = build_registry(load_sources(source_files))
+    summarize_conflicts(registry, alias_index)
+    return len(registry)
+
+
+def benchmark_scale(directory: Path, scale: int, repeat: int, entries_per_file: int) -> Dict[str, Any]:
+    parsers = {"flavor-bible": parse_flavor_bible, "vegetarian-flavor-bible": parse_vegetarian_flavor_bible}
+    fixtures = write_fixtures(directory / f"x{scale}", scale, entries_per_file)
+    result: Dict[str, Any] = {"scale": scale, "books": {}}
+    outputs: List[Tuple[str, Path]] = []
+
+    for book, paths in fixtures.items():
+        parser = parsers[book]
+        seconds: Dict[str, float] = {}
+        seconds["iter_entries"], entries = best_of(
+            repeat, lambda: [entry for path in paths for entry in parser.iter_chapter_entries(path)]
+        )
+        # Every stage that calls canonicalize_name starts from a cold cache;
+        # otherwise all runs after the first only time lru_cache hits.
+        seconds["parse_entry"], parsed = best_of(
+            repeat, lambda: [parser.parse_entry(entry) for entry in entries], clear_cache
+        )
+        records = [record for record in parsed if record is not None]
+        seconds["canonicalize"], calls = best_of(repeat, lambda: canonicalize_all(entries, records), clear_cache)
+        output = directory / f"x{scale}" / f"{book}.json"
+        seconds["write_output"], size = best_of(repeat, lambda: write_records(output, records))
+        outputs.append((book, output))
+        result["books"][book] = {
+            "files": len(paths),
+            "input_bytes": sum(path.stat().st_size for path in paths),
+            "entries": len(entries),
+            "records": len(records),
+            "pairings": sum(len(record.get("pairings") or []) for record in records),
+            "canonicalize_calls": calls,
+            "output_bytes": size,
+            "seconds": {stage: round(value, 6) for stage, value in seconds.items()},
+        }
+
+    seconds, entries = best_of(repeat, lambda: registry_stage(outputs), clear_cache)
+    result["registry"] = {"entries": entries, "seconds": {"registry": round(seconds, 6)}}
+    return result
+
+
+def git_commit() -> Optional[str]:
+    try:
+        completed = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True, check=True
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return completed.stdout.strip() or None
+
+
+def stage_times(results: Dict[str, Any]) -> Dict[Tuple[int, str, str], float]:
+    """Flatten a result file into ``(scale, book, stage) -> seconds``."""
+    times: Dict[Tuple[int, str, str], float] = {}
+    for run in results.get("scales", []):
+        for book, payload in run["books"].items():
+            for stage, value in payload["seconds"].items():
+                times[(run["scale"], book, stage)] = value
+        times[(run["scale"], "both", "registry")] = run["registry"]["seconds"]["registry"]
+    return times
+
+
+def print_results(results: Dict[str, Any], baseline: Optional[Dict[str, Any]] = None) -> None:
+    previous = stage_times(baseline) if baseline else {}
+    for (scale, book, stage), value in stage_times(results).items():
+        line = f"  {scale:>4}x {book:<24} {stage:<13} {value * 1000:10.1f} ms"
+        before = previous.get((scale, book, stage))
+        if before:
+            line += f"  ({value / before:5.2f}x vs {baseline.get('commit') or 'baseline'})"
+        print(line)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the ingestion pipeline on synthetic book fixtures.")
+    parser.add_argument(
+        "--scales",
+        default=",".join(str(scale) for scale in DEFAULT_SCALES),
+        help="Comma-separated fixture scales (default: 1,10,100)",
+    )
+    parser.add_argument(
+        "--entries",
+        type=int,
+        default=ENTRIES_PER_FILE,
+        help=f"Entries per chapter file at 1x (default: {ENTRIES_PER_FILE})",
+    )
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per stage; the best is kept (default: 3)")
+    parser.add_argument("--output", type=Path, help="Result file (default: build/benchmarks/pipeline-<commit>.json)")
+    parser.add_argument("--compare", type=Path, help="Earlier result file to print ratios against")
+    parser.add_argument("--fixtures", type=Path, help="Keep the generated fixtures in this directory")
+    args = parser.parse_args()
+
+    try:
+        scales = [int(value) for value in args.scales.split(",") if value.strip()]
+    except ValueError:
+        print(f"[ERROR] Invalid --scales value: {args.scales}", file=sys.stderr)
+        sys.exit(2)
+
+    baseline = None
+    if args.compare is not None:
+        try:
+            baseline = json.loads(args.compare.read_text(encoding="utf-8"))
+        except (OSError, ValueError) as exc:
+            print(f"[WARN] Ignoring --compare {args.compare}: {exc}", file=sys.stderr)
+
+    commit = git_commit()
+    results: Dict[str, Any] = {
+        "created": datetime.now(timezone.utc).isoformat().replace("+00:00", "Z"),
+        "commit": commit,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "repeat": args.repeat,
+        "entries_per_file": args.entries,
+        "scales": [],
+    }
+
+    with tempfile.TemporaryDirectory(prefix="flavor-bench-") as scratch:
+        directory = args.fixtures or Path(scratch)
+        for scale in scales:
+            print(f"Scale {scale}x ({args.entries * scale} entries per chapter file)...")
+            results["scales"].append(benchmark_scale(directory, scale, args.repeat, args.entries))
+
+    print_results(results, baseline)
+    output = args.output or OUTPUT_DIR / f"pipeline-{commit or 'worktree'}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(results, indent=2), encoding="utf-8")
+    print(f"Results written: {output}")
+
+
+if __name__ == "__main__":
+    main()
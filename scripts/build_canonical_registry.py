@@ -2,12 +2,17 @@
 
 from __future__ import annotations
 
+import argparse
+import hashlib
 import json
 import re
-import unicodedata
+import zlib
 from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Dict, Iterable, List, Optional, Set, Tuple
+from typing import Dict, Iterable, List, Sequence, Set, Tuple
+
+from canonical_names import canonicalize_name, clean_text, slugify
+from compact_dataset import compact_path_for, write_compact
 
 ROOT = Path(__file__).resolve().parents[1]
 SOURCE_FILES = [
@@ -51,68 +56,6 @@ class SourceIngredient:
     slug: str
 
 
-def clean_text(text: Optional[str]) -> str:
-    if text is None:
-        return ""
-    normalized = unicodedata.normalize("NFKC", text)
-    normalized = normalized.replace("\xa0", " ")
-    normalized = normalized.replace("\u2013", "-")
-    normalized = normalized.replace("\u2014", "-")
-    normalized = normalized.replace("\ufffd", "")
-    normalized = re.sub(r"\s+", " ", normalized)
-    return normalized.strip()
-
-
-def canonicalize_name(text: str) -> Tuple[Optional[str], str]:
-    original = clean_text(text)
-    if not original:
-        return None, original
-
-    working = re.sub(r"\([^)]*\)", "", original)
-    working = re.sub(r";?\s*see also.*", "", working, flags=re.IGNORECASE)
-    working = re.sub(r";?\s*aka.*", "", working, flags=re.IGNORECASE)
-    working = re.sub(r",?\s*aka.*", "", working, flags=re.IGNORECASE)
-    working = re.sub(r",?\s*and/or.*", "", working, flags=re.IGNORECASE)
-    working = re.sub(r",?\s*including.*", "", working, flags=re.IGNORECASE)
-    working = re.sub(r",?\s*with.*", "", working, flags=re.IGNORECASE)
-    working = re.sub(r",?\s*e\.g\.,?.*", "", working, flags=re.IGNORECASE)
-    working = re.sub(r"\b(in general|general|mixed)\b.*", "", working, flags=re.IGNORECASE)
-    working = working.replace("/", " ")
-    ascii_working = "".join(
-        ch for ch in unicodedata.normalize("NFKD", working) if not unicodedata.combining(ch)
-    )
-    ascii_working = re.sub(r"\bas a [^,;]+", "", ascii_working, flags=re.IGNORECASE)
-    ascii_working = re.sub(r"\bfor [^,;]+", "", ascii_working, flags=re.IGNORECASE)
-    ascii_working = re.sub(r"[^A-Za-z0-9,\- ]", " ", ascii_working)
-    ascii_working = re.sub(r"\s+", " ", ascii_working).strip(" ,;-")
-
-    if not ascii_working:
-        return None, original
-
-    working = ascii_working
-
-    if "," in working:
-        parts = [p.strip() for p in working.split(",") if p.strip()]
-        if len(parts) == 2:
-            working = f"{parts[1]} {parts[0]}".strip()
-        else:
-            working = " ".join(parts)
-
-    ascii_name = re.sub(r"[^a-zA-Z0-9 '\-]", " ", working)
-    ascii_name = re.sub(r"\s+", " ", ascii_name).strip(" ,;- ")
-    if not ascii_name:
-        return None, original
-
-    canonical = ascii_name.lower()
-    return canonical, original
-
-
-def slugify(text: str) -> str:
-    text = text.lower()
-    text = re.sub(r"[^a-z0-9]+", "-", text).strip("-")
-    return text
-
-
 def normalize_token(token: str) -> str:
     token = token.lower()
     if token in PLURAL_EXCEPTIONS:
@@ -174,9 +117,35 @@ def extract_aliases(display_name: str) -> List[str]:
     return sorted(set(aliases))
 
 
-def load_sources() -> List[SourceIngredient]:
+_REFERENCE_MARKER = r"\bsee\b(?:\s+also\b)?|\b[ei]\.\s?[ge]\."
+_CROSS_REFERENCE = re.compile(rf"(?:{_REFERENCE_MARKER})(.*?)(?=(?:{_REFERENCE_MARKER})|\)|$)", re.IGNORECASE)
+
+
+def cross_references(display_name: str) -> Set[str]:
+    """Canonical forms of the names a display name points to ("see", "see also") or gives as examples ("e.g.", "i.e.").
+
+    `extract_aliases` keeps these as aliases, but they name other entries
+    ("OIL, NUT (see OIL, WALNUT)") or narrower kinds ("POTATOES, LOW-STARCH
+    (e.g., NEW)"), not synonyms of this one.
+    """
+    references: Set[str] = set()
+    for span in _CROSS_REFERENCE.findall(display_name or ""):
+        for token in split_alias_tokens(span):
+            canonical, _ = canonicalize_name(token)
+            if canonical:
+                references.add(canonical)
+    return references
+
+
+def heading_fragments(display_name: str) -> Set[str]:
+    """Normalized tokens of a display name outside its parentheses ("LETTUCE, BUTTER" -> lettuce, butter)."""
+    heading = re.sub(r"\([^)]*\)?", " ", display_name or "")
+    return set(normalized_key(heading).split())
+
+
+def load_sources(source_files: Sequence[Tuple[str, Path]] = tuple(SOURCE_FILES)) -> List[SourceIngredient]:
     items: List[SourceIngredient] = []
-    for source_name, path in SOURCE_FILES:
+    for source_name, path in source_files:
         if not path.exists():
             continue
         data = json.loads(path.read_text(encoding="utf-8"))
@@ -211,6 +180,124 @@ def build_registry(items: Iterable[SourceIngredient]) -> Tuple[Dict[str, Registr
     return registry, alias_index
 
 
+# Blocks larger than this (e.g. every "... cheese") are skipped rather than
+# compared all-pairs; the other blocking keys still catch close variants.
+MAX_BLOCK_SIZE = 40
+MINHASH_BANDS = 8
+MINHASH_ROWS = 2
+NEAR_DUPLICATE_MIN_SCORE = 0.9
+_COMPARISON_FILLERS = {"and", "or"}
+SPELLING_VARIANTS = {
+    "chili": "chile",
+    "chilis": "chiles",
+    "chilies": "chiles",
+    "chilli": "chile",
+    "chillies": "chiles",
+}
+# Head nouns that mostly restate the class of the word before them ("kale
+# greens", "chile peppers"). "greens" is kept plural: "green" is an adjective.
+CLASS_NOUNS = {"greens", "pepper"}
+CLASS_NOUN_WEIGHT = 0.1
+_MINHASH_PRIME = (1 << 61) - 1
+_MINHASH_SEEDS = [
+    (int.from_bytes(hashlib.blake2b(f"a{i}".encode(), digest_size=7).digest(), "big") | 1,
+     int.from_bytes(hashlib.blake2b(f"b{i}".encode(), digest_size=7).digest(), "big"))
+    for i in range(MINHASH_BANDS * MINHASH_ROWS)
+]
+
+
+def char_shingles(text: str, size: int = 3) -> Set[str]:
+    padded = f" {text} "
+    return {padded[index : index + size] for index in range(max(len(padded) - size + 1, 1))}
+
+
+def minhash_bands(shingles: Set[str]) -> List[Tuple[int, ...]]:
+    hashes = [zlib.crc32(shingle.encode("utf-8")) for shingle in shingles]
+    signature = [min((a * value + b) % _MINHASH_PRIME for value in hashes) for a, b in _MINHASH_SEEDS]
+    return [tuple(signature[band * MINHASH_ROWS : (band + 1) * MINHASH_ROWS]) for band in range(MINHASH_BANDS)]
+
+
+def comparison_token(token: str) -> str:
+    """Singular, spelling-normalised form used only for near-duplicate scoring.
+
+    Unlike `normalize_token`, "-es" is only dropped after sibilants and "o", so
+    "quinces" and "pineapples" meet their singulars.
+    """
+    token = SPELLING_VARIANTS.get(token, token)
+    if token in PLURAL_EXCEPTIONS or token in CLASS_NOUNS or len(token) <= 3:
+        return token
+    if token.endswith("ies") and len(token) > 4:
+        return token[:-3] + "y"
+    if token.endswith(("oes", "ches", "shes", "sses", "xes", "zes")):
+        return token[:-2]
+    if token.endswith("s") and not token.endswith("ss"):
+        return token[:-1]
+    return token
+
+
+def comparison_tokens(name: str) -> List[str]:
+    words = re.sub(r"[^a-z0-9 ]", " ", name.lower()).split()
+    return [comparison_token(word) for word in words if word not in _COMPARISON_FILLERS]
+
+
+def comparison_key(name: str) -> str:
+    """Order-free form of a name: "mushrooms - portobello" == "portobello mushroom"."""
+    return " ".join(sorted(comparison_tokens(name)))
+
+
+def containment_score(left: Set[str], right: Set[str]) -> float:
+    """Share of the two token sets that is common; unshared class nouns count a tenth."""
+    shared = left & right
+    extra = sum(CLASS_NOUN_WEIGHT if token in CLASS_NOUNS else 1 for token in left ^ right)
+    return len(shared) / (len(shared) + extra) if shared else 0.0
+
+
+def near_duplicate_score(left: str, right: str) -> float:
+    """Best of the shingle Dice coefficient of the comparison keys and token containment."""
+    left_tokens, right_tokens = comparison_tokens(left), comparison_tokens(right)
+    left_shingles = char_shingles(" ".join(sorted(left_tokens)))
+    right_shingles = char_shingles(" ".join(sorted(right_tokens)))
+    dice = 2 * len(left_shingles & right_shingles) / (len(left_shingles) + len(right_shingles))
+    return max(dice, containment_score(set(left_tokens), set(right_tokens)))
+
+
+def find_near_duplicates(names: Iterable[str], min_score: float = NEAR_DUPLICATE_MIN_SCORE) -> List[Dict[str, object]]:
+    """Rank likely duplicate canonicals without comparing every pair.
+
+    Candidates come from three blocking keys -- shared comparison token,
+    `comparison_key` and MinHash/LSH bands over character shingles -- and
+    only pairs sharing a block are scored. Pairs with identical normalized
+    keys are already reported as ``normalized_collisions`` and are skipped.
+    """
+    keys = {name: normalized_key(name) for name in names}
+    blocks: Dict[Tuple[str, object], List[str]] = {}
+    for name in keys:
+        key = comparison_key(name)
+        for token in set(key.split()):
+            blocks.setdefault(("token", token), []).append(name)
+        blocks.setdefault(("sorted", key), []).append(name)
+        for band, values in enumerate(minhash_bands(char_shingles(key))):
+            blocks.setdefault(("minhash", (band, values)), []).append(name)
+
+    candidates: Dict[Tuple[str, str], Set[str]] = {}
+    for (kind, _), members in blocks.items():
+        if len(members) < 2 or len(members) > MAX_BLOCK_SIZE:
+            continue
+        members.sort()
+        for index, left in enumerate(members):
+            for right in members[index + 1 :]:
+                if keys[left] != keys[right]:
+                    candidates.setdefault((left, right), set()).add(kind)
+
+    ranked = []
+    for (left, right), kinds in candidates.items():
+        score = near_duplicate_score(left, right)
+        if score >= min_score:
+            ranked.append({"names": [left, right], "score": round(score, 3), "blocks": sorted(kinds)})
+    ranked.sort(key=lambda item: (-item["score"], item["names"]))
+    return ranked
+
+
 def summarize_conflicts(registry: Dict[str, RegistryEntry], alias_index: Dict[str, List[str]]) -> Dict[str, object]:
     normalized_map: Dict[str, List[str]] = {}
     for canonical in registry:
@@ -234,13 +321,12 @@ def summarize_conflicts(registry: Dict[str, RegistryEntry], alias_index: Dict[st
         "normalized_collisions": collisions,
         "alias_collisions": alias_collisions,
         "alias_matches_existing_canonical": alias_matches,
+        "near_duplicates": find_near_duplicates(registry),
     }
 
 
-def write_outputs(registry: Dict[str, RegistryEntry], conflicts: Dict[str, object]) -> None:
-    OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
-
-    registry_payload = [
+def registry_entries(registry: Dict[str, RegistryEntry]) -> List[Dict[str, object]]:
+    return [
         {
             "canonical": entry.canonical,
             "slug": entry.slug,
@@ -252,7 +338,23 @@ def write_outputs(registry: Dict[str, RegistryEntry], conflicts: Dict[str, objec
         for entry in sorted(registry.values(), key=lambda e: e.canonical)
     ]
 
+
+def load_registry_entries() -> List[Dict[str, object]]:
+    """The written registry if present, otherwise one built in memory from the book datasets."""
+    if OUTPUT_REGISTRY.exists():
+        return json.loads(OUTPUT_REGISTRY.read_text(encoding="utf-8"))
+    registry, _ = build_registry(load_sources())
+    return registry_entries(registry)
+
+
+def write_outputs(registry: Dict[str, RegistryEntry], conflicts: Dict[str, object], compact: bool = False) -> None:
+    OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+
+    registry_payload = registry_entries(registry)
+
     OUTPUT_REGISTRY.write_text(json.dumps(registry_payload, indent=2, ensure_ascii=False), encoding="utf-8")
+    if compact:
+        write_compact(compact_path_for(OUTPUT_REGISTRY), registry_payload)
 
     report = {
         "total_canonicals": len(registry_payload),
@@ -263,10 +365,18 @@ def write_outputs(registry: Dict[str, RegistryEntry], conflicts: Dict[str, objec
 
 
 def main() -> None:
+    parser = argparse.ArgumentParser(description="Build the canonical ingredient registry.")
+    parser.add_argument(
+        "--compact",
+        action="store_true",
+        help="Also write the memory-mappable ingredient_registry.compact.bin",
+    )
+    args = parser.parse_args()
+
     items = load_sources()
     registry, alias_index = build_registry(items)
     conflicts = summarize_conflicts(registry, alias_index)
-    write_outputs(registry, conflicts)
+    write_outputs(registry, conflicts, compact=args.compact)
     print(f"Registry entries: {len(registry)}")
     print(f"Report written: {OUTPUT_REPORT}")
 
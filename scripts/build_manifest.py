@@ -0,0 +1,171 @@
+"""Content-hash manifests for incremental parser rebuilds.
+
+The manifest stored next to a dataset records, per source file, a hash of its
+bytes and the slugs it produced, plus a hash of the parser's rule tables and of
+the dataset itself. ``incremental_build`` reparses only the files whose hash
+changed (and any file sharing slugs with them) and splices the fresh records
+into the existing output in source-file order, so the result matches a full
+``--rebuild``.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence, Set
+
+from chapter_pool import map_chapters
+from record_writer import write_json_atomic
+
+MANIFEST_VERSION = 1
+
+Record = Dict[str, object]
+
+
+@dataclass
+class SourceState:
+    sha256: str
+    slugs: List[str]
+
+
+@dataclass
+class BuildManifest:
+    rules: str
+    output: str
+    sources: Dict[str, SourceState] = field(default_factory=dict)
+
+
+@dataclass
+class IncrementalResult:
+    reparsed: List[str]
+    total_files: int
+    records: int
+
+
+def file_digest(path: Path) -> str:
+    digest = hashlib.sha256()
+    with path.open("rb") as handle:
+        for chunk in iter(lambda: handle.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def rules_digest(**tables: object) -> str:
+    """Stable hash of the parser rule tables (sets are hashed sorted)."""
+
+    def normalize(value: object) -> object:
+        if isinstance(value, (set, frozenset)):
+            return sorted(value)
+        if isinstance(value, dict):
+            return {key: normalize(item) for key, item in sorted(value.items())}
+        return value
+
+    payload = json.dumps({name: normalize(value) for name, value in tables.items()}, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def manifest_path_for(output_path: Path) -> Path:
+    return output_path.with_name(f"{output_path.stem}.manifest.json")
+
+
+def load_manifest(path: Path) -> Optional[BuildManifest]:
+    if not path.exists():
+        return None
+    try:
+        payload = json.loads(path.read_text(encoding="utf-8"))
+    except json.JSONDecodeError:
+        return None
+    if payload.get("version") != MANIFEST_VERSION:
+        return None
+    sources = {
+        name: SourceState(sha256=state["sha256"], slugs=list(state["slugs"]))
+        for name, state in payload.get("sources", {}).items()
+    }
+    return BuildManifest(rules=payload.get("rules", ""), output=payload.get("output", ""), sources=sources)
+
+
+def save_manifest(path: Path, manifest: BuildManifest) -> None:
+    payload = {
+        "version": MANIFEST_VERSION,
+        "rules": manifest.rules,
+        "output": manifest.output,
+        "sources": {
+            name: {"sha256": state.sha256, "slugs": state.slugs}
+            for name, state in sorted(manifest.sources.items())
+        },
+    }
+    write_json_atomic(path, payload)
+
+
+def incremental_build(
+    paths: Sequence[Path],
+    output_path: Path,
+    rules: str,
+    parse_file: Callable[[Path], List[Record]],
+    jobs: int = 1,
+) -> IncrementalResult:
+    """Rebuild ``output_path`` from ``paths``, reparsing only what changed.
+
+    ``parse_file`` must return every record of one file (deduplicated within
+    the file only); records are merged across files with first-slug-wins.
+    """
+    manifest_path = manifest_path_for(output_path)
+    manifest = load_manifest(manifest_path)
+    digests = {path.name: file_digest(path) for path in paths}
+
+    previous: Dict[str, Record] = {}
+    reusable = manifest is not None and manifest.rules == rules and output_path.exists()
+    if reusable:
+        raw = output_path.read_bytes()
+        reusable = hashlib.sha256(raw).hexdigest() == manifest.output
+        if reusable:
+            previous = {record["slug"]: record for record in json.loads(raw.decode("utf-8"))}
+
+    old_sources = manifest.sources if reusable else {}
+    stale = [path for path in paths if old_sources.get(path.name, SourceState("", [])).sha256 != digests[path.name]]
+
+    fresh: Dict[str, List[Record]] = {}
+    for path, records in map_chapters(parse_file, stale, jobs):
+        fresh[path.name] = records
+
+    # Slugs whose owner may have moved: everything a stale or deleted file
+    # produced before or produces now. Unchanged files that also emit one of
+    # them must be reparsed so a previously shadowed record can take over.
+    current_names = {path.name for path in paths}
+    touched: Set[str] = set()
+    for name, state in old_sources.items():
+        if name in fresh or name not in current_names:
+            touched.update(state.slugs)
+    for records in fresh.values():
+        touched.update(record["slug"] for record in records)
+    shadowed = [
+        path
+        for path in paths
+        if path.name not in fresh and touched.intersection(old_sources[path.name].slugs)
+    ]
+    for path, records in map_chapters(parse_file, shadowed, jobs):
+        fresh[path.name] = records
+
+    merged: List[Record] = []
+    seen: Set[str] = set()
+    sources: Dict[str, SourceState] = {}
+    for path in paths:
+        if path.name in fresh:
+            records = fresh[path.name]
+            slugs = [record["slug"] for record in records]
+        else:
+            slugs = old_sources[path.name].slugs
+            records = [previous[slug] for slug in slugs if slug not in seen and slug in previous]
+        for record in records:
+            if record["slug"] in seen:
+                continue
+            seen.add(record["slug"])
+            merged.append(record)
+        sources[path.name] = SourceState(sha256=digests[path.name], slugs=slugs)
+
+    write_json_atomic(output_path, merged)
+    output_hash = hashlib.sha256(output_path.read_bytes()).hexdigest()
+    save_manifest(manifest_path, BuildManifest(rules=rules, output=output_hash, sources=sources))
+    return IncrementalResult(reparsed=sorted(fresh), total_files=len(paths), records=len(merged))
@@ -0,0 +1,141 @@
+"""Precompute static per-ingredient pairing pages for the web tier.
+
+Usage:
+    python scripts/build_pairing_pages.py
+    python scripts/build_pairing_pages.py --limit 50 --output build/pairing-pages
+
+For every slug in the canonical registry this writes
+`build/pairing-pages/pages/<slug>.json` with the top-N pairings from
+`FlavorGraph` (both books plus the Flavor Matrix, strongest tier first), and
+an `index.json` mapping each slug to the content hash of its fragment.
+
+`index.json` also records a SHA-256 of every input (both book datasets, the
+registry and the Flavor Matrix exports). When none of them changed the run is
+a no-op. Otherwise every page is recomputed in memory, but only fragments
+whose content hash differs are rewritten and fragments for vanished slugs are
+deleted, so unaffected pages keep their bytes and mtime (and therefore the
+ETag Caddy derives from them).
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from build_canonical_registry import OUTPUT_REGISTRY, ROOT, SOURCE_FILES, load_registry_entries
+from build_manifest import file_digest
+from canonical_names import slugify
+from flavor_graph import MATRIX_DIR, TIER_WEIGHTS, FlavorGraph
+from record_writer import write_bytes_atomic, write_json_atomic
+
+OUTPUT_DIR = ROOT / "build" / "pairing-pages"
+DEFAULT_LIMIT = 25
+INDEX_VERSION = 1
+TIER_NAMES = {weight: tier for tier, weight in TIER_WEIGHTS.items()}
+
+
+def input_paths() -> List[Path]:
+    paths = [path for _, path in SOURCE_FILES] + [OUTPUT_REGISTRY]
+    if MATRIX_DIR.exists():
+        paths += sorted(MATRIX_DIR.glob("*.json"))
+    return paths
+
+
+def dataset_digest(paths: List[Path], limit: int) -> Dict[str, object]:
+    files = {str(path.relative_to(ROOT)): file_digest(path) for path in paths if path.exists()}
+    combined = hashlib.sha256(json.dumps({"files": files, "limit": limit}, sort_keys=True).encode("utf-8"))
+    return {"sha256": combined.hexdigest(), "files": files, "limit": limit}
+
+
+def encode_page(payload: Dict[str, object]) -> bytes:
+    return json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def build_page(graph: FlavorGraph, entry: Dict[str, object], limit: int) -> Optional[Dict[str, object]]:
+    name = str(entry["canonical"])
+    pairings = graph.top_pairings(name, limit)
+    if not pairings:
+        return None
+    display_names = entry.get("display_names") or []
+    return {
+        "ingredient": name,
+        "slug": entry.get("slug") or slugify(name),
+        "display_name": display_names[0] if display_names else name,
+        "data": [
+            {
+                "name": item.ingredient,
+                "slug": slugify(item.ingredient),
+                "weight": item.weight,
+                "tier": TIER_NAMES.get(item.weight, ""),
+                "sources": item.sources,
+            }
+            for item in pairings
+        ],
+    }
+
+
+def load_index(path: Path) -> Dict[str, object]:
+    if not path.exists():
+        return {}
+    try:
+        index = json.loads(path.read_text(encoding="utf-8"))
+    except json.JSONDecodeError:
+        return {}
+    return index if index.get("version") == INDEX_VERSION else {}
+
+
+def build_pages(output_dir: Path, limit: int, force: bool = False) -> Dict[str, int]:
+    index_path = output_dir / "index.json"
+    pages_dir = output_dir / "pages"
+    previous = load_index(index_path)
+    dataset = dataset_digest(input_paths(), limit)
+    if not force and previous.get("dataset", {}).get("sha256") == dataset["sha256"]:
+        return {"written": 0, "unchanged": len(previous.get("pages", {})), "removed": 0}
+
+    # Forcing skips the hash comparison, but the previous page list is still
+    # needed to delete pages whose slug disappeared.
+    old_pages: Dict[str, str] = previous.get("pages", {})
+    graph = FlavorGraph.load()
+    pages: Dict[str, str] = {}
+    written = 0
+    for entry in load_registry_entries():
+        page = build_page(graph, entry, limit)
+        if page is None:
+            continue
+        slug = str(page["slug"])
+        if slug in pages:
+            continue
+        body = encode_page(page)
+        digest = hashlib.sha256(body).hexdigest()[:16]
+        pages[slug] = digest
+        page_path = pages_dir / f"{slug}.json"
+        if force or old_pages.get(slug) != digest or not page_path.exists():
+            write_bytes_atomic(page_path, body)
+            written += 1
+
+    removed = 0
+    for slug in set(old_pages) - set(pages):
+        (pages_dir / f"{slug}.json").unlink(missing_ok=True)
+        removed += 1
+
+    write_json_atomic(index_path, {"version": INDEX_VERSION, "dataset": dataset, "pages": dict(sorted(pages.items()))})
+    return {"written": written, "unchanged": len(pages) - written, "removed": removed}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Precompute per-ingredient pairing JSON fragments.")
+    parser.add_argument("--output", type=Path, default=OUTPUT_DIR, help="Destination (default: build/pairing-pages)")
+    parser.add_argument("--limit", type=int, default=DEFAULT_LIMIT, help="Pairings per page")
+    parser.add_argument("--force", action="store_true", help="Rewrite every page even if nothing changed")
+    args = parser.parse_args()
+
+    counts = build_pages(args.output, max(args.limit, 1), args.force)
+    print(f"Pages written: {counts['written']}, unchanged: {counts['unchanged']}, removed: {counts['removed']}")
+    print(f"Index: {args.output / 'index.json'}")
+
+
+if __name__ == "__main__":
+    main()
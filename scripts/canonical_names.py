@@ -0,0 +1,109 @@
+"""Shared text cleanup and ingredient-name canonicalisation for all scripts."""
+
+from __future__ import annotations
+
+import re
+import unicodedata
+from functools import lru_cache
+from typing import Dict, Iterable, Optional, Pattern, Tuple
+
+CACHE_SIZE = 1 << 16
+
+_WHITESPACE = re.compile(r"\s+")
+_CLEAN_TRANSLATION = str.maketrans({"\xa0": " ", "\u2013": "-", "\u2014": "-", "\ufffd": None})
+_PARENTHETICAL = re.compile(r"\([^)]*\)")
+# Everything from the first of these markers to the end of the heading is dropped.
+_TRUNCATE_AT = re.compile(
+    r";?\s*see also"
+    r"|[;,]?\s*aka"
+    r"|,?\s*and/or"
+    r"|,?\s*including"
+    r"|,?\s*with"
+    r"|,?\s*e\.g\."
+    r"|\b(?:in general|general|mixed)\b",
+    re.IGNORECASE,
+)
+_AS_A_CLAUSE = re.compile(r"\bas a [^,;]+", re.IGNORECASE)
+_FOR_CLAUSE = re.compile(r"\bfor [^,;]+", re.IGNORECASE)
+_NON_NAME_CHARS = re.compile(r"[^A-Za-z0-9,\- ]")
+_NON_SLUG_CHARS = re.compile(r"[^a-z0-9]+")
+
+
+def clean_text(text: Optional[str]) -> str:
+    if text is None:
+        return ""
+    normalized = unicodedata.normalize("NFKC", text).translate(_CLEAN_TRANSLATION)
+    return _WHITESPACE.sub(" ", normalized).strip()
+
+
+def strip_accents(text: str) -> str:
+    if text.isascii():
+        return text
+    return "".join(ch for ch in unicodedata.normalize("NFKD", text) if not unicodedata.combining(ch))
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def canonicalize_name(text: str) -> Tuple[Optional[str], str]:
+    original = clean_text(text)
+    if not original:
+        return None, original
+
+    working = _PARENTHETICAL.sub("", original)
+    match = _TRUNCATE_AT.search(working)
+    while match is not None:
+        # Cutting can turn a trailing "mixed"/"general" into a whole word, so
+        # keep trimming until no marker is left.
+        working = working[: match.start()]
+        match = _TRUNCATE_AT.search(working)
+    working = strip_accents(working.replace("/", " "))
+    working = _AS_A_CLAUSE.sub("", working)
+    working = _FOR_CLAUSE.sub("", working)
+    working = _NON_NAME_CHARS.sub(" ", working)
+    working = _WHITESPACE.sub(" ", working).strip(" ,;-")
+    if not working:
+        return None, original
+
+    if "," in working:
+        parts = [p.strip() for p in working.split(",") if p.strip()]
+        if len(parts) == 2:
+            working = f"{parts[1]} {parts[0]}"
+        else:
+            working = " ".join(parts)
+        working = working.strip(" ,;-")
+        if not working:
+            return None, original
+
+    return working.lower(), original
+
+
+def cache_stats() -> Dict[str, float]:
+    """Hit/miss counters for the ``canonicalize_name`` cache."""
+    info = canonicalize_name.cache_info()
+    lookups = info.hits + info.misses
+    return {
+        "hits": info.hits,
+        "misses": info.misses,
+        "size": info.currsize,
+        "max_size": info.maxsize,
+        "hit_rate": info.hits / lookups if lookups else 0.0,
+    }
+
+
+def clear_cache() -> None:
+    canonicalize_name.cache_clear()
+
+
+def slugify(text: str) -> str:
+    return _NON_SLUG_CHARS.sub("-", text.lower()).strip("-")
+
+
+def keyword_pattern(keywords: Iterable[str]) -> Pattern[str]:
+    """Compile ``keywords`` into one alternation for substring membership tests.
+
+    ``pattern.search(text)`` is equivalent to ``any(k in text for k in keywords)``
+    but scans the text once instead of once per keyword.
+    """
+    ordered = sorted(set(keywords), key=lambda word: (-len(word), word))
+    if not ordered:
+        return re.compile(r"(?!)")
+    return re.compile("|".join(re.escape(word) for word in ordered))
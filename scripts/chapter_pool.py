@@ -0,0 +1,35 @@
+"""Fan independent chapter files out to a process pool."""
+
+from __future__ import annotations
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Callable, Iterator, Sequence, Tuple, TypeVar
+
+T = TypeVar("T")
+
+
+def default_jobs() -> int:
+    return os.cpu_count() or 1
+
+
+def map_chapters(func: Callable[[Path], T], paths: Sequence[Path], jobs: int) -> Iterator[Tuple[Path, T]]:
+    """Yield ``(path, func(path))`` in the order of ``paths``.
+
+    Work runs in ``jobs`` worker processes; results are still handed back in
+    file order so callers can keep "first slug wins" semantics. Closing the
+    iterator early (e.g. once ``--limit`` is reached) cancels pending files.
+    """
+    if jobs <= 1 or len(paths) <= 1:
+        for path in paths:
+            yield path, func(path)
+        return
+
+    pool = ProcessPoolExecutor(max_workers=min(jobs, len(paths)))
+    try:
+        futures = [(path, pool.submit(func, path)) for path in paths]
+        for path, future in futures:
+            yield path, future.result()
+    finally:
+        pool.shutdown(wait=True, cancel_futures=True)
@@ -0,0 +1,144 @@
+"""Check that every ingredient reference in the book datasets exists in the registry.
+
+Usage:
+    python scripts/check_pairing_integrity.py
+    python scripts/check_pairing_integrity.py --max-dangling 0.4 --top 50
+
+One pass over both processed books collects every pairing target, Flavor
+Affinities member, `avoid` target and `metadata.possible_substitutes` value
+and resolves it with `IngredientResolver` (exact lookups only, each distinct
+string once). The report lists per-kind totals and the most frequent
+dangling targets with their sources, a few referring ingredients and the
+closest registry name by trigram score as a review hint.
+
+With `--max-dangling RATIO` the script exits non-zero when the share of
+dangling references exceeds RATIO, so it can gate a rebuild.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, Optional, Sequence, Tuple
+
+from build_canonical_registry import OUTPUT_DIR, SOURCE_FILES
+from ingredient_resolver import IngredientResolver
+from record_writer import write_json_atomic
+
+OUTPUT_REPORT = OUTPUT_DIR / "pairing_integrity_report.json"
+KINDS = ("pairing", "affinity", "avoid", "substitute")
+EXAMPLE_REFERRERS = 3
+
+
+def _names(values: object) -> Iterator[str]:
+    for value in values if isinstance(values, list) else []:
+        name = value.get("ingredient") if isinstance(value, dict) else value
+        if isinstance(name, str) and name:
+            yield name
+
+
+def iter_references(records: Iterable[Dict[str, object]]) -> Iterator[Tuple[str, str, str]]:
+    """Yield ``(kind, referrer, target)`` for every ingredient reference in ``records``."""
+    for record in records:
+        referrer = str(record.get("ingredient") or "")
+        for target in _names(record.get("pairings")):
+            yield "pairing", referrer, target
+        for affinity in record.get("flavor_affinities") or []:
+            for target in _names(affinity.get("items")):
+                yield "affinity", referrer, target
+        for target in _names(record.get("avoid")):
+            yield "avoid", referrer, target
+        metadata = record.get("metadata") or {}
+        for target in _names(metadata.get("possible_substitutes")):
+            yield "substitute", referrer, target
+
+
+def check_integrity(
+    resolver: IngredientResolver,
+    book_files: Sequence[Tuple[str, Path]] = tuple(SOURCE_FILES),
+    top: int = 25,
+) -> Dict[str, object]:
+    totals = {kind: Counter() for kind in KINDS}
+    dangling: Counter = Counter()
+    details: Dict[str, Dict[str, object]] = {}
+    known: Dict[str, bool] = {}
+
+    for source, path in book_files:
+        if not path.exists():
+            continue
+        for kind, referrer, target in iter_references(json.loads(path.read_text(encoding="utf-8"))):
+            found = known.get(target)
+            if found is None:
+                found = known[target] = resolver.resolve(target).canonical is not None
+            totals[kind]["references"] += 1
+            if found:
+                continue
+            totals[kind]["dangling"] += 1
+            dangling[target] += 1
+            detail = details.setdefault(target, {"kinds": Counter(), "sources": set(), "referrers": []})
+            detail["kinds"][kind] += 1
+            detail["sources"].add(source)
+            if len(detail["referrers"]) < EXAMPLE_REFERRERS and referrer not in detail["referrers"]:
+                detail["referrers"].append(referrer)
+
+    offenders = []
+    for target, count in dangling.most_common(top):
+        detail = details[target]
+        suggestion = resolver.resolve(target, fuzzy=True)
+        offenders.append(
+            {
+                "target": target,
+                "mentions": count,
+                "kinds": dict(sorted(detail["kinds"].items())),
+                "sources": sorted(detail["sources"]),
+                "referrers": detail["referrers"],
+                "suggestion": suggestion.canonical,
+                "suggestion_score": suggestion.score if suggestion.canonical else None,
+            }
+        )
+
+    references = sum(counts["references"] for counts in totals.values())
+    dangling_total = sum(dangling.values())
+    return {
+        "registry_entries": len(resolver),
+        "references": references,
+        "dangling": dangling_total,
+        "dangling_ratio": round(dangling_total / references, 4) if references else 0.0,
+        "distinct_dangling": len(dangling),
+        "by_kind": {kind: {"references": c["references"], "dangling": c["dangling"]} for kind, c in totals.items()},
+        "top_offenders": offenders,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Find book references that are missing from the canonical registry.")
+    parser.add_argument("--output", type=Path, default=OUTPUT_REPORT, help="Report destination")
+    parser.add_argument("--top", type=int, default=25, help="Dangling targets to list in the report")
+    parser.add_argument(
+        "--max-dangling", type=float, metavar="RATIO", help="Fail when the dangling share exceeds RATIO"
+    )
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    report = check_integrity(IngredientResolver.load(), SOURCE_FILES, top=args.top)
+    elapsed = (time.perf_counter() - started) * 1000
+
+    write_json_atomic(args.output, report)
+    print(f"Checked {report['references']} references in {elapsed:.0f} ms")
+    for kind, counts in report["by_kind"].items():
+        print(f"  {kind:<11} {counts['references']:>6} references, {counts['dangling']:>6} dangling")
+    print(f"Dangling: {report['dangling']} ({report['dangling_ratio']:.1%}), {report['distinct_dangling']} distinct")
+    print(f"Report written: {args.output}")
+
+    limit: Optional[float] = args.max_dangling
+    if limit is not None and report["dangling_ratio"] > limit:
+        print(f"[ERROR] Dangling share {report['dangling_ratio']:.1%} exceeds {limit:.1%}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,264 @@
+"""Compact, memory-mappable companion format for the processed JSON datasets.
+
+Usage:
+    python scripts/compact_dataset.py docs/flavor-bible-processed/flavor-bible.json
+    python scripts/compact_dataset.py docs/flavor-bible-processed/flavor-bible.compact.bin --lookup basil
+
+Layout (all integers little-endian):
+    header      magic, version, section counts and byte offsets
+    strings     u32 offsets[n + 1] followed by one UTF-8 blob; every slug,
+                ingredient name, display name and tier is interned here once
+    records     (slug_id, fields_id, edge_start, edge_count) as 4 x u32,
+                sorted by slug so lookups are a binary search over the map
+    order       u32 record index per original dataset position
+    edges       three columns: target ids (u32), display ids (u32), tier codes (u8)
+    tiers       u32 string id per tier code
+
+``fields_id`` points at a compact JSON string holding every field except
+``pairings``; it is only decoded when a record is requested.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import mmap
+import struct
+import sys
+from array import array
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+from record_writer import write_bytes_atomic
+
+MAGIC = b"FPCD"
+VERSION = 1
+HEADER = struct.Struct("<4sHHIIIIIQQQQQQQQ")
+RECORD = struct.Struct("<IIII")
+
+
+def compact_path_for(json_path: Path) -> Path:
+    return json_path.with_name(f"{json_path.stem}.compact.bin")
+
+
+def _u32_bytes(values: Sequence[int]) -> bytes:
+    column = array("I", values)
+    if sys.byteorder == "big":
+        column.byteswap()
+    return column.tobytes()
+
+
+def encode_records(records: Sequence[Dict[str, object]]) -> bytes:
+    strings: List[str] = []
+    string_ids: Dict[str, int] = {}
+
+    def intern(text: str) -> int:
+        sid = string_ids.get(text)
+        if sid is None:
+            sid = len(strings)
+            string_ids[text] = sid
+            strings.append(text)
+        return sid
+
+    tiers: List[int] = []
+    tier_codes: Dict[str, int] = {}
+    edge_targets: List[int] = []
+    edge_displays: List[int] = []
+    edge_tiers: List[int] = []
+    rows: List[Tuple[str, int, int, int, int]] = []
+
+    for record in records:
+        slug = str(record["slug"])
+        fields = {key: value for key, value in record.items() if key != "pairings"}
+        edge_start = len(edge_targets)
+        for pairing in record.get("pairings") or []:
+            tier = str(pairing.get("tier", ""))
+            code = tier_codes.get(tier)
+            if code is None:
+                if len(tiers) == 256:
+                    raise ValueError("More than 256 distinct pairing tiers")
+                code = len(tiers)
+                tier_codes[tier] = code
+                tiers.append(intern(tier))
+            edge_targets.append(intern(str(pairing.get("ingredient", ""))))
+            edge_displays.append(intern(str(pairing.get("display_name", ""))))
+            edge_tiers.append(code)
+        rows.append(
+            (
+                slug,
+                intern(slug),
+                intern(json.dumps(fields, ensure_ascii=False, separators=(",", ":"))),
+                edge_start,
+                len(edge_targets) - edge_start,
+            )
+        )
+
+    sorted_rows = sorted(range(len(rows)), key=lambda index: rows[index][0])
+    position = {row_index: sorted_index for sorted_index, row_index in enumerate(sorted_rows)}
+
+    encoded = [text.encode("utf-8") for text in strings]
+    offsets = [0]
+    for chunk in encoded:
+        offsets.append(offsets[-1] + len(chunk))
+
+    sections = [
+        _u32_bytes(offsets),
+        b"".join(encoded),
+        b"".join(RECORD.pack(*rows[index][1:]) for index in sorted_rows),
+        _u32_bytes([position[index] for index in range(len(rows))]),
+        _u32_bytes(edge_targets),
+        _u32_bytes(edge_displays),
+        bytes(edge_tiers),
+        _u32_bytes(tiers),
+    ]
+    section_offsets = []
+    cursor = HEADER.size
+    for section in sections:
+        section_offsets.append(cursor)
+        cursor += len(section)
+
+    header = HEADER.pack(
+        MAGIC, VERSION, 0, len(strings), len(rows), len(edge_targets), len(tiers), 0, *section_offsets
+    )
+    return header + b"".join(sections)
+
+
+def write_compact(path: Path, records: Sequence[Dict[str, object]]) -> None:
+    write_bytes_atomic(path, encode_records(records))
+
+
+def convert_json(json_path: Path, output_path: Optional[Path] = None) -> Path:
+    output_path = output_path or compact_path_for(json_path)
+    write_compact(output_path, json.loads(json_path.read_text(encoding="utf-8")))
+    return output_path
+
+
+class CompactDataset:
+    """Read-only view over a compact dataset; records are decoded on demand."""
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self._file = path.open("rb")
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        (
+            magic,
+            version,
+            _flags,
+            self._string_count,
+            self._record_count,
+            self._edge_count,
+            self._tier_count,
+            _reserved,
+            self._string_offsets,
+            self._string_blob,
+            self._records,
+            self._order,
+            self._edge_targets,
+            self._edge_displays,
+            self._edge_tiers,
+            self._tiers,
+        ) = HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC or version != VERSION:
+            self.close()
+            raise ValueError(f"{path} is not a compact dataset (version {VERSION})")
+        self._tier_names = [
+            self.string(sid) for sid in struct.unpack_from(f"<{self._tier_count}I", self._map, self._tiers)
+        ]
+
+    def close(self) -> None:
+        self._map.close()
+        self._file.close()
+
+    def __enter__(self) -> "CompactDataset":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return self._record_count
+
+    def __contains__(self, slug: object) -> bool:
+        return isinstance(slug, str) and self._find(slug) is not None
+
+    def __iter__(self) -> Iterator[Dict[str, object]]:
+        for position in range(self._record_count):
+            (index,) = struct.unpack_from("<I", self._map, self._order + 4 * position)
+            yield self._record(index)
+
+    def string(self, sid: int) -> str:
+        start, end = struct.unpack_from("<II", self._map, self._string_offsets + 4 * sid)
+        base = self._string_blob
+        return self._map[base + start : base + end].decode("utf-8")
+
+    def slugs(self) -> Iterator[str]:
+        for index in range(self._record_count):
+            yield self.string(self._row(index)[0])
+
+    def get(self, slug: str) -> Optional[Dict[str, object]]:
+        index = self._find(slug)
+        return None if index is None else self._record(index)
+
+    def pairings(self, slug: str) -> List[Tuple[str, str]]:
+        """``(ingredient, tier)`` pairs for ``slug`` without decoding other fields."""
+        index = self._find(slug)
+        if index is None:
+            return []
+        _, _, start, count = self._row(index)
+        targets = struct.unpack_from(f"<{count}I", self._map, self._edge_targets + 4 * start)
+        tiers = self._map[self._edge_tiers + start : self._edge_tiers + start + count]
+        return [(self.string(target), self._tier_names[tier]) for target, tier in zip(targets, tiers)]
+
+    def _row(self, index: int) -> Tuple[int, int, int, int]:
+        return RECORD.unpack_from(self._map, self._records + RECORD.size * index)
+
+    def _find(self, slug: str) -> Optional[int]:
+        low, high = 0, self._record_count
+        while low < high:
+            middle = (low + high) // 2
+            current = self.string(self._row(middle)[0])
+            if current < slug:
+                low = middle + 1
+            elif current > slug:
+                high = middle
+            else:
+                return middle
+        return None
+
+    def _record(self, index: int) -> Dict[str, object]:
+        _, fields_id, start, count = self._row(index)
+        record: Dict[str, object] = json.loads(self.string(fields_id))
+        if count:
+            targets = struct.unpack_from(f"<{count}I", self._map, self._edge_targets + 4 * start)
+            displays = struct.unpack_from(f"<{count}I", self._map, self._edge_displays + 4 * start)
+            tiers = self._map[self._edge_tiers + start : self._edge_tiers + start + count]
+            record["pairings"] = [
+                {"ingredient": self.string(target), "display_name": self.string(display), "tier": self._tier_names[tier]}
+                for target, display, tier in zip(targets, displays, tiers)
+            ]
+        return record
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Convert a processed JSON dataset to the compact format.")
+    parser.add_argument("path", type=Path, help="Processed JSON dataset, or a .compact.bin file with --lookup")
+    parser.add_argument("--output", type=Path, help="Destination (default: <name>.compact.bin next to the JSON)")
+    parser.add_argument("--lookup", help="Print the record stored under this slug")
+    args = parser.parse_args()
+
+    if args.lookup:
+        path = args.path if args.path.suffix == ".bin" else compact_path_for(args.path)
+        with CompactDataset(path) as dataset:
+            record = dataset.get(args.lookup)
+        if record is None:
+            print(f"[WARN] Slug not found: {args.lookup}", file=sys.stderr)
+            sys.exit(1)
+        print(json.dumps(record, indent=2, ensure_ascii=False))
+        return
+
+    output = convert_json(args.path, args.output)
+    print(f"Compact dataset written: {output}")
+
+
+if __name__ == "__main__":
+    main()
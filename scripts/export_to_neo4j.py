@@ -0,0 +1,413 @@
+"""Export the book datasets and canonical registry as neo4j-admin import CSVs.
+
+Usage:
+    python scripts/export_to_neo4j.py
+    python scripts/export_to_neo4j.py --output build/neo4j-import --container-dir /import
+    python scripts/export_to_neo4j.py --validate-only
+
+Writes gzip-compressed node and relationship CSVs under `build/neo4j-import/`
+in the header format `neo4j-admin database import full` expects, plus an
+`import.args` file with the matching command-line options:
+    - ingredients.csv.gz         (:Ingredient)
+    - affinity_sets.csv.gz       (:AffinitySet)
+    - pairs_with.csv.gz          [:PAIRS_WITH]
+    - substitutes_with.csv.gz    [:SUBSTITUTES_WITH]
+    - affinity_contains.csv.gz   [:CONTAINS]
+
+Rows are written as the sources are read; only the ID sets and the (small)
+affinity-set table are held in memory. Node IDs are 63-bit hashes of the slug,
+so an ingredient keeps its ID across exports regardless of what else changed.
+Every export is validated offline before the command is printed.
+"""
+
+from __future__ import annotations
+
+import argparse
+import csv
+import gzip
+import hashlib
+import io
+import json
+import os
+import sys
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Set, Tuple
+
+from build_canonical_registry import ROOT, SOURCE_FILES, load_registry_entries
+from canonical_names import canonicalize_name, slugify
+from parse_flavor_bible import TIER_PRIORITY
+
+OUTPUT_DIR = ROOT / "build" / "neo4j-import"
+CONTAINER_DIR = "/import"
+ARRAY_DELIMITER = "|"
+
+NODE_FILES: Dict[str, Tuple[str, List[str]]] = {
+    "Ingredient": (
+        "ingredients.csv.gz",
+        [
+            "ingredient_id:ID(Ingredient)",
+            "slug",
+            "name",
+            "display_names:string[]",
+            "aliases:string[]",
+            "sources:string[]",
+            "in_registry:boolean",
+        ],
+    ),
+    "AffinitySet": (
+        "affinity_sets.csv.gz",
+        [
+            "affinity_id:ID(AffinitySet)",
+            "slug",
+            "name",
+            "size:int",
+            "occurrences:int",
+            "sources:string[]",
+        ],
+    ),
+}
+RELATIONSHIP_FILES: Dict[str, Tuple[str, List[str]]] = {
+    "PAIRS_WITH": (
+        "pairs_with.csv.gz",
+        [":START_ID(Ingredient)", ":END_ID(Ingredient)", "strength_tier", "rank_score:int", "source_book"],
+    ),
+    "SUBSTITUTES_WITH": (
+        "substitutes_with.csv.gz",
+        [":START_ID(Ingredient)", ":END_ID(Ingredient)", "text", "source_book"],
+    ),
+    "CONTAINS": (
+        "affinity_contains.csv.gz",
+        [":START_ID(AffinitySet)", ":END_ID(Ingredient)", "position_index:int"],
+    ),
+}
+VALUE_TYPES = {"int", "long", "boolean", "string", "float", "double"}
+
+
+def stable_id(namespace: str, key: str) -> int:
+    digest = hashlib.blake2b(f"{namespace}:{key}".encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "big") >> 1
+
+
+def source_book(source: str) -> str:
+    """Controlled `source_book` vocabulary from docs/graph-taxonomy.md."""
+    return source.replace("-", "_")
+
+
+def array_field(values: Iterable[str]) -> str:
+    return ARRAY_DELIMITER.join(value.replace(ARRAY_DELIMITER, "/") for value in values if value)
+
+
+class GzipCsvWriter:
+    """CSV rows into ``<path>.tmp``; renamed over ``path`` by ``commit()``."""
+
+    def __init__(self, path: Path, header: Sequence[str]) -> None:
+        self.path = path
+        self.rows = 0
+        self._tmp = path.with_name(f"{path.name}.tmp")
+        self._raw = self._tmp.open("wb")
+        # mtime=0 keeps the archives byte-identical across runs.
+        self._gzip = gzip.GzipFile(filename="", mode="wb", fileobj=self._raw, mtime=0)
+        self._text = io.TextIOWrapper(self._gzip, encoding="utf-8", newline="")
+        self._writer = csv.writer(self._text, lineterminator="\n")
+        self._writer.writerow(header)
+
+    def write(self, row: Sequence[object]) -> None:
+        self._writer.writerow(row)
+        self.rows += 1
+
+    def _close(self) -> None:
+        self._text.close()
+        self._raw.close()
+
+    def commit(self) -> None:
+        self._close()
+        os.replace(self._tmp, self.path)
+
+    def discard(self) -> None:
+        self._close()
+        self._tmp.unlink(missing_ok=True)
+
+
+@dataclass
+class AffinityNode:
+    node_id: int
+    slug: str
+    items: Tuple[str, ...]
+    occurrences: int = 0
+    sources: Set[str] = field(default_factory=set)
+
+
+class Neo4jExport:
+    def __init__(self, output_dir: Path) -> None:
+        output_dir.mkdir(parents=True, exist_ok=True)
+        self.output_dir = output_dir
+        self.writers: Dict[str, GzipCsvWriter] = {}
+        for label, (name, header) in {**NODE_FILES, **RELATIONSHIP_FILES}.items():
+            self.writers[label] = GzipCsvWriter(output_dir / name, header)
+        self.ingredient_ids: Dict[int, str] = {}
+        self.affinities: Dict[Tuple[str, ...], AffinityNode] = {}
+
+    def __enter__(self) -> "Neo4jExport":
+        return self
+
+    def __exit__(self, exc_type: Optional[type], exc: Optional[BaseException], tb: object) -> None:
+        if exc_type is not None:
+            for writer in self.writers.values():
+                writer.discard()
+            return
+        for node in self.affinities.values():
+            self.writers["AffinitySet"].write(
+                [
+                    node.node_id,
+                    node.slug,
+                    " + ".join(node.items),
+                    len(node.items),
+                    node.occurrences,
+                    array_field(sorted(node.sources)),
+                ]
+            )
+        for writer in self.writers.values():
+            writer.commit()
+
+    def counts(self) -> Dict[str, int]:
+        return {label: writer.rows for label, writer in self.writers.items()}
+
+    def ingredient(
+        self,
+        name: str,
+        display_names: Sequence[str] = (),
+        aliases: Sequence[str] = (),
+        sources: Sequence[str] = (),
+        in_registry: bool = False,
+    ) -> Optional[int]:
+        slug = slugify(name)
+        if not slug:
+            return None
+        node_id = stable_id("ingredient", slug)
+        known = self.ingredient_ids.get(node_id)
+        if known is None:
+            self.ingredient_ids[node_id] = slug
+            self.writers["Ingredient"].write(
+                [
+                    node_id,
+                    slug,
+                    name,
+                    array_field(display_names),
+                    array_field(aliases),
+                    array_field(source_book(source) for source in sources),
+                    "true" if in_registry else "false",
+                ]
+            )
+        elif known != slug:
+            raise ValueError(f"Ingredient ID collision between {known!r} and {slug!r}")
+        return node_id
+
+    def add_registry(self, entries: Iterable[Dict[str, object]]) -> None:
+        for entry in entries:
+            self.ingredient(
+                str(entry["canonical"]),
+                entry.get("display_names") or [],
+                entry.get("aliases") or [],
+                entry.get("sources") or [],
+                in_registry=True,
+            )
+
+    def add_book(self, records: Iterable[Dict[str, object]], source: str) -> None:
+        book = source_book(source)
+        for record in records:
+            name = record.get("ingredient")
+            if not name:
+                continue
+            start = self.ingredient(name, [record.get("display_name") or ""])
+            seen: Set[int] = set()
+            for pairing in record.get("pairings") or []:
+                target = pairing.get("ingredient")
+                end = self.ingredient(target, [pairing.get("display_name") or ""]) if target else None
+                if end is None or end == start or end in seen:
+                    continue
+                seen.add(end)
+                tier = pairing.get("tier") or "recommended"
+                self.writers["PAIRS_WITH"].write([start, end, tier, TIER_PRIORITY.get(tier, 0), book])
+
+            for text in (record.get("metadata") or {}).get("possible_substitutes") or []:
+                canonical, original = canonicalize_name(text)
+                end = self.ingredient(canonical) if canonical else None
+                if end is not None and end != start:
+                    self.writers["SUBSTITUTES_WITH"].write([start, end, original, book])
+
+            for affinity in record.get("flavor_affinities") or []:
+                self.add_affinity(affinity.get("items") or [], source)
+
+    def add_affinity(self, items: Sequence[str], source: str) -> None:
+        members = tuple(dict.fromkeys(item for item in items if slugify(item)))
+        if len(members) < 2:
+            return
+        key = tuple(sorted(members))
+        node = self.affinities.get(key)
+        if node is None:
+            slug = slugify(" ".join(key))
+            node = AffinityNode(stable_id("affinity", slug), slug, members)
+            self.affinities[key] = node
+            for position, item in enumerate(members):
+                self.writers["CONTAINS"].write([node.node_id, self.ingredient(item), position])
+        node.occurrences += 1
+        node.sources.add(source_book(source))
+
+
+def export(
+    output_dir: Path,
+    registry: Iterable[Dict[str, object]],
+    book_files: Sequence[Tuple[str, Path]] = tuple(SOURCE_FILES),
+) -> Dict[str, int]:
+    with Neo4jExport(output_dir) as exporter:
+        exporter.add_registry(registry)
+        for source, path in book_files:
+            if path.exists():
+                exporter.add_book(json.loads(path.read_text(encoding="utf-8")), source)
+    return exporter.counts()
+
+
+def import_arguments(container_dir: str) -> List[str]:
+    base = container_dir.rstrip("/")
+    args = ["--overwrite-destination", "--id-type=INTEGER", f"--array-delimiter={ARRAY_DELIMITER}"]
+    args += [f"--nodes={label}={base}/{name}" for label, (name, _) in NODE_FILES.items()]
+    args += [f"--relationships={rel_type}={base}/{name}" for rel_type, (name, _) in RELATIONSHIP_FILES.items()]
+    return args
+
+
+def iter_csv_gz(path: Path) -> Iterator[List[str]]:
+    with gzip.open(path, "rt", encoding="utf-8", newline="") as handle:
+        yield from csv.reader(handle)
+
+
+def parse_header(header: Sequence[str]) -> Tuple[List[Tuple[str, str, Optional[str]]], List[str]]:
+    """Split ``name:TYPE(group)`` columns into ``(name, type, group)`` triples."""
+    columns: List[Tuple[str, str, Optional[str]]] = []
+    errors: List[str] = []
+    for column in header:
+        name, _, spec = column.partition(":")
+        group: Optional[str] = None
+        if "(" in spec and spec.endswith(")"):
+            spec, group = spec[:-1].split("(", 1)
+        spec = spec or "string"
+        base = spec[:-2] if spec.endswith("[]") else spec
+        if spec not in ("ID", "START_ID", "END_ID", "LABEL", "TYPE") and base not in VALUE_TYPES:
+            errors.append(f"unknown column type in {column!r}")
+        columns.append((name, spec, group))
+    return columns, errors
+
+
+def validate_value(value: str, spec: str) -> bool:
+    if spec.endswith("[]"):
+        return all(validate_value(item, spec[:-2]) for item in value.split(ARRAY_DELIMITER)) if value else True
+    if spec in ("int", "long", "ID", "START_ID", "END_ID"):
+        return value.lstrip("-").isdigit()
+    if spec == "boolean":
+        return value in ("true", "false")
+    if spec in ("float", "double"):
+        try:
+            float(value)
+        except ValueError:
+            return False
+    return True
+
+
+def validate_import(output_dir: Path, max_errors: int = 50) -> List[str]:
+    """Check the CSVs the way neo4j-admin would, without a database.
+
+    Verifies header syntax, one ``:ID`` per node file, field counts, typed
+    values, ID uniqueness per ID space and that every relationship endpoint
+    exists.
+    """
+    errors: List[str] = []
+    ids: Dict[str, Set[int]] = {}
+
+    def check_file(
+        name: str, expected: Sequence[str], is_node: bool
+    ) -> Iterator[Tuple[int, List[str], List[Tuple[str, str, Optional[str]]]]]:
+        path = output_dir / name
+        if not path.exists():
+            errors.append(f"{name}: missing")
+            return
+        rows = iter_csv_gz(path)
+        header = next(rows, None)
+        if header is None:
+            errors.append(f"{name}: empty file")
+            return
+        if list(header) != list(expected):
+            errors.append(f"{name}: header {header} does not match {list(expected)}")
+        columns, header_errors = parse_header(header)
+        errors.extend(f"{name}: {message}" for message in header_errors)
+        specs = [spec for _, spec, _ in columns]
+        required = ["ID"] if is_node else ["START_ID", "END_ID"]
+        for spec in required:
+            if specs.count(spec) != 1:
+                errors.append(f"{name}: expected exactly one :{spec} column")
+                return
+        for line, row in enumerate(rows, start=2):
+            if len(row) != len(columns):
+                errors.append(f"{name}:{line}: {len(row)} fields, header has {len(columns)}")
+                continue
+            bad = [
+                columns[index][0] or columns[index][1]
+                for index, value in enumerate(row)
+                if not validate_value(value, columns[index][1])
+            ]
+            if bad:
+                errors.append(f"{name}:{line}: invalid value for {', '.join(bad)}")
+                continue
+            yield line, row, columns
+
+    for label, (name, header) in NODE_FILES.items():
+        for line, row, columns in check_file(name, header, True):
+            index = next(i for i, (_, spec, _) in enumerate(columns) if spec == "ID")
+            space = ids.setdefault(columns[index][2] or label, set())
+            node_id = int(row[index])
+            if node_id in space:
+                errors.append(f"{name}:{line}: duplicate ID {node_id}")
+            space.add(node_id)
+
+    for rel_type, (name, header) in RELATIONSHIP_FILES.items():
+        for line, row, columns in check_file(name, header, False):
+            for index, (_, spec, group) in enumerate(columns):
+                if spec in ("START_ID", "END_ID") and int(row[index]) not in ids.get(group or "", set()):
+                    errors.append(f"{name}:{line}: :{spec} {row[index]} not found in {group}")
+
+    if len(errors) > max_errors:
+        errors = errors[:max_errors] + [f"... {len(errors) - max_errors} more"]
+    return errors
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Export neo4j-admin import CSVs.")
+    parser.add_argument(
+        "--output", type=Path, default=OUTPUT_DIR, help="Directory for the CSVs (default: build/neo4j-import)"
+    )
+    parser.add_argument(
+        "--container-dir",
+        default=CONTAINER_DIR,
+        help="Where the output directory is mounted inside the Neo4j container (used in import.args)",
+    )
+    parser.add_argument("--validate-only", action="store_true", help="Validate an existing export without rewriting it")
+    args = parser.parse_args()
+
+    if not args.validate_only:
+        counts = export(args.output, load_registry_entries())
+        (args.output / "import.args").write_text("\n".join(import_arguments(args.container_dir)) + "\n", encoding="utf-8")
+        for label, count in counts.items():
+            print(f"{label}: {count}")
+
+    errors = validate_import(args.output)
+    if errors:
+        print("[ERROR] Import CSVs failed validation:", file=sys.stderr)
+        for message in errors:
+            print(f"- {message}", file=sys.stderr)
+        sys.exit(1)
+    print(f"Validated {args.output}")
+    if not args.validate_only:
+        print(f"Import with: neo4j-admin database import full neo4j @{args.container_dir.rstrip('/')}/import.args")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,358 @@
+"""In-memory pairing graph over both books and the Flavor Matrix.
+
+Usage:
+    python scripts/flavor_graph.py basil
+    python scripts/flavor_graph.py basil --reverse --limit 20
+    python scripts/flavor_graph.py --benchmark
+
+Every canonical ingredient name gets an integer id. Pairings are stored as a
+CSR (compressed sparse row) adjacency: ``offsets[i]:offsets[i + 1]`` slices the
+parallel ``targets`` / ``weights`` / ``masks`` arrays for ingredient ``i``.
+Rows are sorted by target id so edge checks are a binary search, and a
+precomputed ``ranked`` permutation makes top-N a slice. A transposed copy of
+the structure answers "what lists X as a pairing?".
+
+When several sources list the same pairing the edge keeps the highest tier
+weight and ORs the source bits together.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import time
+from array import array
+from bisect import bisect_left
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+
+from build_canonical_registry import ROOT, SOURCE_FILES
+from canonical_names import canonicalize_name
+from json_stream import iter_json_records
+from parse_flavor_bible import TIER_PRIORITY
+
+MATRIX_DIR = ROOT / "docs" / "flavor-matrix-processed"
+MATRIX_SOURCE = "flavor-matrix"
+
+SOURCE_BITS = {name: 1 << index for index, name in enumerate([name for name, _ in SOURCE_FILES] + [MATRIX_SOURCE])}
+# Book tiers are shifted up by one so even "recommended" edges carry weight.
+TIER_WEIGHTS = {tier: priority + 1 for tier, priority in TIER_PRIORITY.items()}
+MATRIX_TIER_WEIGHTS = {"best_pairings": TIER_WEIGHTS["classic"], "surprise_pairings": TIER_WEIGHTS["recommended"]}
+
+
+def source_names(mask: int) -> List[str]:
+    return [name for name, bit in SOURCE_BITS.items() if mask & bit]
+
+
+class Neighbor(NamedTuple):
+    ingredient: str
+    weight: int
+    mask: int
+
+    @property
+    def sources(self) -> List[str]:
+        return source_names(self.mask)
+
+
+def iter_matrix_records(path: Path) -> Iterator[Dict[str, object]]:
+    """Yield Flavor Matrix records from ``path``.
+
+    The exports are not uniform: some files hold several concatenated JSON
+    arrays, others wrap nested lists (and name-keyed objects) in an
+    ``{"entries": ...}`` envelope; `json_stream` reads the file incrementally.
+    Entries that are not objects are skipped here (`process_flavor_matrix`
+    reports them).
+    """
+    return (record for record in iter_json_records(path) if isinstance(record, dict))
+
+
+class GraphBuilder:
+    """Accumulates weighted, source-tagged edges before freezing them into CSR."""
+
+    def __init__(self) -> None:
+        self.names: List[str] = []
+        self.ids: Dict[str, int] = {}
+        self.edges: Dict[Tuple[int, int], Tuple[int, int]] = {}
+
+    def node(self, name: str) -> int:
+        node_id = self.ids.get(name)
+        if node_id is None:
+            node_id = len(self.names)
+            self.ids[name] = node_id
+            self.names.append(name)
+        return node_id
+
+    def add_edge(self, source: str, target: str, weight: int, bit: int) -> None:
+        if not source or not target or source == target:
+            return
+        key = (self.node(source), self.node(target))
+        current = self.edges.get(key)
+        if current is None:
+            self.edges[key] = (weight, bit)
+        else:
+            self.edges[key] = (max(current[0], weight), current[1] | bit)
+
+    def add_book(self, records: Iterable[Dict[str, object]], source: str) -> None:
+        bit = SOURCE_BITS[source]
+        for record in records:
+            ingredient = record.get("ingredient")
+            if not ingredient:
+                continue
+            self.node(ingredient)
+            for pairing in record.get("pairings") or []:
+                weight = TIER_WEIGHTS.get(pairing.get("tier"), TIER_WEIGHTS["recommended"])
+                self.add_edge(ingredient, pairing.get("ingredient"), weight, bit)
+
+    def add_matrix(self, records: Iterable[Dict[str, object]]) -> None:
+        bit = SOURCE_BITS[MATRIX_SOURCE]
+        for record in records:
+            ingredient, _ = canonicalize_name(str(record.get("ingredient") or ""))
+            if not ingredient:
+                continue
+            self.node(ingredient)
+            for field_name, weight in MATRIX_TIER_WEIGHTS.items():
+                items = record.get(field_name)
+                if not isinstance(items, list):
+                    continue
+                for item in items:
+                    target, _ = canonicalize_name(str(item))
+                    self.add_edge(ingredient, target, weight, bit)
+
+    def build(self) -> "FlavorGraph":
+        node_count = len(self.names)
+        rank_names = self.names
+
+        def rank_key(edge: Tuple[int, int, int]) -> Tuple[int, int, str]:
+            other, weight, mask = edge
+            return (-weight, -bin(mask).count("1"), rank_names[other])
+
+        forward: List[List[Tuple[int, int, int]]] = [[] for _ in range(node_count)]
+        backward: List[List[Tuple[int, int, int]]] = [[] for _ in range(node_count)]
+        for (source, target), (weight, mask) in self.edges.items():
+            forward[source].append((target, weight, mask))
+            backward[target].append((source, weight, mask))
+
+        offsets = array("I", [0])
+        targets = array("I")
+        weights = array("B")
+        masks = array("B")
+        ranked = array("I")
+        for row in forward:
+            row.sort()
+            start = len(targets)
+            for target, weight, mask in row:
+                targets.append(target)
+                weights.append(weight)
+                masks.append(mask)
+            ranked.extend(start + index for index in sorted(range(len(row)), key=lambda index: rank_key(row[index])))
+            offsets.append(len(targets))
+
+        reverse_offsets = array("I", [0])
+        reverse_sources = array("I")
+        reverse_weights = array("B")
+        reverse_masks = array("B")
+        for row in backward:
+            row.sort(key=rank_key)
+            for source, weight, mask in row:
+                reverse_sources.append(source)
+                reverse_weights.append(weight)
+                reverse_masks.append(mask)
+            reverse_offsets.append(len(reverse_sources))
+
+        return FlavorGraph(
+            list(self.names),
+            dict(self.ids),
+            (offsets, targets, weights, masks, ranked),
+            (reverse_offsets, reverse_sources, reverse_weights, reverse_masks),
+        )
+
+
+class FlavorGraph:
+    """Read-only pairing graph; build one with ``FlavorGraph.load()``."""
+
+    def __init__(
+        self,
+        names: List[str],
+        ids: Dict[str, int],
+        forward: Tuple[array, array, array, array, array],
+        backward: Tuple[array, array, array, array],
+    ) -> None:
+        self.names = names
+        self.ids = ids
+        self._offsets, self._targets, self._weights, self._masks, self._ranked = forward
+        self._reverse_offsets, self._reverse_sources, self._reverse_weights, self._reverse_masks = backward
+
+    @classmethod
+    def load(
+        cls,
+        book_files: Sequence[Tuple[str, Path]] = tuple(SOURCE_FILES),
+        matrix_dir: Optional[Path] = MATRIX_DIR,
+    ) -> "FlavorGraph":
+        builder = GraphBuilder()
+        for source, path in book_files:
+            if path.exists():
+                builder.add_book(json.loads(path.read_text(encoding="utf-8")), source)
+        if matrix_dir is not None and matrix_dir.exists():
+            for path in sorted(matrix_dir.glob("*.json")):
+                builder.add_matrix(iter_matrix_records(path))
+        return builder.build()
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def __contains__(self, name: object) -> bool:
+        return isinstance(name, str) and self.node_id(name) is not None
+
+    @property
+    def edge_count(self) -> int:
+        return len(self._targets)
+
+    def node_id(self, name: str) -> Optional[int]:
+        node_id = self.ids.get(name)
+        if node_id is None:
+            canonical, _ = canonicalize_name(name)
+            node_id = self.ids.get(canonical) if canonical else None
+        return node_id
+
+    def out_degree(self, name: str) -> int:
+        node_id = self.node_id(name)
+        return 0 if node_id is None else self._offsets[node_id + 1] - self._offsets[node_id]
+
+    def in_degree(self, name: str) -> int:
+        node_id = self.node_id(name)
+        return 0 if node_id is None else self._reverse_offsets[node_id + 1] - self._reverse_offsets[node_id]
+
+    def top_pairings(self, name: str, limit: Optional[int] = 10) -> List[Neighbor]:
+        """Pairings listed under ``name``, strongest tier first, then by source count."""
+        node_id = self.node_id(name)
+        if node_id is None:
+            return []
+        start, end = self._offsets[node_id], self._offsets[node_id + 1]
+        if limit is not None:
+            end = min(end, start + limit)
+        return [self._neighbor(edge) for edge in self._ranked[start:end]]
+
+    def paired_by(self, name: str, limit: Optional[int] = None) -> List[Neighbor]:
+        """Ingredients whose pairing lists mention ``name`` (the reverse lookup)."""
+        node_id = self.node_id(name)
+        if node_id is None:
+            return []
+        start, end = self._reverse_offsets[node_id], self._reverse_offsets[node_id + 1]
+        if limit is not None:
+            end = min(end, start + limit)
+        names, sources, weights, masks = self.names, self._reverse_sources, self._reverse_weights, self._reverse_masks
+        return [Neighbor(names[sources[edge]], weights[edge], masks[edge]) for edge in range(start, end)]
+
+    def edge(self, name: str, other: str) -> Optional[Neighbor]:
+        source, target = self.node_id(name), self.node_id(other)
+        if source is None or target is None:
+            return None
+        position = self._find(source, target)
+        return None if position is None else self._neighbor(position)
+
+    def pairs_with(self, name: str, other: str) -> bool:
+        return self.edge(name, other) is not None
+
+    def is_mutual(self, name: str, other: str) -> bool:
+        """True when each ingredient lists the other as a pairing."""
+        source, target = self.node_id(name), self.node_id(other)
+        if source is None or target is None:
+            return False
+        return self._find(source, target) is not None and self._find(target, source) is not None
+
+    def mutual_pairings(self, name: str, limit: Optional[int] = None) -> List[Neighbor]:
+        node_id = self.node_id(name)
+        if node_id is None:
+            return []
+        result: List[Neighbor] = []
+        for edge in self._ranked[self._offsets[node_id] : self._offsets[node_id + 1]]:
+            if self._find(self._targets[edge], node_id) is not None:
+                result.append(self._neighbor(edge))
+                if limit is not None and len(result) >= limit:
+                    break
+        return result
+
+    def iter_edges(self) -> Iterator[Tuple[int, int, int, int]]:
+        """``(source_id, target_id, weight, mask)`` for every edge, row by row."""
+        for source in range(len(self.names)):
+            for edge in range(self._offsets[source], self._offsets[source + 1]):
+                yield source, self._targets[edge], self._weights[edge], self._masks[edge]
+
+    def _find(self, source: int, target: int) -> Optional[int]:
+        start, end = self._offsets[source], self._offsets[source + 1]
+        position = bisect_left(self._targets, target, start, end)
+        if position < end and self._targets[position] == target:
+            return position
+        return None
+
+    def _neighbor(self, edge: int) -> Neighbor:
+        return Neighbor(self.names[self._targets[edge]], self._weights[edge], self._masks[edge])
+
+
+def run_benchmark(repeat: int) -> None:
+    started = time.perf_counter()
+    graph = FlavorGraph.load()
+    build_seconds = time.perf_counter() - started
+    headings = [name for name in graph.names if graph.out_degree(name)]
+    print(f"Loaded {len(graph)} ingredients, {graph.edge_count} edges in {build_seconds * 1000:.1f} ms")
+    print(f"Benchmarking {len(headings)} ingredients with pairings, {repeat} pass(es)")
+
+    books = [json.loads(path.read_text(encoding="utf-8")) for _, path in SOURCE_FILES if path.exists()]
+    sample = headings[: min(len(headings), 50)]
+    started = time.perf_counter()
+    for name in sample:
+        [p["ingredient"] for records in books for r in records if r.get("ingredient") == name for p in r.get("pairings") or []]
+    scan = (time.perf_counter() - started) / max(len(sample), 1)
+    print(f"  {'list scan (baseline)':<24} {scan * 1e6:10.1f} us/query")
+
+    edges = [(name, neighbor.ingredient) for name in headings for neighbor in graph.top_pairings(name, None)]
+    stages = [
+        ("top_pairings(n=10)", headings, lambda name: graph.top_pairings(name, 10)),
+        ("paired_by", graph.names, graph.paired_by),
+        ("mutual_pairings", headings, graph.mutual_pairings),
+        ("is_mutual", edges, lambda pair: graph.is_mutual(*pair)),
+    ]
+    for label, items, query in stages:
+        best = float("inf")
+        for _ in range(repeat):
+            started = time.perf_counter()
+            for item in items:
+                query(item)
+            best = min(best, time.perf_counter() - started)
+        print(f"  {label:<24} {best / max(len(items), 1) * 1e6:10.2f} us/query ({len(items)} queries)")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Query the combined pairing graph.")
+    parser.add_argument("ingredient", nargs="?", help="Ingredient name to look up")
+    parser.add_argument("--limit", type=int, default=10, help="Number of pairings to print (0 = all)")
+    parser.add_argument("--reverse", action="store_true", help="List ingredients that pair with this one instead")
+    parser.add_argument("--mutual", action="store_true", help="Only list pairings confirmed in both directions")
+    parser.add_argument("--benchmark", action="store_true", help="Time queries over every ingredient")
+    parser.add_argument("--repeat", type=int, default=3, help="Benchmark passes (best one is reported)")
+    args = parser.parse_args()
+
+    if args.benchmark:
+        run_benchmark(max(args.repeat, 1))
+        return
+    if not args.ingredient:
+        parser.error("an ingredient is required unless --benchmark is given")
+
+    graph = FlavorGraph.load()
+    if args.ingredient not in graph:
+        print(f"[WARN] Ingredient not found: {args.ingredient}", file=sys.stderr)
+        sys.exit(1)
+    limit = args.limit or None
+    if args.reverse:
+        neighbors = graph.paired_by(args.ingredient, limit)
+    elif args.mutual:
+        neighbors = graph.mutual_pairings(args.ingredient, limit)
+    else:
+        neighbors = graph.top_pairings(args.ingredient, limit)
+    for neighbor in neighbors:
+        print(f"{neighbor.ingredient}\t{neighbor.weight}\t{','.join(neighbor.sources)}")
+
+
+if __name__ == "__main__":
+    main()
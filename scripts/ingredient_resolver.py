@@ -0,0 +1,265 @@
+"""Resolve free-form ingredient strings to canonical registry entries.
+
+Usage:
+    python scripts/ingredient_resolver.py scallions "Chiles, Jalapeño"
+    python scripts/ingredient_resolver.py --fuzzy "chilli peppers"
+    python scripts/ingredient_resolver.py --pairings --fuzzy
+
+Lookups go through hash maps built from `ingredient_registry.json`, in order:
+canonical name, the entries' own `normalized_key`, alias, and the alias's
+normalized key. The raw string is tried first, then its `canonicalize_name`
+form. Aliases shared by several entries are ambiguous and are not used, and
+names a display name only cross-references ("see ...", "see also ...") are
+not aliases at all. With ``fuzzy=True`` anything still unresolved falls back
+to a trigram index over every canonical name and alias, scored with the Dice
+coefficient.
+
+`--pairings` resolves every pairing target in both books with `resolve_many()`
+and reports timing and the most frequent unresolved targets.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import time
+from collections import Counter
+from typing import Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
+
+from build_canonical_registry import (
+    SOURCE_FILES,
+    cross_references,
+    heading_fragments,
+    load_registry_entries,
+    normalized_key,
+)
+from canonical_names import canonicalize_name
+
+DEFAULT_THRESHOLD = 0.6
+_ALIAS_PREFIXES = ("see ", "also ")
+
+
+class Resolution(NamedTuple):
+    query: str
+    canonical: Optional[str]
+    method: str
+    score: float = 1.0
+
+
+def trigrams(text: str) -> Set[str]:
+    padded = f"  {text} "
+    return {padded[index : index + 3] for index in range(len(padded) - 2)}
+
+
+def _alias_text(alias: str) -> str:
+    for prefix in _ALIAS_PREFIXES:
+        if alias.startswith(prefix):
+            return alias[len(prefix) :]
+    return alias
+
+
+class IngredientResolver:
+    def __init__(self, entries: Iterable[Dict[str, object]]) -> None:
+        self.entries: Dict[str, Dict[str, object]] = {}
+        self.canonical: Dict[str, str] = {}
+        self.aliases: Dict[str, str] = {}
+        self.normalized: Dict[str, str] = {}
+        self.alias_keys: Dict[str, str] = {}
+        self.ambiguous: Dict[str, List[str]] = {}
+        alias_owners: Dict[str, Set[str]] = {}
+        key_owners: Dict[str, Set[str]] = {}
+        alias_key_owners: Dict[str, Set[str]] = {}
+        for entry in entries:
+            name = str(entry["canonical"])
+            self.entries[name] = entry
+            self.canonical[name] = name
+            key_owners.setdefault(str(entry.get("normalized_key") or normalized_key(name)), set()).add(name)
+            references: Set[str] = set()
+            fragments: Set[str] = set()
+            for display_name in entry.get("display_names") or []:
+                references |= cross_references(str(display_name))
+                fragments |= heading_fragments(str(display_name))
+            for alias in entry.get("aliases") or []:
+                alias = _alias_text(str(alias))
+                # Cross-references name other entries, and pieces of the heading
+                # itself ("lettuce" from "LETTUCE, BUTTER") are not synonyms.
+                if alias in references or set(normalized_key(alias).split()) <= fragments:
+                    continue
+                alias_owners.setdefault(alias, set()).add(name)
+
+        for key, owners in key_owners.items():
+            if len(owners) == 1:
+                self.normalized[key] = next(iter(owners))
+        for alias, owners in alias_owners.items():
+            if len(owners) == 1:
+                self.aliases[alias] = next(iter(owners))
+                alias_key_owners.setdefault(normalized_key(alias), set()).update(owners)
+            else:
+                self.ambiguous[alias] = sorted(owners)
+        for key, owners in alias_key_owners.items():
+            if len(owners) == 1 and key not in key_owners:
+                self.alias_keys[key] = next(iter(owners))
+
+        self._exact_cache: Dict[str, Resolution] = {}
+        self._fuzzy_cache: Dict[Tuple[str, float], Resolution] = {}
+        self._labels: Optional[List[Tuple[str, str]]] = None
+        self._sizes: List[int] = []
+        self._postings: Dict[str, List[int]] = {}
+
+    @classmethod
+    def load(cls) -> "IngredientResolver":
+        return cls(load_registry_entries())
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def _exact(self, text: str) -> Optional[Tuple[str, str]]:
+        if text in self.canonical:
+            return self.canonical[text], "canonical"
+        key = normalized_key(text)
+        if key in self.normalized:
+            return self.normalized[key], "normalized"
+        if text in self.aliases:
+            return self.aliases[text], "alias"
+        if key in self.alias_keys:
+            return self.alias_keys[key], "alias"
+        return None
+
+    def _build_trigrams(self) -> None:
+        labels = [(name, name) for name in self.canonical] + list(self.aliases.items())
+        postings: Dict[str, List[int]] = {}
+        sizes = []
+        for label_id, (label, _) in enumerate(labels):
+            grams = trigrams(label)
+            sizes.append(len(grams))
+            for gram in grams:
+                postings.setdefault(gram, []).append(label_id)
+        self._labels = labels
+        self._sizes = sizes
+        self._postings = postings
+
+    def fuzzy(self, text: str, threshold: float = DEFAULT_THRESHOLD) -> Optional[Tuple[str, float]]:
+        """Best canonical name for ``text`` by trigram Dice score, if any reaches ``threshold``."""
+        if self._labels is None:
+            self._build_trigrams()
+        grams = trigrams(text)
+        shared: Counter = Counter()
+        for gram in grams:
+            shared.update(self._postings.get(gram, ()))
+        best: Optional[Tuple[str, float]] = None
+        size = len(grams)
+        for label_id, count in shared.items():
+            score = 2 * count / (size + self._sizes[label_id])
+            if score < threshold:
+                continue
+            canonical = self._labels[label_id][1]
+            if best is None or (score, canonical) > (best[1], best[0]):
+                best = (canonical, score)
+        return best
+
+    def resolve(self, name: str, fuzzy: bool = False, threshold: float = DEFAULT_THRESHOLD) -> Resolution:
+        # Exact results do not depend on the fuzzy options; fuzzy fallbacks are
+        # cached per threshold so they never leak into exact-only lookups.
+        resolution = self._exact_cache.get(name)
+        if resolution is None:
+            match = self._exact(name)
+            if match is None:
+                cleaned, _ = canonicalize_name(name)
+                if cleaned:
+                    match = self._exact(cleaned)
+            if match is not None:
+                resolution = Resolution(name, match[0], match[1])
+            else:
+                resolution = Resolution(name, None, "unresolved", 0.0)
+            self._exact_cache[name] = resolution
+        if resolution.canonical is not None or not fuzzy:
+            return resolution
+
+        key = (name, threshold)
+        fuzzy_resolution = self._fuzzy_cache.get(key)
+        if fuzzy_resolution is None:
+            cleaned, _ = canonicalize_name(name)
+            found = self.fuzzy(cleaned, threshold) if cleaned else None
+            fuzzy_resolution = (
+                Resolution(name, found[0], "fuzzy", round(found[1], 3)) if found is not None else resolution
+            )
+            self._fuzzy_cache[key] = fuzzy_resolution
+        return fuzzy_resolution
+
+    def canonical_or_cleaned(self, name: str) -> str:
+        """Registry name for ``name``, or its cleaned form when it is not in the registry."""
+        resolution = self.resolve(name)
+        if resolution.canonical is not None:
+            return resolution.canonical
+        cleaned, _ = canonicalize_name(name)
+        return cleaned or ""
+
+    def resolve_many(
+        self, names: Iterable[str], fuzzy: bool = False, threshold: float = DEFAULT_THRESHOLD
+    ) -> Tuple[Dict[str, Resolution], Counter]:
+        """Resolve each distinct name once; returns the resolutions and a count of unresolved mentions."""
+        mentions = Counter(names)
+        resolved: Dict[str, Resolution] = {}
+        unresolved: Counter = Counter()
+        for name, count in mentions.items():
+            resolution = self.resolve(name, fuzzy, threshold)
+            resolved[name] = resolution
+            if resolution.canonical is None:
+                unresolved[name] = count
+        return resolved, unresolved
+
+
+def iter_pairing_targets() -> Iterable[str]:
+    for _, path in SOURCE_FILES:
+        if not path.exists():
+            continue
+        for record in json.loads(path.read_text(encoding="utf-8")):
+            for pairing in record.get("pairings") or []:
+                target = pairing.get("ingredient")
+                if target:
+                    yield target
+
+
+def report_pairings(resolver: IngredientResolver, fuzzy: bool, threshold: float, limit: int) -> None:
+    targets = list(iter_pairing_targets())
+    started = time.perf_counter()
+    resolved, unresolved = resolver.resolve_many(targets, fuzzy, threshold)
+    elapsed = (time.perf_counter() - started) * 1000
+    methods = Counter(resolution.method for resolution in resolved.values())
+    print(f"Resolved {len(targets)} pairing targets ({len(resolved)} distinct) in {elapsed:.0f} ms")
+    print("  " + ", ".join(f"{method}: {count}" for method, count in methods.most_common()))
+    print(f"Unresolved: {len(unresolved)} distinct, {sum(unresolved.values())} mentions")
+    for name, count in unresolved.most_common(limit):
+        print(f"  {count:>4}  {name}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Resolve ingredient strings against the canonical registry.")
+    parser.add_argument("names", nargs="*", help="Ingredient strings to resolve")
+    parser.add_argument("--fuzzy", action="store_true", help="Fall back to trigram matching")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD, help="Minimum Dice score for --fuzzy")
+    parser.add_argument("--pairings", action="store_true", help="Resolve every pairing target in both books")
+    parser.add_argument("--limit", type=int, default=20, help="Unresolved targets to list with --pairings")
+    args = parser.parse_args()
+
+    resolver = IngredientResolver.load()
+    if args.pairings:
+        report_pairings(resolver, args.fuzzy, args.threshold, args.limit)
+        return
+    if not args.names:
+        parser.error("give ingredient names or --pairings")
+    missing = 0
+    for name in args.names:
+        resolution = resolver.resolve(name, args.fuzzy, args.threshold)
+        if resolution.canonical is None:
+            missing += 1
+            print(f"[WARN] Unresolved: {name}", file=sys.stderr)
+            continue
+        print(f"{name}\t{resolution.canonical}\t{resolution.method}\t{resolution.score:g}")
+    if missing:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
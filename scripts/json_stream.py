@@ -0,0 +1,222 @@
+"""Incremental JSON reader that yields records without loading whole files.
+
+`iter_json_records(path)` reads the file chunk by chunk and yields the
+entries of its record arrays. Arrays, and *envelope* objects (objects whose
+first member is an array or object rather than the record key, ``ingredient``
+by default), are unwrapped; anything else found inside them is an entry and
+is yielded whole, without looking inside it. The same reader therefore handles
+a plain array of records, several concatenated JSON documents,
+``{"entries": [[...], ...]}`` and name-keyed objects, and an object with a
+misspelt key, or a stray number, still reaches the caller.
+
+Containers that fit in the current chunk are decoded with `json`'s C scanner;
+only those spanning a chunk boundary are tokenised here. An object is
+classified by its first member -- a record if that is the record key or a
+scalar, an envelope otherwise -- so the streaming path can decide before the
+object closes and still agrees with the decoded one. Arrays and envelopes are
+unwrapped as they stream past: each entry is yielded as soon as it is
+complete, and memory is bounded by the largest entry (or the current chunk)
+rather than the file.
+"""
+
+from __future__ import annotations
+
+import json
+import re
+from json.decoder import scanstring
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, TextIO, Tuple
+
+CHUNK_SIZE = 1 << 16
+
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+_NUMBER = re.compile(r"-?(?:0|[1-9]\d*)(?:\.\d+)?(?:[eE][-+]?\d+)?")
+_DELIMITER = re.compile(r"[\s,:\]}]")
+_LITERALS = {"true": True, "false": False, "null": None}
+
+START_OBJECT, END_OBJECT, START_ARRAY, END_ARRAY, KEY, VALUE = range(6)
+# What an open container expects next: first item or close, item after a
+# comma, colon after a key, value after a colon, comma or close after a value.
+_OPEN, _ITEM, _COLON, _MEMBER, _NEXT = range(5)
+
+
+def iter_events(stream: TextIO, chunk_size: int = CHUNK_SIZE) -> Iterator[Tuple[int, Any]]:
+    """Yield ``(event, value)`` pairs for a stream of one or more JSON documents."""
+    buffer = ""
+    position = 0
+    eof = False
+    # One [is_object, state] frame per open container; the state says which
+    # token may come next, so a missing comma or colon is an error.
+    open_containers: List[List[Any]] = []
+    decode = json.JSONDecoder().raw_decode
+
+    def fill() -> bool:
+        nonlocal buffer, position, eof
+        if eof:
+            return False
+        chunk = stream.read(chunk_size)
+        if not chunk:
+            eof = True
+            return False
+        buffer = buffer[position:] + chunk
+        position = 0
+        return True
+
+    def fail(message: str) -> json.JSONDecodeError:
+        return json.JSONDecodeError(message, buffer, position)
+
+    def start_value() -> None:
+        # Checks that a value may start here and moves the enclosing frame on.
+        if not open_containers:
+            return
+        frame = open_containers[-1]
+        if frame[1] == (_MEMBER if frame[0] else _OPEN) or (not frame[0] and frame[1] == _ITEM):
+            frame[1] = _NEXT
+            return
+        if frame[1] == _NEXT:
+            raise fail("Expecting ',' delimiter")
+        if frame[1] == _COLON:
+            raise fail("Expecting ':' delimiter")
+        raise fail("Expecting property name enclosed in double quotes")
+
+    while True:
+        position = _WHITESPACE.match(buffer, position).end()
+        if position >= len(buffer):
+            if fill():
+                continue
+            if open_containers:
+                raise fail("Unexpected end of data")
+            return
+
+        char = buffer[position]
+        frame = open_containers[-1] if open_containers else None
+        if char == "{" or char == "[":
+            start_value()
+            # Containers that are already complete in the buffer are decoded
+            # in one C-level call; only those spanning a chunk boundary are
+            # tokenised event by event.
+            try:
+                value, position = decode(buffer, position)
+            except json.JSONDecodeError:
+                pass
+            else:
+                yield VALUE, value
+                continue
+            position += 1
+            is_object = char == "{"
+            open_containers.append([is_object, _OPEN])
+            yield (START_OBJECT if is_object else START_ARRAY), None
+        elif char == "}" or char == "]":
+            if frame is None or frame[0] != (char == "}") or frame[1] not in (_OPEN, _NEXT):
+                raise fail(f"Unexpected {char!r}")
+            position += 1
+            open_containers.pop()
+            yield (END_OBJECT if char == "}" else END_ARRAY), None
+        elif char == ",":
+            if frame is None or frame[1] != _NEXT:
+                raise fail("Unexpected ','")
+            position += 1
+            frame[1] = _ITEM
+        elif char == ":":
+            if frame is None or frame[1] != _COLON:
+                raise fail("Unexpected ':'")
+            position += 1
+            frame[1] = _MEMBER
+        elif char == '"':
+            try:
+                text, end = scanstring(buffer, position + 1)
+            except json.JSONDecodeError:
+                if fill():
+                    continue
+                raise
+            if frame is not None and frame[0] and frame[1] in (_OPEN, _ITEM):
+                frame[1] = _COLON
+                event = KEY
+            else:
+                start_value()
+                event = VALUE
+            position = end
+            yield event, text
+        else:
+            # A number or literal cut off at the end of the buffer needs more input.
+            if _DELIMITER.search(buffer, position) is None and fill():
+                continue
+            start_value()
+            match = _NUMBER.match(buffer, position)
+            if match is not None:
+                number = match.group()
+                position = match.end()
+                yield VALUE, float(number) if any(c in number for c in ".eE") else int(number)
+                continue
+            for literal, value in _LITERALS.items():
+                if buffer.startswith(literal, position):
+                    position += len(literal)
+                    yield VALUE, value
+                    break
+            else:
+                raise fail("Unexpected token")
+
+
+def _is_envelope(value: Dict[str, Any], key: str) -> bool:
+    for name, item in value.items():
+        return name != key and isinstance(item, (dict, list))
+    return False
+
+
+def _walk_records(value: Any, key: str) -> Iterator[Any]:
+    if isinstance(value, list):
+        for item in value:
+            yield from _walk_records(item, key)
+    elif isinstance(value, dict) and _is_envelope(value, key):
+        for item in value.values():
+            yield from _walk_records(item, key)
+    else:
+        yield value
+
+
+def iter_json_records(path: Path, key: str = "ingredient", chunk_size: int = CHUNK_SIZE) -> Iterator[Any]:
+    """Yield every entry of the record arrays in ``path``, in document order."""
+    with path.open(encoding="utf-8") as stream:
+        yield from iter_stream_records(stream, key, chunk_size)
+
+
+def iter_stream_records(stream: TextIO, key: str = "ingredient", chunk_size: int = CHUNK_SIZE) -> Iterator[Any]:
+    # ``None`` frames are arrays and envelopes being unwrapped as they stream
+    # past; the others are [container, pending key] for values built in
+    # memory. An object opened at streaming level starts as [None, pending
+    # key] and is settled by its first member, the same rule `_walk_records`
+    # applies to containers `iter_events` decodes in one piece.
+    stack: List[Optional[List[Any]]] = []
+
+    for event, value in iter_events(stream, chunk_size):
+        frame = stack[-1] if stack else None
+        if frame is not None and frame[0] is None and event != END_OBJECT:
+            if event == KEY:
+                if value == key:
+                    frame[0] = {}
+            elif event == VALUE and not isinstance(value, (dict, list)):
+                frame[0] = {}
+            else:
+                stack[-1] = frame = None
+        if event == KEY:
+            if frame is not None:
+                frame[1] = value
+        elif frame is None and event == START_ARRAY:
+            stack.append(None)
+        elif frame is None and event == START_OBJECT:
+            stack.append([None, None])
+        elif event == START_ARRAY or event == START_OBJECT:
+            stack.append([[] if event == START_ARRAY else {}, None])
+        else:
+            if event != VALUE:
+                value = stack.pop()
+                if value is None:
+                    continue
+                value = {} if value[0] is None else value[0]
+                frame = stack[-1] if stack else None
+            if frame is None:
+                yield from _walk_records(value, key)
+            elif isinstance(frame[0], dict):
+                frame[0][frame[1]] = value
+            else:
+                frame[0].append(value)
@@ -0,0 +1,301 @@
+"""Load the export CSVs into a running Neo4j with batched UNWIND/MERGE queries.
+
+Usage:
+    python scripts/export_to_neo4j.py
+    python scripts/load_to_neo4j.py --uri bolt://localhost:7687
+    python scripts/load_to_neo4j.py --dry-run --batch-size 2000
+
+Use this for incremental updates against the live container; for an empty
+database `neo4j-admin database import full` with the same files is faster.
+The script reads the files written by `export_to_neo4j.py` and:
+
+1. creates `slug` uniqueness constraints for every node label,
+2. MERGEs nodes in batches of `--batch-size` rows per transaction,
+3. MERGEs each relationship type in its own worker thread (one session per
+   worker on a shared driver pool); deadlocks between types are retried by
+   the driver's managed transactions. `--serial` loads one type at a time.
+
+Rows per second are reported per stage. Credentials come from `--auth` or the
+`NEO4J_AUTH` variable used by the compose stack (`user/password`). The
+`neo4j` driver is only imported when connecting; `--dry-run` records the
+transactions in memory instead.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from itertools import islice
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from export_to_neo4j import (
+    ARRAY_DELIMITER,
+    NODE_FILES,
+    OUTPUT_DIR,
+    RELATIONSHIP_FILES,
+    iter_csv_gz,
+    parse_header,
+)
+
+DEFAULT_URI = "bolt://localhost:7687"
+DEFAULT_BATCH_SIZE = 5000
+# Relationship properties that identify an edge, so reloading a source
+# updates its edges instead of duplicating them.
+RELATIONSHIP_KEYS = {"PAIRS_WITH": ("source_book",), "SUBSTITUTES_WITH": ("source_book",), "CONTAINS": ()}
+
+Row = Dict[str, Any]
+
+
+@dataclass
+class StageResult:
+    name: str
+    rows: int
+    batches: int
+    seconds: float
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows / self.seconds if self.seconds else 0.0
+
+
+def convert_value(value: str, spec: str) -> Any:
+    if spec.endswith("[]"):
+        return [convert_value(item, spec[:-2]) for item in value.split(ARRAY_DELIMITER)] if value else []
+    if spec in ("int", "long", "ID", "START_ID", "END_ID"):
+        return int(value)
+    if spec == "boolean":
+        return value == "true"
+    if spec in ("float", "double"):
+        return float(value)
+    return value
+
+
+def iter_typed_rows(path: Path) -> Iterator[Tuple[Dict[str, int], Row]]:
+    """Yield ``(ids, properties)`` per CSV row; ``ids`` maps ID/START_ID/END_ID to values."""
+    rows = iter_csv_gz(path)
+    columns, errors = parse_header(next(rows))
+    if errors:
+        raise ValueError(f"{path.name}: {'; '.join(errors)}")
+    for row in rows:
+        ids: Dict[str, int] = {}
+        properties: Row = {}
+        for (name, spec, _), value in zip(columns, row):
+            converted = convert_value(value, spec)
+            if spec in ("ID", "START_ID", "END_ID"):
+                ids[spec] = converted
+            if name:
+                properties[name] = converted
+        yield ids, properties
+
+
+def batched(rows: Iterable[Row], size: int) -> Iterator[List[Row]]:
+    iterator = iter(rows)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+def constraint_query(label: str) -> str:
+    name = f"{label.lower()}_slug_unique"
+    return f"CREATE CONSTRAINT {name} IF NOT EXISTS FOR (n:{label}) REQUIRE n.slug IS UNIQUE"
+
+
+def node_query(label: str) -> str:
+    return f"UNWIND $rows AS row MERGE (n:{label} {{slug: row.slug}}) SET n += row.properties"
+
+
+def relationship_query(rel_type: str, start_label: str, end_label: str) -> str:
+    keys = ", ".join(f"{key}: row.properties.{key}" for key in RELATIONSHIP_KEYS.get(rel_type, ()))
+    pattern = f"[r:{rel_type} {{{keys}}}]" if keys else f"[r:{rel_type}]"
+    return (
+        f"UNWIND $rows AS row "
+        f"MATCH (a:{start_label} {{slug: row.start}}) "
+        f"MATCH (b:{end_label} {{slug: row.end}}) "
+        f"MERGE (a)-{pattern}->(b) SET r += row.properties"
+    )
+
+
+def endpoint_labels(header: Sequence[str]) -> Tuple[str, str]:
+    columns, _ = parse_header(header)
+    groups = {spec: group for _, spec, group in columns}
+    return groups["START_ID"] or "", groups["END_ID"] or ""
+
+
+class RecordingResult:
+    def consume(self) -> None:
+        return None
+
+
+class RecordingTransaction:
+    def __init__(self, driver: "RecordingDriver") -> None:
+        self._driver = driver
+
+    def run(self, query: str, **parameters: Any) -> RecordingResult:
+        self._driver.record(query, parameters)
+        return RecordingResult()
+
+
+class RecordingSession:
+    def __init__(self, driver: "RecordingDriver") -> None:
+        self._driver = driver
+
+    def __enter__(self) -> "RecordingSession":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        return None
+
+    def run(self, query: str, **parameters: Any) -> RecordingResult:
+        self._driver.record(query, parameters)
+        return RecordingResult()
+
+    def execute_write(self, work: Callable[..., Any], *args: Any) -> Any:
+        return work(RecordingTransaction(self._driver), *args)
+
+
+class RecordingDriver:
+    """Stand-in for ``neo4j.Driver`` that records each query and its row count."""
+
+    def __init__(self) -> None:
+        self.transactions: List[Tuple[str, int]] = []
+        self._lock = threading.Lock()
+
+    def session(self, **_config: Any) -> RecordingSession:
+        return RecordingSession(self)
+
+    def record(self, query: str, parameters: Dict[str, Any]) -> None:
+        with self._lock:
+            self.transactions.append((query, len(parameters.get("rows", ()))))
+
+    def close(self) -> None:
+        return None
+
+
+def connect(uri: str, auth: Optional[str]) -> Any:
+    try:
+        from neo4j import GraphDatabase
+    except ImportError:
+        print("[ERROR] The neo4j driver is required: pip install neo4j (or use --dry-run)", file=sys.stderr)
+        sys.exit(1)
+    credentials = None
+    if auth and auth.lower() != "none":
+        user, _, password = auth.partition("/")
+        credentials = (user, password)
+    driver = GraphDatabase.driver(uri, auth=credentials)
+    driver.verify_connectivity()
+    return driver
+
+
+class Loader:
+    def __init__(self, driver: Any, source_dir: Path, batch_size: int, database: Optional[str] = None) -> None:
+        self.driver = driver
+        self.source_dir = source_dir
+        self.batch_size = max(batch_size, 1)
+        self.session_config = {"database": database} if database else {}
+        self.slugs: Dict[str, Dict[int, str]] = {}
+
+    def _write_batches(self, name: str, query: str, rows: Iterable[Row]) -> StageResult:
+        started = time.perf_counter()
+        total = batches = 0
+        with self.driver.session(**self.session_config) as session:
+            for batch in batched(rows, self.batch_size):
+                session.execute_write(lambda tx, chunk: tx.run(query, rows=chunk).consume(), batch)
+                total += len(batch)
+                batches += 1
+        return StageResult(name, total, batches, time.perf_counter() - started)
+
+    def create_constraints(self) -> None:
+        with self.driver.session(**self.session_config) as session:
+            for label in NODE_FILES:
+                session.run(constraint_query(label)).consume()
+
+    def load_nodes(self) -> List[StageResult]:
+        results = []
+        for label, (name, _) in NODE_FILES.items():
+            slugs = self.slugs.setdefault(label, {})
+
+            def rows(path: Path = self.source_dir / name, slugs: Dict[int, str] = slugs) -> Iterator[Row]:
+                for ids, properties in iter_typed_rows(path):
+                    slugs[ids["ID"]] = properties["slug"]
+                    yield {"slug": properties["slug"], "properties": properties}
+
+            results.append(self._write_batches(label, node_query(label), rows()))
+        return results
+
+    def _relationship_stage(self, rel_type: str) -> StageResult:
+        name, header = RELATIONSHIP_FILES[rel_type]
+        start_label, end_label = endpoint_labels(header)
+        start_slugs, end_slugs = self.slugs[start_label], self.slugs[end_label]
+
+        def rows() -> Iterator[Row]:
+            for ids, properties in iter_typed_rows(self.source_dir / name):
+                yield {
+                    "start": start_slugs[ids["START_ID"]],
+                    "end": end_slugs[ids["END_ID"]],
+                    "properties": properties,
+                }
+
+        return self._write_batches(rel_type, relationship_query(rel_type, start_label, end_label), rows())
+
+    def load_relationships(self, parallel: bool = True) -> List[StageResult]:
+        rel_types = list(RELATIONSHIP_FILES)
+        if not parallel:
+            return [self._relationship_stage(rel_type) for rel_type in rel_types]
+        with ThreadPoolExecutor(max_workers=len(rel_types)) as pool:
+            return list(pool.map(self._relationship_stage, rel_types))
+
+
+def report(results: Sequence[StageResult]) -> None:
+    for result in results:
+        print(
+            f"{result.name:<18} {result.rows:>8} rows in {result.batches:>4} batches "
+            f"{result.seconds:8.2f}s  {result.rows_per_second:10.0f} rows/s"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Load export_to_neo4j.py CSVs into a running Neo4j.")
+    parser.add_argument("--source", type=Path, default=OUTPUT_DIR, help="Directory written by export_to_neo4j.py")
+    parser.add_argument("--uri", default=os.environ.get("NEO4J_URI", DEFAULT_URI))
+    parser.add_argument("--auth", default=os.environ.get("NEO4J_AUTH"), help="user/password, or 'none'")
+    parser.add_argument("--database", help="Target database (default: the server default)")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE, help="Rows per UNWIND transaction")
+    parser.add_argument("--serial", action="store_true", help="Load relationship types one at a time")
+    parser.add_argument("--dry-run", action="store_true", help="Record the transactions instead of connecting")
+    args = parser.parse_args()
+
+    expected = [name for name, _ in [*NODE_FILES.values(), *RELATIONSHIP_FILES.values()]]
+    missing = [name for name in expected if not (args.source / name).exists()]
+    if missing:
+        print(f"[ERROR] Missing export files in {args.source}: {', '.join(missing)}", file=sys.stderr)
+        print("Run scripts/export_to_neo4j.py first.", file=sys.stderr)
+        sys.exit(1)
+
+    driver = RecordingDriver() if args.dry_run else connect(args.uri, args.auth)
+    try:
+        loader = Loader(driver, args.source, args.batch_size, args.database)
+        started = time.perf_counter()
+        loader.create_constraints()
+        results = loader.load_nodes()
+        results += loader.load_relationships(parallel=not args.serial)
+        elapsed = time.perf_counter() - started
+    finally:
+        driver.close()
+
+    report(results)
+    total = sum(result.rows for result in results)
+    print(f"Loaded {total} rows in {elapsed:.2f}s ({total / elapsed if elapsed else 0:.0f} rows/s)")
+    if args.dry_run:
+        print(f"Dry run: {len(driver.transactions)} transactions recorded, nothing was sent")
+
+
+if __name__ == "__main__":
+    main()
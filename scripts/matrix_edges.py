@@ -0,0 +1,210 @@
+"""Consolidate Flavor Matrix wheel edges into one row per unique edge.
+
+The same edge is often drawn on several wheel pages (and the exports overlap),
+so `matrix_edges.csv` repeats it once per occurrence. `EdgeConsolidator`
+interns every node/edge label to an integer id (case and punctuation
+variants share one id), keys edges by ``(source id, target id)`` in a dict and
+folds each occurrence into running statistics: count, pages, thickness and
+the target node's ``relative_size`` (min / max / mean), colours and legend
+codes.
+
+Labels are reconciled when the tables are written: a label drawn as a wheel
+node is a flavor ``family`` ("Green", "Earthy"); otherwise it is an
+``ingredient`` if `IngredientResolver` finds it in the canonical registry, and
+``unresolved`` if not. The registry is loaded on first write unless a resolver
+is passed in.
+"""
+
+from __future__ import annotations
+
+import csv
+import io
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Set, Tuple
+
+from canonical_names import canonicalize_name, clean_text
+from ingredient_resolver import IngredientResolver
+from record_writer import write_bytes_atomic
+
+LABELS_FILE = "matrix_labels.csv"
+UNIQUE_EDGES_FILE = "matrix_edges_unique.csv"
+LABEL_HEADERS = ["label_id", "label", "key", "kind", "canonical"]
+EDGE_HEADERS = [
+    "source_id",
+    "target_id",
+    "source",
+    "target",
+    "occurrences",
+    "pages",
+    "thickness_min",
+    "thickness_max",
+    "thickness_mean",
+    "relative_size_min",
+    "relative_size_max",
+    "relative_size_mean",
+    "colors",
+    "legend_codes",
+    "source_files",
+]
+
+
+def label_key(label: str) -> str:
+    canonical, cleaned = canonicalize_name(label)
+    return canonical or cleaned.lower()
+
+
+def to_float(value: Any) -> Optional[float]:
+    if isinstance(value, bool) or value in (None, ""):
+        return None
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+@dataclass
+class Stats:
+    count: int = 0
+    total: float = 0.0
+    low: Optional[float] = None
+    high: Optional[float] = None
+
+    def add(self, value: Optional[float]) -> None:
+        if value is None:
+            return
+        self.count += 1
+        self.total += value
+        self.low = value if self.low is None else min(self.low, value)
+        self.high = value if self.high is None else max(self.high, value)
+
+    def columns(self) -> List[str]:
+        if not self.count:
+            return ["", "", ""]
+        return [f"{self.low:g}", f"{self.high:g}", f"{round(self.total / self.count, 4):g}"]
+
+
+@dataclass
+class EdgeStats:
+    occurrences: int = 0
+    pages: Set[str] = field(default_factory=set)
+    thickness: Stats = field(default_factory=Stats)
+    relative_size: Stats = field(default_factory=Stats)
+    colors: Set[str] = field(default_factory=set)
+    legend_codes: Set[str] = field(default_factory=set)
+    source_files: Set[str] = field(default_factory=set)
+
+
+class EdgeConsolidator:
+    def __init__(self, resolver: Optional[IngredientResolver] = None) -> None:
+        self.resolver = resolver
+        self.labels: List[str] = []
+        self.keys: List[str] = []
+        self.ids: Dict[str, int] = {}
+        self.node_ids: Set[int] = set()
+        self.edges: Dict[Tuple[int, int], EdgeStats] = {}
+        self._sizes: Dict[Tuple[str, int], float] = {}
+
+    def intern(self, label: str) -> Optional[int]:
+        label = clean_text(str(label))
+        if not label:
+            return None
+        key = label_key(label)
+        label_id = self.ids.get(key)
+        if label_id is None:
+            label_id = self.ids[key] = len(self.labels)
+            self.labels.append(label)
+            self.keys.append(key)
+        return label_id
+
+    def add_node(self, ingredient: str, label: str, relative_size: Any) -> None:
+        label_id = self.intern(label)
+        if label_id is None:
+            return
+        self.node_ids.add(label_id)
+        size = to_float(relative_size)
+        if size is not None:
+            self._sizes[(str(ingredient), label_id)] = size
+
+    def add_edge(
+        self,
+        ingredient: str,
+        source: str,
+        target: str,
+        color: Any = "",
+        thickness: Any = None,
+        legend_code: Any = "",
+        source_file: str = "",
+    ) -> None:
+        source_id, target_id = self.intern(source), self.intern(target)
+        if source_id is None or target_id is None:
+            return
+        # A mistyped ingredient (flagged by the validator) is keyed the way
+        # csv.writer prints it in matrix_edges.csv.
+        ingredient = str(ingredient)
+        stats = self.edges.get((source_id, target_id))
+        if stats is None:
+            stats = self.edges[(source_id, target_id)] = EdgeStats()
+        stats.occurrences += 1
+        stats.pages.add(ingredient)
+        stats.thickness.add(to_float(thickness))
+        stats.relative_size.add(self._sizes.get((ingredient, target_id)))
+        if color:
+            stats.colors.add(str(color))
+        if legend_code:
+            stats.legend_codes.add(str(legend_code))
+        if source_file:
+            stats.source_files.add(source_file)
+
+    def add_row(self, name: str, row: Sequence[Any]) -> None:
+        """Feed one `process_flavor_matrix` CSV row (nodes and edges; others are ignored)."""
+        if name == "matrix_nodes":
+            self.add_node(row[0], row[1], row[3])
+        elif name == "matrix_edges":
+            ingredient, source, target, color, thickness, legend_code, _, source_file = row
+            self.add_edge(ingredient, source, target, color, thickness, legend_code, source_file)
+
+    def reconcile(self, label_id: int) -> Tuple[str, str]:
+        """``(kind, canonical)`` for a label."""
+        if label_id in self.node_ids:
+            return "family", self.keys[label_id]
+        if self.resolver is not None:
+            canonical = self.resolver.resolve(self.labels[label_id]).canonical
+            if canonical is not None:
+                return "ingredient", canonical
+        return "unresolved", ""
+
+    def label_rows(self) -> Iterator[List[Any]]:
+        for label_id, label in enumerate(self.labels):
+            kind, canonical = self.reconcile(label_id)
+            yield [label_id, label, self.keys[label_id], kind, canonical]
+
+    def edge_rows(self) -> Iterator[List[Any]]:
+        for (source_id, target_id), stats in sorted(self.edges.items()):
+            yield [
+                source_id,
+                target_id,
+                self.labels[source_id],
+                self.labels[target_id],
+                stats.occurrences,
+                len(stats.pages),
+                *stats.thickness.columns(),
+                *stats.relative_size.columns(),
+                "|".join(sorted(stats.colors)),
+                "|".join(sorted(stats.legend_codes)),
+                "|".join(sorted(stats.source_files)),
+            ]
+
+    def write(self, output_dir: Path) -> Dict[str, int]:
+        if self.resolver is None:
+            self.resolver = IngredientResolver.load()
+        for filename, headers, rows in (
+            (LABELS_FILE, LABEL_HEADERS, self.label_rows()),
+            (UNIQUE_EDGES_FILE, EDGE_HEADERS, self.edge_rows()),
+        ):
+            buffer = io.StringIO(newline="")
+            writer = csv.writer(buffer)
+            writer.writerow(headers)
+            writer.writerows(rows)
+            write_bytes_atomic(output_dir / filename, buffer.getvalue().encode("utf-8"))
+        return {"matrix_labels": len(self.labels), "matrix_edges_unique": len(self.edges)}
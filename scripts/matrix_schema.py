@@ -0,0 +1,204 @@
+"""Schema for Flavor Matrix records, compiled once into plain check functions.
+
+`compile_schema()` turns a small JSON-Schema-like dict (``type``, ``required``,
+``properties``, ``items``, ``min_length``, ``minimum``) into the source of one
+specialised Python function and compiles it, so checking a record is straight-
+line ``isinstance`` tests and dict lookups with no schema interpretation; error
+paths such as ``matrix_nodes[3].relative_size`` are only formatted when a
+problem is found. Problems are collected as ``(path, code, message)`` tuples
+instead of raising, so one pass reports every issue in a record, including
+inside ``matrix_nodes`` / ``matrix_edges``.
+"""
+
+from __future__ import annotations
+
+from typing import Any, Callable, Dict, List, Tuple
+
+Problem = Tuple[str, str, str]
+Check = Callable[[Any, List[Problem]], None]
+
+_TYPES: Dict[str, Tuple[type, ...]] = {
+    "string": (str,),
+    "number": (int, float),
+    "integer": (int,),
+    "boolean": (bool,),
+    "array": (list,),
+    "object": (dict,),
+    "null": (type(None),),
+}
+
+STRING_LIST = {"type": "array", "items": {"type": "string"}}
+
+NODE_SCHEMA = {
+    "type": "object",
+    "required": ["label", "relative_size"],
+    "properties": {
+        "label": {"type": "string", "min_length": 1},
+        "color": {"type": ["string", "null"]},
+        "relative_size": {"type": "number", "minimum": 0},
+        "legend_code": {"type": ["string", "null"]},
+        "notes": {"type": ["string", "null"]},
+    },
+}
+
+EDGE_SCHEMA = {
+    "type": "object",
+    "required": ["source", "target"],
+    "properties": {
+        "source": {"type": "string", "min_length": 1},
+        "target": {"type": "string", "min_length": 1},
+        "color": {"type": ["string", "null"]},
+        "thickness": {"type": ["number", "null"], "minimum": 0},
+        "legend_code": {"type": ["string", "null"]},
+        "notes": {"type": ["string", "null"]},
+    },
+}
+
+RECORD_SCHEMA = {
+    "type": "object",
+    "required": [
+        "ingredient",
+        "page_reference",
+        "summary",
+        "best_pairings",
+        "surprise_pairings",
+        "substitutes",
+        "additional_notes",
+        "matrix_nodes",
+        "matrix_edges",
+        "uncertainties",
+    ],
+    "properties": {
+        "ingredient": {"type": "string", "min_length": 1},
+        "page_reference": {"type": ["string", "integer", "null"]},
+        "summary": {"type": ["string", "null"]},
+        "best_pairings": STRING_LIST,
+        "surprise_pairings": STRING_LIST,
+        "substitutes": STRING_LIST,
+        "additional_notes": {"type": "array"},
+        "uncertainties": {"type": "array"},
+        "matrix_nodes": {"type": "array", "items": NODE_SCHEMA},
+        "matrix_edges": {"type": "array", "items": EDGE_SCHEMA},
+    },
+}
+
+REQUIRED_FIELDS = frozenset(RECORD_SCHEMA["required"])
+
+
+def _type_name(value: Any) -> str:
+    for name, types in _TYPES.items():
+        if isinstance(value, types) and not (isinstance(value, bool) and name in ("number", "integer")):
+            return name
+    return type(value).__name__
+
+
+class _Emitter:
+    """Writes the Python source of one check function, nesting by schema depth."""
+
+    def __init__(self) -> None:
+        self.lines: List[str] = []
+        self.constants: Dict[str, Any] = {}
+        self.counter = 0
+
+    def name(self, prefix: str) -> str:
+        self.counter += 1
+        return f"{prefix}{self.counter}"
+
+    def constant(self, value: Any) -> str:
+        name = self.name("_c")
+        self.constants[name] = value
+        return name
+
+    def line(self, indent: int, text: str) -> None:
+        self.lines.append("    " * indent + text)
+
+    def problem(self, indent: int, path: str, code: str, message: str) -> None:
+        self.line(indent, f"problems.append((f{path!r}, {code!r}, {message}))")
+
+    def emit(self, schema: Dict[str, Any], var: str, path: str, indent: int) -> None:
+        declared = schema.get("type")
+        names: List[str] = []
+        if declared is not None:
+            names = [declared] if isinstance(declared, str) else list(declared)
+            types = tuple(t for name in names for t in _TYPES[name])
+            allowed = self.constant(types[0] if len(types) == 1 else types)
+            condition = f"not isinstance({var}, {allowed})"
+            if "boolean" not in names and any(name in ("number", "integer") for name in names):
+                condition += f" or {var}.__class__ is bool"
+            expected = " or ".join(names)
+            self.line(indent, f"if {condition}:")
+            self.problem(indent + 1, path, "type", f"'expected {expected}, got ' + _type_name({var})")
+            self.line(indent, "else:")
+            indent += 1
+        body_start = len(self.lines)
+        # After a passing single-type check the container guards below are redundant.
+        is_dict = names == ["object"]
+        is_list = names == ["array"]
+
+        if "min_length" in schema:
+            minimum = schema["min_length"]
+            self.line(indent, f"if isinstance({var}, (str, list)) and len({var}) < {minimum}:")
+            self.problem(indent + 1, path, "min_length", repr(f"shorter than {minimum}"))
+        if "minimum" in schema:
+            minimum = schema["minimum"]
+            self.line(
+                indent, f"if isinstance({var}, (int, float)) and {var}.__class__ is not bool and {var} < {minimum}:"
+            )
+            self.problem(indent + 1, path, "minimum", f"f'{{{var}}} is below {minimum}'")
+
+        required = schema.get("required")
+        properties = schema.get("properties", {})
+        if required or properties:
+            inner = indent
+            if not is_dict:
+                self.line(indent, f"if isinstance({var}, dict):")
+                inner += 1
+            if required:
+                fields = self.constant(tuple(required))
+                present = " and ".join(f"{name!r} in {var}" for name in required)
+                self.line(inner, f"if not ({present}):")
+                self.problem(
+                    inner + 1, path, "required", f"'missing fields ' + str(sorted(set({fields}).difference({var})))"
+                )
+            for key, sub in properties.items():
+                child = self.name("v")
+                escaped = str(key).replace("{", "{{").replace("}", "}}")
+                self.line(inner, f"if {key!r} in {var}:")
+                self.line(inner + 1, f"{child} = {var}[{key!r}]")
+                self.emit(sub, child, f"{path}.{escaped}" if path else escaped, inner + 1)
+
+        if "items" in schema:
+            index, item = self.name("i"), self.name("v")
+            inner = indent
+            if not is_list:
+                self.line(indent, f"if isinstance({var}, list):")
+                inner += 1
+            self.line(inner, f"for {index}, {item} in enumerate({var}):")
+            self.emit(schema["items"], item, f"{path}[{{{index}}}]", inner + 1)
+
+        if len(self.lines) == body_start:
+            if declared is not None:
+                self.lines.pop()  # the dangling "else:"
+            else:
+                self.line(indent, "pass")
+
+
+def compile_schema(schema: Dict[str, Any]) -> Check:
+    """Generate and compile a ``check(value, problems)`` function for ``schema``."""
+    emitter = _Emitter()
+    emitter.line(0, "def check(value, problems):")
+    emitter.emit(schema, "value", "", 1)
+    namespace: Dict[str, Any] = {"_type_name": _type_name, **emitter.constants}
+    exec(compile("\n".join(emitter.lines), "<matrix_schema>", "exec"), namespace)
+    check = namespace["check"]
+    check.source = "\n".join(emitter.lines)
+    return check
+
+
+check_record = compile_schema(RECORD_SCHEMA)
+
+
+def record_problems(data: Any) -> List[Problem]:
+    problems: List[Problem] = []
+    check_record(data, problems)
+    return problems
@@ -0,0 +1,281 @@
+"""Aggregate pairing scores across both books and the Flavor Matrix.
+
+Usage:
+    python scripts/pairing_scores.py
+    python scripts/pairing_scores.py --source-weight flavor-matrix=0.5 --tier-weight ethereal=6
+    python scripts/pairing_scores.py --weights weights.json --top basil
+
+Every endpoint is resolved through the canonical registry with
+`IngredientResolver` (canonical name, unambiguous alias or `normalized_key`)
+before edges are merged.
+For each directed edge and source only the strongest listing is kept, so an
+edge's score is
+
+    sum over sources of source_weight[source] * tier_weight[best tier]
+
+which rewards both the tier and the number of sources that agree. The
+observations are grouped once by (source, tier); re-scoring with new weights
+is a single pass over those groups and does not re-read any dataset.
+
+`--weights` takes a JSON file such as
+``{"sources": {"flavor-matrix": 0.5}, "tiers": {"surprise_pairings": 2}}``;
+`--source-weight` / `--tier-weight` override individual values on top.
+"""
+
+from __future__ import annotations
+
+import argparse
+import csv
+import io
+import json
+import sys
+import time
+from array import array
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from build_canonical_registry import ROOT, SOURCE_FILES, load_registry_entries
+from flavor_graph import MATRIX_DIR, MATRIX_SOURCE, MATRIX_TIER_WEIGHTS, iter_matrix_records
+from ingredient_resolver import IngredientResolver
+from parse_flavor_bible import TIER_PRIORITY
+from record_writer import write_bytes_atomic
+
+OUTPUT_PATH = ROOT / "build" / "pairing-scores" / "pairing_scores.csv"
+
+SOURCES = [name for name, _ in SOURCE_FILES] + [MATRIX_SOURCE]
+# Strongest first; used to pick the one listing per (edge, source) that counts.
+TIERS = sorted(TIER_PRIORITY, key=TIER_PRIORITY.get, reverse=True) + list(MATRIX_TIER_WEIGHTS)
+DEFAULT_SOURCE_WEIGHTS = {"flavor-bible": 1.0, "vegetarian-flavor-bible": 1.0, MATRIX_SOURCE: 0.75}
+DEFAULT_TIER_WEIGHTS = {
+    "ethereal": 4.0,
+    "classic": 3.0,
+    "frequent": 2.0,
+    "recommended": 1.0,
+    "best_pairings": 3.0,
+    "surprise_pairings": 1.5,
+}
+
+
+_MISS = object()
+
+
+class ScoreTable:
+    """Directed edges with their (source, tier) observations, ready to be scored."""
+
+    def __init__(self, resolver: IngredientResolver) -> None:
+        self.resolver = resolver
+        self.names: List[str] = []
+        self.ids: Dict[str, int] = {}
+        self.starts = array("I")
+        self.ends = array("I")
+        # Cleaned name -> number of endpoint mentions that did not resolve.
+        self.unresolved: Dict[str, int] = {}
+        self._edges: Dict[Tuple[int, int], int] = {}
+        self._best: Dict[Tuple[int, int], int] = {}
+        # Raw name -> (endpoint name, whether it is missing from the registry).
+        self._resolved: Dict[str, Tuple[str, bool]] = {}
+        self._groups: Optional[Dict[Tuple[int, int], array]] = None
+
+    @classmethod
+    def load(
+        cls,
+        book_files: Sequence[Tuple[str, Path]] = tuple(SOURCE_FILES),
+        matrix_dir: Optional[Path] = MATRIX_DIR,
+        entries: Optional[List[Dict[str, object]]] = None,
+    ) -> "ScoreTable":
+        table = cls(IngredientResolver(load_registry_entries() if entries is None else entries))
+        for source, path in book_files:
+            if path.exists():
+                table.add_book(json.loads(path.read_text(encoding="utf-8")), source)
+        if matrix_dir is not None and matrix_dir.exists():
+            for path in sorted(matrix_dir.glob("*.json")):
+                table.add_matrix(iter_matrix_records(path))
+        return table
+
+    def lookup(self, name: str) -> Tuple[str, bool]:
+        """``(registry name or cleaned form, whether it is missing from the registry)``; no counting."""
+        cached = self._resolved.get(name, _MISS)
+        if cached is _MISS:
+            canonical = self.resolver.resolve(name).canonical
+            if canonical is not None:
+                cached = (canonical, False)
+            else:
+                cleaned = self.resolver.canonical_or_cleaned(name)
+                cached = (cleaned, bool(cleaned))
+            self._resolved[name] = cached
+        return cached
+
+    def resolve(self, name: str) -> str:
+        """Like `lookup`, for loading: each unresolved mention is counted in ``unresolved``."""
+        resolved, missing = self.lookup(name)
+        if missing:
+            self.unresolved[resolved] = self.unresolved.get(resolved, 0) + 1
+        return resolved
+
+    def _node(self, name: str) -> int:
+        node_id = self.ids.get(name)
+        if node_id is None:
+            node_id = len(self.names)
+            self.ids[name] = node_id
+            self.names.append(name)
+        return node_id
+
+    def add(self, start: str, end: str, source: str, tier: str) -> None:
+        start, end = self.resolve(start), self.resolve(end)
+        if not start or not end or start == end:
+            return
+        key = (self._node(start), self._node(end))
+        edge = self._edges.get(key)
+        if edge is None:
+            edge = self._edges[key] = len(self.starts)
+            self.starts.append(key[0])
+            self.ends.append(key[1])
+        observation = (edge, SOURCES.index(source))
+        tier_id = TIERS.index(tier)
+        if tier_id < self._best.get(observation, len(TIERS)):
+            self._best[observation] = tier_id
+            self._groups = None
+
+    def add_book(self, records: Iterable[Dict[str, object]], source: str) -> None:
+        for record in records:
+            ingredient = record.get("ingredient")
+            if not ingredient:
+                continue
+            for pairing in record.get("pairings") or []:
+                tier = pairing.get("tier")
+                tier = tier if tier in TIER_PRIORITY else "recommended"
+                self.add(ingredient, str(pairing.get("ingredient") or ""), source, tier)
+
+    def add_matrix(self, records: Iterable[Dict[str, object]]) -> None:
+        for record in records:
+            ingredient = str(record.get("ingredient") or "")
+            for field_name in MATRIX_TIER_WEIGHTS:
+                items = record.get(field_name)
+                if isinstance(items, list):
+                    for item in items:
+                        self.add(ingredient, str(item), MATRIX_SOURCE, field_name)
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    @property
+    def groups(self) -> Dict[Tuple[int, int], array]:
+        """Edge ids per (source id, tier id), built once after loading."""
+        if self._groups is None:
+            groups: Dict[Tuple[int, int], array] = {}
+            for (edge, source_id), tier_id in self._best.items():
+                groups.setdefault((source_id, tier_id), array("I")).append(edge)
+            self._groups = groups
+        return self._groups
+
+    def score(
+        self,
+        source_weights: Optional[Dict[str, float]] = None,
+        tier_weights: Optional[Dict[str, float]] = None,
+    ) -> List[float]:
+        source_weights = {**DEFAULT_SOURCE_WEIGHTS, **(source_weights or {})}
+        tier_weights = {**DEFAULT_TIER_WEIGHTS, **(tier_weights or {})}
+        scores = [0.0] * len(self.starts)
+        for (source_id, tier_id), edges in self.groups.items():
+            weight = source_weights.get(SOURCES[source_id], 0.0) * tier_weights.get(TIERS[tier_id], 0.0)
+            if weight:
+                for edge in edges:
+                    scores[edge] += weight
+        return scores
+
+    def listings(self, edge: int) -> List[Tuple[str, str]]:
+        return [
+            (SOURCES[source_id], TIERS[self._best[(edge, source_id)]])
+            for source_id in range(len(SOURCES))
+            if (edge, source_id) in self._best
+        ]
+
+    def top(self, name: str, scores: Sequence[float], limit: int = 10) -> List[Tuple[str, float]]:
+        node_id = self.ids.get(self.lookup(name)[0])
+        if node_id is None:
+            return []
+        edges = [edge for edge in range(len(self.starts)) if self.starts[edge] == node_id]
+        edges.sort(key=lambda edge: (-scores[edge], self.names[self.ends[edge]]))
+        return [(self.names[self.ends[edge]], scores[edge]) for edge in edges[:limit]]
+
+    def to_csv(self, scores: Sequence[float]) -> bytes:
+        buffer = io.StringIO()
+        writer = csv.writer(buffer, lineterminator="\n")
+        writer.writerow(["source", "target", "score", "source_count", "listings"])
+        order = sorted(range(len(self.starts)), key=lambda edge: (self.names[self.starts[edge]], -scores[edge]))
+        for edge in order:
+            listings = self.listings(edge)
+            writer.writerow(
+                [
+                    self.names[self.starts[edge]],
+                    self.names[self.ends[edge]],
+                    f"{scores[edge]:g}",
+                    len(listings),
+                    "|".join(f"{source}:{tier}" for source, tier in listings),
+                ]
+            )
+        return buffer.getvalue().encode("utf-8")
+
+
+def parse_weight(text: str) -> Tuple[str, float]:
+    name, _, value = text.partition("=")
+    try:
+        return name.strip(), float(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected NAME=NUMBER, got {text!r}") from None
+
+
+def load_weights(path: Optional[Path]) -> Tuple[Dict[str, float], Dict[str, float]]:
+    if path is None:
+        return {}, {}
+    config = json.loads(path.read_text(encoding="utf-8"))
+    return dict(config.get("sources") or {}), dict(config.get("tiers") or {})
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Score pairings by tier and number of agreeing sources.")
+    parser.add_argument("--output", type=Path, default=OUTPUT_PATH, help="CSV destination")
+    parser.add_argument("--weights", type=Path, help="JSON file with 'sources' and 'tiers' weight maps")
+    parser.add_argument("--source-weight", type=parse_weight, action="append", default=[], metavar="SOURCE=W")
+    parser.add_argument("--tier-weight", type=parse_weight, action="append", default=[], metavar="TIER=W")
+    parser.add_argument("--top", metavar="INGREDIENT", help="Print the best-scored pairings instead of writing")
+    parser.add_argument("--limit", type=int, default=10)
+    args = parser.parse_args()
+
+    source_weights, tier_weights = load_weights(args.weights)
+    source_weights.update(args.source_weight)
+    tier_weights.update(args.tier_weight)
+    for name in source_weights:
+        if name not in SOURCES:
+            print(f"[WARN] Unknown source weight ignored: {name}", file=sys.stderr)
+    for name in tier_weights:
+        if name not in TIERS:
+            print(f"[WARN] Unknown tier weight ignored: {name}", file=sys.stderr)
+
+    started = time.perf_counter()
+    table = ScoreTable.load()
+    loaded = time.perf_counter()
+    scores = table.score(source_weights, tier_weights)
+    scored = time.perf_counter()
+
+    if args.top:
+        pairings = table.top(args.top, scores, args.limit)
+        if not pairings:
+            print(f"[WARN] No pairings found for {args.top!r}", file=sys.stderr)
+            sys.exit(1)
+        for name, score in pairings:
+            print(f"{name}\t{score:g}")
+        return
+
+    write_bytes_atomic(args.output, table.to_csv(scores))
+    print(f"Scored {len(table)} edges over {len(table.names)} ingredients")
+    print(f"Load {(loaded - started) * 1000:.0f} ms, score {(scored - loaded) * 1000:.1f} ms")
+    print(
+        f"Unresolved endpoints: {sum(table.unresolved.values())} mentions of "
+        f"{len(table.unresolved)} distinct cleaned names"
+    )
+    print(f"Output: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
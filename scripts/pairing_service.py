@@ -0,0 +1,406 @@
+"""Small HTTP/JSON pairing service for the WordPress graph adapter.
+
+Usage:
+    python scripts/pairing_service.py --port 8765
+    python scripts/pairing_service.py --loadtest http://127.0.0.1:8765/pairings/basil --concurrency 16
+
+Endpoints (GET or HEAD):
+    /pairings/{slug}?limit=10&direction=forward|reverse|mutual
+    /similar/{slug}?limit=10&metric=cosine|jaccard&min_shared=2
+    /affinities?ingredients=avocado,lime&limit=20[&complete=1]
+    /health
+
+The graph, affinity and similarity indexes are built once at startup and the
+service only ever reads them, so every response body is cached (LRU keyed by
+path + query) together with a strong ETag; a matching ``If-None-Match``
+gets a 304. Connections are HTTP/1.1 keep-alive unless the client asks to
+close. With ``--token`` (or ``PAIRING_SERVICE_TOKEN``) every endpoint except
+/health requires ``Authorization: Bearer <token>``, which is what the
+WordPress adapter sends when its ``token`` setting is filled in.
+``--loadtest`` is a tiny keep-alive load generator for local runs.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import hashlib
+import hmac
+import json
+import os
+import statistics
+import sys
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, unquote, urlsplit
+
+from affinity_index import AffinityIndex
+from canonical_names import slugify
+from flavor_graph import FlavorGraph
+from pairing_similarity import METRICS, SimilarityIndex
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+CACHE_SIZE = 4096
+MAX_LIMIT = 200
+IDLE_TIMEOUT = 15.0
+MAX_HEADER_LINES = 100
+
+TOKEN_ENV = "PAIRING_SERVICE_TOKEN"
+
+REASONS = {
+    200: "OK",
+    304: "Not Modified",
+    400: "Bad Request",
+    401: "Unauthorized",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    431: "Request Header Fields Too Large",
+}
+
+Response = Tuple[int, bytes, str]
+
+
+class BadRequest(ValueError):
+    pass
+
+
+class PairingService:
+    def __init__(
+        self,
+        graph: FlavorGraph,
+        affinities: AffinityIndex,
+        similarity: SimilarityIndex,
+        cache_size: int = CACHE_SIZE,
+    ) -> None:
+        self.graph = graph
+        self.affinities = affinities
+        self.similarity = similarity
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[str, Response]" = OrderedDict()
+        self.hits = self.misses = 0
+        self.slugs: Dict[str, str] = {}
+        for name in graph.names + affinities.names:
+            self.slugs.setdefault(slugify(name), name)
+
+    @classmethod
+    def load(cls) -> "PairingService":
+        graph = FlavorGraph.load()
+        return cls(graph, AffinityIndex.load(), SimilarityIndex(graph))
+
+    def resolve(self, token: str) -> Optional[str]:
+        token = unquote(token).strip()
+        if token in self.slugs:
+            return self.slugs[token]
+        if token in self.graph or self.affinities.node_id(token) is not None:
+            return token
+        return self.slugs.get(slugify(token))
+
+    def respond(self, target: str) -> Response:
+        """``(status, body, etag)`` for a GET of ``target``, served from the cache when possible."""
+        cached = self._cache.get(target)
+        if cached is not None:
+            self.hits += 1
+            self._cache.move_to_end(target)
+            return cached
+        self.misses += 1
+        try:
+            status, payload = self.route(target)
+        except BadRequest as exc:
+            status, payload = 400, {"error": str(exc)}
+        body = json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        response = (status, body, f'"{hashlib.blake2b(body, digest_size=12).hexdigest()}"')
+        self._cache[target] = response
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        return response
+
+    def route(self, target: str) -> Tuple[int, object]:
+        parts = urlsplit(target)
+        query = {key: values[-1] for key, values in parse_qs(parts.query).items()}
+        segments = [segment for segment in parts.path.split("/") if segment]
+        if segments == ["health"]:
+            return 200, {"status": "ok", "ingredients": len(self.graph), "edges": self.graph.edge_count}
+        if segments == ["affinities"]:
+            return self.affinity_payload(query)
+        if len(segments) == 2 and segments[0] in ("pairings", "similar"):
+            name = self.resolve(segments[1])
+            if name is None or name not in self.graph:
+                return 404, {"error": f"Unknown ingredient: {unquote(segments[1])}"}
+            if segments[0] == "pairings":
+                return 200, self.pairings_payload(name, query)
+            return 200, self.similar_payload(name, query)
+        return 404, {"error": "Not found"}
+
+    def pairings_payload(self, name: str, query: Dict[str, str]) -> Dict[str, object]:
+        limit = parse_limit(query, 10)
+        direction = query.get("direction", "forward")
+        if direction == "forward":
+            neighbors = self.graph.top_pairings(name, limit)
+        elif direction == "reverse":
+            neighbors = self.graph.paired_by(name, limit)
+        elif direction == "mutual":
+            neighbors = self.graph.mutual_pairings(name, limit)
+        else:
+            raise BadRequest("direction must be forward, reverse or mutual")
+        return {
+            "ingredient": name,
+            "slug": slugify(name),
+            "direction": direction,
+            "data": [
+                {
+                    "name": item.ingredient,
+                    "slug": slugify(item.ingredient),
+                    "weight": item.weight,
+                    "sources": item.sources,
+                }
+                for item in neighbors
+            ],
+        }
+
+    def similar_payload(self, name: str, query: Dict[str, str]) -> Dict[str, object]:
+        metric = query.get("metric", "cosine")
+        if metric not in METRICS:
+            raise BadRequest(f"metric must be one of {', '.join(METRICS)}")
+        min_shared = parse_int(query, "min_shared", 2)
+        neighbors = self.similarity.similar(name, parse_limit(query, 10), metric, min_shared)
+        return {
+            "ingredient": name,
+            "slug": slugify(name),
+            "metric": metric,
+            "data": [
+                {
+                    "name": item.ingredient,
+                    "slug": slugify(item.ingredient),
+                    "score": round(item.score, 6),
+                    "shared": item.shared,
+                }
+                for item in neighbors
+            ],
+        }
+
+    def affinity_payload(self, query: Dict[str, str]) -> Tuple[int, Dict[str, object]]:
+        tokens = [token for token in query.get("ingredients", "").split(",") if token.strip()]
+        if not tokens:
+            raise BadRequest("ingredients is required (comma-separated slugs or names)")
+        names = []
+        for token in tokens:
+            name = self.resolve(token)
+            if name is None or self.affinities.node_id(name) is None:
+                return 404, {"error": f"Not found in any affinity set: {token.strip()}"}
+            names.append(name)
+        limit = parse_limit(query, 20)
+        if query.get("complete") in ("1", "true"):
+            data: List[Dict[str, object]] = [
+                {"name": item.ingredient, "slug": slugify(item.ingredient), "support": item.support, "sets": item.sets}
+                for item in self.affinities.complete(names, limit)
+            ]
+        else:
+            data = [
+                {"items": list(item.items), "occurrences": item.occurrences, "sources": item.sources}
+                for item in self.affinities.containing(names)[:limit]
+            ]
+        return 200, {"ingredients": names, "data": data}
+
+
+def parse_int(query: Dict[str, str], key: str, default: int) -> int:
+    value = query.get(key)
+    if value is None:
+        return default
+    try:
+        return int(value)
+    except ValueError:
+        raise BadRequest(f"{key} must be an integer") from None
+
+
+def parse_limit(query: Dict[str, str], default: int) -> int:
+    return max(1, min(parse_int(query, "limit", default), MAX_LIMIT))
+
+
+def etag_matches(header: Optional[str], etag: str) -> bool:
+    if not header:
+        return False
+    candidates = [candidate.strip() for candidate in header.split(",")]
+    return "*" in candidates or any(candidate.removeprefix("W/") == etag for candidate in candidates)
+
+
+def authorized(header: Optional[str], token: Optional[str]) -> bool:
+    if not token:
+        return True
+    scheme, _, credentials = (header or "").partition(" ")
+    return scheme.lower() == "bearer" and hmac.compare_digest(credentials.strip().encode(), token.encode())
+
+
+async def handle_connection(
+    service: PairingService,
+    reader: asyncio.StreamReader,
+    writer: asyncio.StreamWriter,
+    token: Optional[str] = None,
+) -> None:
+    try:
+        while True:
+            try:
+                request_line = await asyncio.wait_for(reader.readline(), IDLE_TIMEOUT)
+            except asyncio.TimeoutError:
+                break
+            except ValueError:
+                # Longer than the StreamReader limit.
+                await write_response(writer, 400, b'{"error":"Request line too long"}', None, False, False)
+                break
+            if not request_line:
+                break
+            try:
+                method, target, version = request_line.decode("latin-1").split()
+            except ValueError:
+                await write_response(writer, 400, b'{"error":"Malformed request line"}', None, False, False)
+                break
+
+            headers: Dict[str, str] = {}
+            try:
+                for _ in range(MAX_HEADER_LINES):
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    key, _, value = line.decode("latin-1").partition(":")
+                    headers[key.strip().lower()] = value.strip()
+                else:
+                    # The rest of the headers would be read as the next request.
+                    raise ValueError("too many header lines")
+            except ValueError:
+                await write_response(writer, 431, b'{"error":"Request headers too large"}', None, False, False)
+                break
+            try:
+                length = int(headers.get("content-length") or 0)
+                if length < 0:
+                    raise ValueError(length)
+            except ValueError:
+                await write_response(writer, 400, b'{"error":"Malformed Content-Length"}', None, False, False)
+                break
+            if length:
+                await reader.readexactly(length)
+
+            connection = headers.get("connection", "").lower()
+            keep_alive = connection != "close" if version == "HTTP/1.1" else connection == "keep-alive"
+
+            if method not in ("GET", "HEAD"):
+                await write_response(writer, 405, b'{"error":"Method not allowed"}', None, keep_alive, False)
+            elif urlsplit(target).path.rstrip("/") != "/health" and not authorized(headers.get("authorization"), token):
+                await write_response(writer, 401, b'{"error":"Unauthorized"}', None, keep_alive, method == "HEAD")
+            else:
+                status, body, etag = service.respond(target)
+                if status == 200 and etag_matches(headers.get("if-none-match"), etag):
+                    await write_response(writer, 304, b"", etag, keep_alive, True)
+                else:
+                    await write_response(writer, status, body, etag, keep_alive, method == "HEAD")
+            if not keep_alive:
+                break
+    except (ConnectionError, asyncio.IncompleteReadError):
+        pass
+    finally:
+        writer.close()
+
+
+async def write_response(
+    writer: asyncio.StreamWriter,
+    status: int,
+    body: bytes,
+    etag: Optional[str],
+    keep_alive: bool,
+    omit_body: bool,
+) -> None:
+    lines = [
+        f"HTTP/1.1 {status} {REASONS.get(status, '')}",
+        "Content-Type: application/json; charset=utf-8",
+        f"Content-Length: {0 if status == 304 else len(body)}",
+        "Cache-Control: public, max-age=300",
+        f"Connection: {'keep-alive' if keep_alive else 'close'}",
+    ]
+    if etag:
+        lines.append(f"ETag: {etag}")
+    if status == 401:
+        lines.append('WWW-Authenticate: Bearer realm="pairing-service"')
+    writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1"))
+    if not omit_body and status != 304:
+        writer.write(body)
+    await writer.drain()
+
+
+async def serve(host: str, port: int, token: Optional[str] = None) -> None:
+    started = time.perf_counter()
+    service = PairingService.load()
+    print(f"Loaded {len(service.graph)} ingredients in {time.perf_counter() - started:.2f}s")
+    server = await asyncio.start_server(lambda r, w: handle_connection(service, r, w, token), host, port)
+    print(f"Serving on http://{host}:{port}")
+    async with server:
+        await server.serve_forever()
+
+
+async def load_test(url: str, concurrency: int, total: int, token: Optional[str] = None) -> None:
+    parts = urlsplit(url)
+    target = parts.path + (f"?{parts.query}" if parts.query else "")
+    auth = f"Authorization: Bearer {token}\r\n" if token else ""
+    request = f"GET {target} HTTP/1.1\r\nHost: {parts.netloc}\r\n{auth}\r\n".encode("latin-1")
+    latencies: List[float] = []
+    statuses: Dict[int, int] = {}
+    remaining = [total]
+
+    async def worker() -> None:
+        reader, writer = await asyncio.open_connection(parts.hostname, parts.port or 80)
+        try:
+            while remaining[0] > 0:
+                remaining[0] -= 1
+                sent = time.perf_counter()
+                writer.write(request)
+                await writer.drain()
+                status = int((await reader.readline()).split()[1])
+                length = 0
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b""):
+                        break
+                    if line.lower().startswith(b"content-length:"):
+                        length = int(line.split(b":", 1)[1])
+                await reader.readexactly(length)
+                latencies.append(time.perf_counter() - sent)
+                statuses[status] = statuses.get(status, 0) + 1
+        finally:
+            writer.close()
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    print(f"{len(latencies)} requests over {concurrency} keep-alive connections in {elapsed:.2f}s")
+    print(f"  {len(latencies) / elapsed:.0f} req/s, statuses {statuses}")
+    print(
+        f"  latency p50 {statistics.median(latencies) * 1000:.2f} ms, "
+        f"p99 {latencies[int(len(latencies) * 0.99) - 1] * 1000:.2f} ms"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Serve pairings, similar ingredients and affinities over HTTP.")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument(
+        "--token",
+        default=os.environ.get(TOKEN_ENV),
+        help=f"Require 'Authorization: Bearer TOKEN' (default: ${TOKEN_ENV}; unset means no auth)",
+    )
+    parser.add_argument("--loadtest", metavar="URL", help="Hammer a running service instead of starting one")
+    parser.add_argument("--concurrency", type=int, default=16, help="Connections for --loadtest")
+    parser.add_argument("--requests", type=int, default=10000, help="Total requests for --loadtest")
+    args = parser.parse_args()
+
+    try:
+        if args.loadtest:
+            asyncio.run(load_test(args.loadtest, max(args.concurrency, 1), max(args.requests, 1), args.token))
+        else:
+            asyncio.run(serve(args.host, args.port, args.token))
+    except KeyboardInterrupt:
+        print("Stopped.", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
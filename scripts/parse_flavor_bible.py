@@ -3,18 +3,24 @@
 from __future__ import annotations
 
 import argparse
-import json
 import re
-import unicodedata
 import xml.etree.ElementTree as ET
 from dataclasses import dataclass
+from functools import partial
 from pathlib import Path
-from typing import Dict, Iterable, List, Optional, Tuple
+from typing import Container, Dict, FrozenSet, Iterable, Iterator, List, Optional, Set, Tuple
+
+from build_manifest import incremental_build, rules_digest
+from canonical_names import canonicalize_name, clean_text, keyword_pattern, slugify, strip_accents
+from chapter_pool import map_chapters
+from compact_dataset import compact_path_for, convert_json, write_compact
+from record_writer import RecordWriter
 
 ROOT = Path(__file__).resolve().parents[1]
 TEXT_DIR = ROOT / "docs" / "extracted" / "flavor-bible" / "OEBPS" / "Text"
 OUTPUT_PATH = ROOT / "docs" / "flavor-bible-processed" / "flavor-bible.json"
 NS = {"x": "http://www.w3.org/1999/xhtml"}
+BODY_TAG = f"{{{NS['x']}}}body"
 CHAPTER_FILES = sorted(TEXT_DIR.glob("FlavorBible_chap-3*.html"), key=lambda p: p.name)
 
 SKIP_KEYWORDS = {
@@ -142,6 +148,13 @@ PAIRING_STOPWORDS = {
 
 TIER_PRIORITY = {"ethereal": 3, "classic": 2, "frequent": 1, "recommended": 0}
 
+SKIP_KEYWORD_PATTERN = keyword_pattern(SKIP_KEYWORDS)
+PAIRING_STOPWORD_PATTERN = keyword_pattern(PAIRING_STOPWORDS)
+PAIRING_CONTEXT_PATTERN = re.compile(
+    r"\b(add|avoid|bake|cook|fry|grill|mix|pair|pairs|pairing|roast|saute|sauté|serve|sprinkle|stir|try|use|using|goes|never)\b"
+    r"|a little |goes a very long way"
+)
+
 
 @dataclass
 class Entry:
@@ -154,69 +167,6 @@ def strip_tag(tag: str) -> str:
     return tag.split("}")[-1] if "}" in tag else tag
 
 
-def clean_text(text: Optional[str]) -> str:
-    if text is None:
-        return ""
-    normalized = unicodedata.normalize("NFKC", text)
-    normalized = normalized.replace("\xa0", " ")
-    normalized = normalized.replace("\u2013", "-")
-    normalized = normalized.replace("\u2014", "-")
-    normalized = normalized.replace("\ufffd", "")
-    normalized = re.sub(r"\s+", " ", normalized)
-    return normalized.strip()
-
-
-def canonicalize_name(text: str) -> Tuple[Optional[str], str]:
-    original = clean_text(text)
-    if not original:
-        return None, original
-
-    working = re.sub(r"\([^)]*\)", "", original)
-    working = re.sub(r";?\s*see also.*", "", working, flags=re.IGNORECASE)
-    working = re.sub(r";?\s*aka.*", "", working, flags=re.IGNORECASE)
-    working = re.sub(r",?\s*aka.*", "", working, flags=re.IGNORECASE)
-    working = re.sub(r",?\s*and/or.*", "", working, flags=re.IGNORECASE)
-    working = re.sub(r",?\s*including.*", "", working, flags=re.IGNORECASE)
-    working = re.sub(r",?\s*with.*", "", working, flags=re.IGNORECASE)
-    working = re.sub(r",?\s*e\.g\.,?.*", "", working, flags=re.IGNORECASE)
-    working = re.sub(r"\b(in general|general|mixed)\b.*", "", working, flags=re.IGNORECASE)
-    working = working.replace("/", " ")
-    ascii_working = "".join(
-        ch for ch in unicodedata.normalize("NFKD", working) if not unicodedata.combining(ch)
-    )
-    ascii_working = re.sub(r"\bas a [^,;]+", "", ascii_working, flags=re.IGNORECASE)
-    ascii_working = re.sub(r"\bfor [^,;]+", "", ascii_working, flags=re.IGNORECASE)
-    ascii_working = re.sub(r"[^A-Za-z0-9,\- ]", " ", ascii_working)
-    ascii_working = re.sub(r"\s+", " ", ascii_working).strip(" ,;-")
-
-    if not ascii_working:
-        return None, original
-
-    working = ascii_working
-
-    if "," in working:
-        parts = [p.strip() for p in working.split(",") if p.strip()]
-        if len(parts) == 2:
-            working = f"{parts[1]} {parts[0]}".strip()
-        else:
-            working = " ".join(parts)
-
-    ascii_name = working
-    ascii_name = re.sub(r"[^a-zA-Z0-9 '\-]", " ", ascii_name)
-    ascii_name = re.sub(r"\s+", " ", ascii_name).strip(" ,;- ")
-    if not ascii_name:
-        return None, original
-
-    canonical = ascii_name.lower()
-    return canonical, original
-
-
-def slugify(text: str) -> str:
-    text = text.lower()
-    text = re.sub(r"[^a-z0-9]+", "-", text).strip("-")
-    return text
-
-
 def load_body_elements(path: Path) -> List[ET.Element]:
     root = ET.parse(path).getroot()
     body = root.find(".//x:body", NS)
@@ -225,6 +175,32 @@ def load_body_elements(path: Path) -> List[ET.Element]:
     return list(body)
 
 
+def stream_body_elements(path: Path) -> Iterator[ET.Element]:
+    """Yield the children of ``<body>`` one at a time via ``iterparse``.
+
+    Each child is detached from the tree as soon as it is complete, so only the
+    elements still referenced by the caller (the current entry) stay alive.
+    """
+    depth = 0
+    body: Optional[ET.Element] = None
+    body_depth = -1
+    for event, elem in ET.iterparse(path, events=("start", "end")):
+        if event == "start":
+            depth += 1
+            if body is None and elem.tag == BODY_TAG:
+                body = elem
+                body_depth = depth
+            continue
+        if body is not None and depth == body_depth + 1:
+            body.remove(elem)
+            yield elem
+        elif elem is body:
+            return
+        depth -= 1
+    if body is None:
+        raise RuntimeError(f"Body not found in source {path}")
+
+
 def split_heading_parts(elem: ET.Element) -> List[str]:
     parts: List[str] = []
     current: List[str] = []
@@ -310,42 +286,79 @@ def split_heading_compounds(text: str) -> List[str]:
     return [text]
 
 
-def iter_entries() -> Iterable[Entry]:
-    for chapter_path in CHAPTER_FILES:
-        elems = load_body_elements(chapter_path)
-        heading: Optional[str] = None
-        buffer: List[ET.Element] = []
-
-        for elem in elems:
-            klass = elem.get("class")
-            if klass == "h":
-                parts = split_heading_parts(elem)
-                expanded: List[str] = []
-                for part in parts:
-                    expanded.extend(split_heading_variants(part))
-
-                if heading is not None:
-                    for index, part in enumerate(split_heading_variants(heading)):
-                        if part and not should_skip_heading(part):
-                            yield Entry(part, buffer if index == 0 else [], chapter_path)
-
-                for part in expanded[:-1]:
+def iter_chapter_entries(chapter_path: Path, stream: bool = False) -> Iterable[Entry]:
+    """Yield the entries of one chapter file.
+
+    With ``stream`` the chapter is read incrementally and each entry's elements
+    are released once the next entry is requested, so consume entries as they
+    arrive instead of collecting them.
+    """
+    elems = stream_body_elements(chapter_path) if stream else load_body_elements(chapter_path)
+    heading: Optional[str] = None
+    buffer: List[ET.Element] = []
+
+    for elem in elems:
+        klass = elem.get("class")
+        if klass == "h":
+            parts = split_heading_parts(elem)
+            expanded: List[str] = []
+            for part in parts:
+                expanded.extend(split_heading_variants(part))
+
+            if heading is not None:
+                for index, part in enumerate(split_heading_variants(heading)):
                     if part and not should_skip_heading(part):
-                        yield Entry(part, [], chapter_path)
-                heading = expanded[-1] if expanded else ""
-                buffer = []
-            elif heading is not None:
-                buffer.append(elem)
-
-        if heading is not None and buffer:
-            for index, part in enumerate(split_heading_variants(heading)):
+                        yield Entry(part, buffer if index == 0 else [], chapter_path)
+
+            for part in expanded[:-1]:
                 if part and not should_skip_heading(part):
-                    yield Entry(part, buffer if index == 0 else [], chapter_path)
+                    yield Entry(part, [], chapter_path)
+            heading = expanded[-1] if expanded else ""
+            buffer = []
+        elif heading is not None:
+            buffer.append(elem)
+
+    if heading is not None and buffer:
+        for index, part in enumerate(split_heading_variants(heading)):
+            if part and not should_skip_heading(part):
+                yield Entry(part, buffer if index == 0 else [], chapter_path)
+
+
+def iter_entries(stream: bool = False) -> Iterable[Entry]:
+    for chapter_path in CHAPTER_FILES:
+        yield from iter_chapter_entries(chapter_path, stream)
+
+
+def iter_records(
+    paths: Iterable[Path], skip: Container[str] = frozenset(), stream: bool = False
+) -> Iterator[Dict[str, object]]:
+    """Parse entries in order, yielding the first record for every unseen slug."""
+    seen: Set[str] = set()
+    for chapter_path in paths:
+        for entry in iter_chapter_entries(chapter_path, stream):
+            canonical_name, _ = canonicalize_name(entry.heading)
+            if not canonical_name:
+                continue
+            slug = slugify(canonical_name)
+            if slug in skip or slug in seen:
+                continue
+            record = parse_entry(entry)
+            if record is None:
+                continue
+            seen.add(slug)
+            yield record
+
+
+def parse_chapter(
+    chapter_path: Path, skip: FrozenSet[str] = frozenset(), stream: bool = False
+) -> List[Dict[str, object]]:
+    """Process-pool worker: parse one file into records."""
+    return list(iter_records([chapter_path], skip, stream))
 
 
 def should_skip_heading(heading: str) -> bool:
     upper = heading.upper()
-    if any(keyword in upper for keyword in SKIP_KEYWORDS):
+    if SKIP_KEYWORD_PATTERN.search(upper):
         return True
     if "IN GENERAL" in upper or "MIXED" in upper:
         return True
@@ -365,10 +378,7 @@ def parse_entry(entry: Entry) -> Optional[Dict[str, object]]:
         return None
 
     display_name = clean_text(entry.heading)
-    display_name_ascii = "".join(
-        ch for ch in unicodedata.normalize("NFKD", display_name) if not unicodedata.combining(ch)
-    )
-    display_name = re.sub(r"\s+", " ", display_name_ascii).strip()
+    display_name = re.sub(r"\s+", " ", strip_accents(display_name)).strip()
     metadata = {
         "season": [],
         "taste": [],
@@ -579,18 +589,11 @@ def split_pairing_candidates(text: str) -> List[str]:
 def should_skip_pairing(canonical: str, raw_text: Optional[str] = None) -> bool:
     if not canonical or len(canonical.strip()) <= 1:
         return True
-    lower = canonical.lower()
-    for word in PAIRING_STOPWORDS:
-        if word in lower:
-            return True
+    if PAIRING_STOPWORD_PATTERN.search(canonical.lower()):
+        return True
     if raw_text:
         raw_lower = raw_text.lower()
-        if re.search(
-            r"\b(add|avoid|bake|cook|fry|grill|mix|pair|pairs|pairing|roast|saute|sauté|serve|sprinkle|stir|try|use|using|goes|never)\b",
-            raw_lower,
-        ):
-            return True
-        if "a little " in raw_lower or "goes a very long way" in raw_lower:
+        if PAIRING_CONTEXT_PATTERN.search(raw_lower):
             return True
         if len(raw_lower.split()) > 7:
             return True
@@ -624,57 +627,83 @@ def compact_metadata(metadata: Dict[str, object]) -> None:
             metadata.pop(key)
 
 
-def append_record(record: Dict[str, object]) -> None:
-    OUTPUT_PATH.parent.mkdir(parents=True, exist_ok=True)
-    if OUTPUT_PATH.exists():
-        data = json.loads(OUTPUT_PATH.read_text(encoding="utf-8"))
-    else:
-        data = []
-
-    if any(item.get("slug") == record["slug"] for item in data):
-        return
-
-    data.append(record)
-    OUTPUT_PATH.write_text(json.dumps(data, indent=2, ensure_ascii=False), encoding="utf-8")
-
-
 def main() -> None:
     parser = argparse.ArgumentParser(description="Parse Flavor Bible ingredient entries.")
     parser.add_argument("--limit", type=int, default=5, help="Number of new entries to append (default: 5)")
     parser.add_argument("--rebuild", action="store_true", help="Rebuild output from scratch")
+    parser.add_argument(
+        "--checkpoint",
+        type=int,
+        default=0,
+        help="Write the output every N new entries (default: only once at the end)",
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=1,
+        help="Parse source files in N worker processes (default: 1, serial)",
+    )
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="Read source files incrementally (iterparse) to keep peak memory flat",
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Reparse only source files (or rule tables) that changed since the last incremental run",
+    )
+    parser.add_argument(
+        "--compact",
+        action="store_true",
+        help="Also write the memory-mappable <name>.compact.bin next to the JSON output",
+    )
     args = parser.parse_args()
 
-    if args.rebuild and OUTPUT_PATH.exists():
-        OUTPUT_PATH.unlink()
+    if args.incremental:
+        rules = rules_digest(
+            SKIP_KEYWORDS=SKIP_KEYWORDS,
+            PAIRING_STOPWORDS=PAIRING_STOPWORDS,
+            TIER_PRIORITY=TIER_PRIORITY,
+        )
+        result = incremental_build(
+            CHAPTER_FILES, OUTPUT_PATH, rules, partial(parse_chapter, stream=args.stream), jobs=args.jobs
+        )
+        for name in result.reparsed:
+            print(f"Reparsed: {name}")
+        print(f"Reparsed {len(result.reparsed)} of {result.total_files} source files; {result.records} entries written.")
+        if args.compact:
+            print(f"Compact dataset written: {convert_json(OUTPUT_PATH)}")
+        return
 
     processed = 0
-    existing = set()
-    if OUTPUT_PATH.exists():
-        existing = {item["slug"] for item in json.loads(OUTPUT_PATH.read_text(encoding="utf-8"))}
-
     limit = args.limit
     if args.rebuild:
         limit = 10**9
 
-    for entry in iter_entries():
-        canonical_name, _ = canonicalize_name(entry.heading)
-        if not canonical_name:
-            continue
-        slug = slugify(canonical_name)
-        if slug in existing:
-            continue
-        record = parse_entry(entry)
-        if record is None:
-            continue
-        append_record(record)
-        existing.add(slug)
-        processed += 1
-        print(f"Captured ingredient: {record['display_name']}")
-        if processed >= limit:
-            break
+    with RecordWriter(OUTPUT_PATH, rebuild=args.rebuild, checkpoint_every=args.checkpoint) as writer:
+        if args.jobs > 1:
+            worker = partial(parse_chapter, skip=frozenset(writer.slugs), stream=args.stream)
+            records: Iterable[Dict[str, object]] = (
+                record for _, chapter in map_chapters(worker, CHAPTER_FILES, args.jobs) for record in chapter
+            )
+        else:
+            records = iter_records(CHAPTER_FILES, writer, args.stream)
+
+        for record in records:
+            if record["slug"] in writer:
+                continue
+            writer.add(record)
+            processed += 1
+            print(f"Captured ingredient: {record['display_name']}")
+            if processed >= limit:
+                break
 
     if processed == 0:
         print("No new entries processed.")
+    if args.compact:
+        write_compact(compact_path_for(OUTPUT_PATH), writer.records)
+        print(f"Compact dataset written: {compact_path_for(OUTPUT_PATH)}")
 
 
 if __name__ == "__main__":
@@ -3,13 +3,19 @@
 from __future__ import annotations
 
 import argparse
-import json
 import re
-import unicodedata
 import xml.etree.ElementTree as ET
-from dataclasses import dataclass
+from collections import deque
+from dataclasses import dataclass, field
+from functools import partial
 from pathlib import Path
-from typing import Dict, Iterable, List, Optional, Tuple
+from typing import Container, Deque, Dict, FrozenSet, Iterable, Iterator, List, Optional, Set, Tuple
+
+from build_manifest import incremental_build, rules_digest
+from canonical_names import canonicalize_name, clean_text, keyword_pattern, slugify, strip_accents
+from chapter_pool import map_chapters
+from compact_dataset import compact_path_for, convert_json, write_compact
+from record_writer import RecordWriter
 
 ROOT = Path(__file__).resolve().parents[1]
 TEXT_DIR = ROOT / "docs" / "extracted" / "vegetarian-flavor-bible" / "OEBPS"
@@ -151,6 +157,13 @@ PAIRING_STOPWORDS = {
 
 TIER_PRIORITY = {"ethereal": 3, "classic": 2, "frequent": 1, "recommended": 0}
 
+SKIP_KEYWORD_PATTERN = keyword_pattern(SKIP_KEYWORDS)
+PAIRING_STOPWORD_PATTERN = keyword_pattern(PAIRING_STOPWORDS)
+PAIRING_CONTEXT_PATTERN = re.compile(
+    r"\b(add|avoid|bake|cook|fry|grill|mix|pair|pairs|pairing|roast|saute|sauté|serve|sprinkle|stir|try|use|using|goes|never)\b"
+    r"|a little |goes a very long way"
+)
+
 
 @dataclass
 class Entry:
@@ -163,68 +176,6 @@ def strip_tag(tag: str) -> str:
     return tag.split("}")[-1] if "}" in tag else tag
 
 
-def clean_text(text: Optional[str]) -> str:
-    if text is None:
-        return ""
-    normalized = unicodedata.normalize("NFKC", text)
-    normalized = normalized.replace("\xa0", " ")
-    normalized = normalized.replace("\u2013", "-")
-    normalized = normalized.replace("\u2014", "-")
-    normalized = normalized.replace("\ufffd", "")
-    normalized = re.sub(r"\s+", " ", normalized)
-    return normalized.strip()
-
-
-def canonicalize_name(text: str) -> Tuple[Optional[str], str]:
-    original = clean_text(text)
-    if not original:
-        return None, original
-
-    working = re.sub(r"\([^)]*\)", "", original)
-    working = re.sub(r";?\s*see also.*", "", working, flags=re.IGNORECASE)
-    working = re.sub(r";?\s*aka.*", "", working, flags=re.IGNORECASE)
-    working = re.sub(r",?\s*aka.*", "", working, flags=re.IGNORECASE)
-    working = re.sub(r",?\s*and/or.*", "", working, flags=re.IGNORECASE)
-    working = re.sub(r",?\s*including.*", "", working, flags=re.IGNORECASE)
-    working = re.sub(r",?\s*with.*", "", working, flags=re.IGNORECASE)
-    working = re.sub(r",?\s*e\.g\.,?.*", "", working, flags=re.IGNORECASE)
-    working = re.sub(r"\b(in general|general|mixed)\b.*", "", working, flags=re.IGNORECASE)
-    working = working.replace("/", " ")
-    ascii_working = "".join(
-        ch for ch in unicodedata.normalize("NFKD", working) if not unicodedata.combining(ch)
-    )
-    ascii_working = re.sub(r"\bas a [^,;]+", "", ascii_working, flags=re.IGNORECASE)
-    ascii_working = re.sub(r"\bfor [^,;]+", "", ascii_working, flags=re.IGNORECASE)
-    ascii_working = re.sub(r"[^A-Za-z0-9,\- ]", " ", ascii_working)
-    ascii_working = re.sub(r"\s+", " ", ascii_working).strip(" ,;-")
-
-    if not ascii_working:
-        return None, original
-
-    working = ascii_working
-
-    if "," in working:
-        parts = [p.strip() for p in working.split(",") if p.strip()]
-        if len(parts) == 2:
-            working = f"{parts[1]} {parts[0]}".strip()
-        else:
-            working = " ".join(parts)
-
-    ascii_name = re.sub(r"[^a-zA-Z0-9 '\-]", " ", working)
-    ascii_name = re.sub(r"\s+", " ", ascii_name).strip(" ,;- ")
-    if not ascii_name:
-        return None, original
-
-    canonical = ascii_name.lower()
-    return canonical, original
-
-
-def slugify(text: str) -> str:
-    text = text.lower()
-    text = re.sub(r"[^a-z0-9]+", "-", text).strip("-")
-    return text
-
-
 def split_heading_variants(heading: str) -> List[str]:
     text = clean_text(heading)
     if not text:
@@ -288,40 +239,251 @@ def split_heading_compounds(text: str) -> List[str]:
     return [text]
 
 
-def iter_entries() -> Iterable[Entry]:
-    for path in XHTML_FILES:
-        try:
-            root = ET.parse(path).getroot()
-        except ET.ParseError:
-            continue
-        body = root.find(".//x:body", NS)
-        if body is None:
-            continue
+STRONG_TAG = f"{{{NS['x']}}}strong"
+BODY_TAG = f"{{{NS['x']}}}body"
+
+
+def first_strong_child(elem: ET.Element, first_strong: Dict[ET.Element, ET.Element]) -> Optional[ET.Element]:
+    """First ``<strong>`` below ``elem``, given the answers for its children."""
+    for child in elem:
+        if child.tag == STRONG_TAG:
+            return child
+        nested = first_strong.get(child)
+        if nested is not None:
+            return nested
+    return None
+
+
+def map_first_strong(body: ET.Element) -> Dict[ET.Element, ET.Element]:
+    """Map each element to its first ``<strong>`` descendant in document order.
+
+    Walking the pre-order list backwards visits children before their parents,
+    so the whole map is built in one pass instead of one subtree search per
+    element.
+    """
+    first_strong: Dict[ET.Element, ET.Element] = {}
+    for elem in reversed(list(body.iter())):
+        strong = first_strong_child(elem, first_strong)
+        if strong is not None:
+            first_strong[elem] = strong
+    return first_strong
+
+
+def is_content_block(elem: ET.Element, strong: Optional[ET.Element], labels: Dict[ET.Element, bool]) -> bool:
+    """Return True when ``parse_entry`` can act on ``elem``.
+
+    Wrapper elements (``span``/``em``/``strong`` inside a pairing line, or
+    containers whose first ``<strong>`` is not a ``Label:``) never contribute
+    anything, so they are dropped before their text is ever extracted.
+    """
+    tag = strip_tag(elem.tag)
+    cls = elem.get("class") or ""
+    if (tag == "p" and cls == "ingredient") or (tag == "h1" and cls == "ingredients-title"):
+        return True
+    if strong is None:
+        return False
+    is_label = labels.get(strong)
+    if is_label is None:
+        is_label = clean_text("".join(strong.itertext())).endswith(":")
+        labels[strong] = is_label
+    return is_label
+
+
+def is_entry_heading(elem: ET.Element) -> bool:
+    return strip_tag(elem.tag) == "h1" and elem.get("class") == "recipe-title"
+
+
+def expand_entry(heading: str, buffer: List[ET.Element], path: Path) -> Iterator[Entry]:
+    for index, part in enumerate(split_heading_variants(heading)):
+        if part and not should_skip_heading(part):
+            yield Entry(part, buffer if index == 0 else [], path)
+
+
+def iter_chapter_entries(path: Path, stream: bool = False) -> Iterable[Entry]:
+    """Yield the entries of one XHTML file.
+
+    With ``stream`` the file is read via ``iterparse`` (see
+    ``stream_chapter_entries``); consume entries as they arrive instead of
+    collecting them.
+    """
+    if stream:
+        yield from stream_chapter_entries(path)
+        return
+
+    try:
+        root = ET.parse(path).getroot()
+    except ET.ParseError:
+        return
+    body = root.find(".//x:body", NS)
+    if body is None:
+        return
 
-        heading: Optional[str] = None
-        buffer: List[ET.Element] = []
-
-        for elem in body.iter():
-            tag = strip_tag(elem.tag)
-            if tag == "h1" and elem.get("class") == "recipe-title":
-                if heading is not None and buffer:
-                    for index, part in enumerate(split_heading_variants(heading)):
-                        if part and not should_skip_heading(part):
-                            yield Entry(part, buffer if index == 0 else [], path)
-                heading = "".join(elem.itertext())
-                buffer = []
-            elif heading is not None:
+    first_strong = map_first_strong(body)
+    labels: Dict[ET.Element, bool] = {}
+    heading: Optional[str] = None
+    buffer: List[ET.Element] = []
+    has_content = False
+
+    for elem in body.iter():
+        if is_entry_heading(elem):
+            if heading is not None and has_content:
+                yield from expand_entry(heading, buffer, path)
+            heading = "".join(elem.itertext())
+            buffer = []
+            has_content = False
+        elif heading is not None:
+            has_content = True
+            if is_content_block(elem, first_strong.get(elem), labels):
                 buffer.append(elem)
 
-        if heading is not None and buffer:
-            for index, part in enumerate(split_heading_variants(heading)):
-                if part and not should_skip_heading(part):
-                    yield Entry(part, buffer if index == 0 else [], path)
+    if heading is not None and has_content:
+        yield from expand_entry(heading, buffer, path)
+
+
+class _DiscardTarget:
+    def close(self) -> None:
+        return None
+
+
+def is_well_formed(path: Path) -> bool:
+    """Check ``path`` with the same parser ``ET.parse`` uses, without building a tree."""
+    parser = ET.XMLParser(target=_DiscardTarget())
+    try:
+        with path.open("rb") as handle:
+            for chunk in iter(partial(handle.read, 1 << 16), b""):
+                parser.feed(chunk)
+        parser.close()
+    except ET.ParseError:
+        return False
+    return True
+
+
+@dataclass
+class PendingEntry:
+    heading: Optional[str] = None
+    elements: List[ET.Element] = field(default_factory=list)
+    open_elements: int = 0
+    closed: bool = False
+
+
+def stream_chapter_entries(path: Path) -> Iterator[Entry]:
+    """``iter_chapter_entries`` on top of ``ET.iterparse``.
+
+    Elements are assigned to entries in the same pre-order as the tree walk,
+    and an entry is yielded as soon as its heading and every element it
+    collected have been fully parsed. Finished children of ``<body>`` are
+    detached right away, so memory is bounded by the entries in flight rather
+    than by the file size. Like the tree walk, a malformed file is skipped as
+    a whole: a tree-less pre-pass checks it before any entry is yielded.
+    """
+    if not is_well_formed(path):
+        return
+    first_strong: Dict[ET.Element, ET.Element] = {}
+    labels: Dict[ET.Element, bool] = {}
+    keep: Dict[ET.Element, bool] = {}
+    owners: Dict[ET.Element, PendingEntry] = {}
+    headings: Dict[ET.Element, PendingEntry] = {}
+    pending: Deque[PendingEntry] = deque()
+    current: Optional[PendingEntry] = None
+    body: Optional[ET.Element] = None
+    depth = 0
+    body_depth = -1
+
+    def ready() -> Iterator[Entry]:
+        while pending and pending[0].closed and pending[0].open_elements == 0 and pending[0].heading is not None:
+            done = pending.popleft()
+            content = [elem for elem in done.elements if keep.pop(elem)]
+            if done.elements:
+                yield from expand_entry(done.heading, content, path)
+
+    try:
+        for event, elem in ET.iterparse(path, events=("start", "end")):
+            if event == "start":
+                depth += 1
+                if body is None:
+                    if elem.tag == BODY_TAG:
+                        body = elem
+                        body_depth = depth
+                elif is_entry_heading(elem):
+                    if current is not None:
+                        current.closed = True
+                    current = PendingEntry()
+                    pending.append(current)
+                    headings[elem] = current
+                elif current is not None:
+                    current.elements.append(elem)
+                    current.open_elements += 1
+                    owners[elem] = current
+                continue
+
+            depth -= 1
+            if body is None:
+                continue
+            if elem is body:
+                break
+
+            strong = first_strong_child(elem, first_strong)
+            for child in elem:
+                first_strong.pop(child, None)
+            if strong is not None:
+                first_strong[elem] = strong
+
+            owner = owners.pop(elem, None)
+            if owner is not None:
+                keep[elem] = is_content_block(elem, strong, labels)
+                owner.open_elements -= 1
+            heading_entry = headings.pop(elem, None)
+            if heading_entry is not None:
+                heading_entry.heading = "".join(elem.itertext())
+
+            if depth == body_depth:
+                body.remove(elem)
+                first_strong.pop(elem, None)
+                labels.clear()
+            yield from ready()
+    except ET.ParseError:
+        return
+
+    if current is not None:
+        current.closed = True
+    yield from ready()
+
+
+def iter_entries(stream: bool = False) -> Iterable[Entry]:
+    for path in XHTML_FILES:
+        yield from iter_chapter_entries(path, stream)
+
+
+def iter_records(
+    paths: Iterable[Path], skip: Container[str] = frozenset(), stream: bool = False
+) -> Iterator[Dict[str, object]]:
+    """Parse entries in order, yielding the first record for every unseen slug."""
+    seen: Set[str] = set()
+    for path in paths:
+        for entry in iter_chapter_entries(path, stream):
+            canonical_name, _ = canonicalize_name(entry.heading)
+            if not canonical_name:
+                continue
+            slug = slugify(canonical_name)
+            if slug in skip or slug in seen:
+                continue
+            record = parse_entry(entry)
+            if record is None:
+                continue
+            seen.add(slug)
+            yield record
+
+
+def parse_chapter(
+    path: Path, skip: FrozenSet[str] = frozenset(), stream: bool = False
+) -> List[Dict[str, object]]:
+    """Process-pool worker: parse one file into records."""
+    return list(iter_records([path], skip, stream))
 
 
 def should_skip_heading(heading: str) -> bool:
     upper = heading.upper()
-    if any(keyword in upper for keyword in SKIP_KEYWORDS):
+    if SKIP_KEYWORD_PATTERN.search(upper):
         return True
     if "IN GENERAL" in upper or "MIXED" in upper:
         return True
@@ -341,10 +503,7 @@ def parse_entry(entry: Entry) -> Optional[Dict[str, object]]:
         return None
 
     display_name = clean_text(entry.heading)
-    display_name_ascii = "".join(
-        ch for ch in unicodedata.normalize("NFKD", display_name) if not unicodedata.combining(ch)
-    )
-    display_name = re.sub(r"\s+", " ", display_name_ascii).strip()
+    display_name = re.sub(r"\s+", " ", strip_accents(display_name)).strip()
     metadata = {
         "season": [],
         "taste": [],
@@ -557,18 +716,11 @@ def split_pairing_candidates(text: str) -> List[str]:
 def should_skip_pairing(canonical: str, raw_text: Optional[str] = None) -> bool:
     if not canonical or len(canonical.strip()) <= 1:
         return True
-    lower = canonical.lower()
-    for word in PAIRING_STOPWORDS:
-        if word in lower:
-            return True
+    if PAIRING_STOPWORD_PATTERN.search(canonical.lower()):
+        return True
     if raw_text:
         raw_lower = raw_text.lower()
-        if re.search(
-            r"\b(add|avoid|bake|cook|fry|grill|mix|pair|pairs|pairing|roast|saute|sauté|serve|sprinkle|stir|try|use|using|goes|never)\b",
-            raw_lower,
-        ):
-            return True
-        if "a little " in raw_lower or "goes a very long way" in raw_lower:
+        if PAIRING_CONTEXT_PATTERN.search(raw_lower):
             return True
         if len(raw_lower.split()) > 7:
             return True
@@ -602,57 +754,83 @@ def compact_metadata(metadata: Dict[str, object]) -> None:
             metadata.pop(key)
 
 
-def append_record(record: Dict[str, object]) -> None:
-    OUTPUT_PATH.parent.mkdir(parents=True, exist_ok=True)
-    if OUTPUT_PATH.exists():
-        data = json.loads(OUTPUT_PATH.read_text(encoding="utf-8"))
-    else:
-        data = []
-
-    if any(item.get("slug") == record["slug"] for item in data):
-        return
-
-    data.append(record)
-    OUTPUT_PATH.write_text(json.dumps(data, indent=2, ensure_ascii=False), encoding="utf-8")
-
-
 def main() -> None:
     parser = argparse.ArgumentParser(description="Parse Vegetarian Flavor Bible entries.")
     parser.add_argument("--limit", type=int, default=50, help="Number of new entries to append (default: 50)")
     parser.add_argument("--rebuild", action="store_true", help="Rebuild output from scratch")
+    parser.add_argument(
+        "--checkpoint",
+        type=int,
+        default=0,
+        help="Write the output every N new entries (default: only once at the end)",
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=1,
+        help="Parse source files in N worker processes (default: 1, serial)",
+    )
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="Read source files incrementally (iterparse) to keep peak memory flat",
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Reparse only source files (or rule tables) that changed since the last incremental run",
+    )
+    parser.add_argument(
+        "--compact",
+        action="store_true",
+        help="Also write the memory-mappable <name>.compact.bin next to the JSON output",
+    )
     args = parser.parse_args()
 
-    if args.rebuild and OUTPUT_PATH.exists():
-        OUTPUT_PATH.unlink()
+    if args.incremental:
+        rules = rules_digest(
+            SKIP_KEYWORDS=SKIP_KEYWORDS,
+            PAIRING_STOPWORDS=PAIRING_STOPWORDS,
+            TIER_PRIORITY=TIER_PRIORITY,
+        )
+        result = incremental_build(
+            XHTML_FILES, OUTPUT_PATH, rules, partial(parse_chapter, stream=args.stream), jobs=args.jobs
+        )
+        for name in result.reparsed:
+            print(f"Reparsed: {name}")
+        print(f"Reparsed {len(result.reparsed)} of {result.total_files} source files; {result.records} entries written.")
+        if args.compact:
+            print(f"Compact dataset written: {convert_json(OUTPUT_PATH)}")
+        return
 
     processed = 0
-    existing = set()
-    if OUTPUT_PATH.exists():
-        existing = {item["slug"] for item in json.loads(OUTPUT_PATH.read_text(encoding="utf-8"))}
-
     limit = args.limit
     if args.rebuild:
         limit = 10**9
 
-    for entry in iter_entries():
-        canonical_name, _ = canonicalize_name(entry.heading)
-        if not canonical_name:
-            continue
-        slug = slugify(canonical_name)
-        if slug in existing:
-            continue
-        record = parse_entry(entry)
-        if record is None:
-            continue
-        append_record(record)
-        existing.add(slug)
-        processed += 1
-        print(f"Captured ingredient: {record['display_name']}")
-        if processed >= limit:
-            break
+    with RecordWriter(OUTPUT_PATH, rebuild=args.rebuild, checkpoint_every=args.checkpoint) as writer:
+        if args.jobs > 1:
+            worker = partial(parse_chapter, skip=frozenset(writer.slugs), stream=args.stream)
+            records: Iterable[Dict[str, object]] = (
+                record for _, chapter in map_chapters(worker, XHTML_FILES, args.jobs) for record in chapter
+            )
+        else:
+            records = iter_records(XHTML_FILES, writer, args.stream)
+
+        for record in records:
+            if record["slug"] in writer:
+                continue
+            writer.add(record)
+            processed += 1
+            print(f"Captured ingredient: {record['display_name']}")
+            if processed >= limit:
+                break
 
     if processed == 0:
         print("No new entries processed.")
+    if args.compact:
+        write_compact(compact_path_for(OUTPUT_PATH), writer.records)
+        print(f"Compact dataset written: {compact_path_for(OUTPUT_PATH)}")
 
 
 if __name__ == "__main__":
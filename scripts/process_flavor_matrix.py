@@ -2,46 +2,66 @@
 
 Usage:
     python scripts/process_flavor_matrix.py
+    python scripts/process_flavor_matrix.py path/to/pages --workers 4
 
 The script scans `docs/flavor-matrix-processed/` for `.json` files (or a single
-array JSON), validates the schema, and emits CSV artifacts under
-`build/flavor-matrix/`:
+JSON file), streams the records out of each one (plain arrays, concatenated
+arrays and the `{"entries": [[...]]}` envelope all work), validates them, and
+writes CSV rows as each record arrives under `build/flavor-matrix/`:
     - ingredients.csv
     - pairings.csv
     - substitutes.csv
     - matrix_nodes.csv
     - matrix_edges.csv
-It also writes a simple processing report (`report.txt`) summarising counts and
-any validation warnings.
+    - matrix_labels.csv / matrix_edges_unique.csv (see `matrix_edges`)
+It also writes a simple processing report (`report.txt`) summarising counts,
+any validation warnings and how long each file took, plus the same schema
+problems as JSON in `diagnostics.json`.
+
+`--workers N` parses and validates files in N processes; rows are still
+written by the parent in file order, so the CSVs are byte-identical to a
+serial run.
 """
 
 from __future__ import annotations
 
+import argparse
 import csv
-import json
+import os
 import sys
+import tempfile
+import time
 from collections import defaultdict
 from dataclasses import dataclass, field
 from datetime import datetime
 from pathlib import Path
-from typing import Any, Dict, Iterable, List, Optional, Sequence
-
-REQUIRED_FIELDS = {
-    "ingredient",
-    "page_reference",
-    "summary",
-    "best_pairings",
-    "surprise_pairings",
-    "substitutes",
-    "additional_notes",
-    "matrix_nodes",
-    "matrix_edges",
-    "uncertainties",
-}
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, TextIO, Tuple
+
+from chapter_pool import map_chapters
+from json_stream import iter_json_records
+from matrix_edges import EdgeConsolidator
+from matrix_schema import record_problems
+from record_writer import output_mode, write_json_atomic
 
 ROOT = Path(__file__).resolve().parents[1]
 INPUT_DIR = ROOT / "docs" / "flavor-matrix-processed"
 OUTPUT_DIR = ROOT / "build" / "flavor-matrix"
+OUTPUT_FILES = {
+    "ingredients": (
+        "ingredients.csv",
+        ["ingredient", "page_reference", "summary", "additional_notes", "uncertainties", "source_file"],
+    ),
+    "pairings": ("pairings.csv", ["ingredient", "target", "tier", "source"]),
+    "substitutes": ("substitutes.csv", ["ingredient", "substitute", "source_file"]),
+    "matrix_nodes": (
+        "matrix_nodes.csv",
+        ["ingredient", "label", "color", "relative_size", "legend_code", "notes", "source_file"],
+    ),
+    "matrix_edges": (
+        "matrix_edges.csv",
+        ["ingredient", "source", "target", "color", "thickness", "legend_code", "notes", "source_file"],
+    ),
+}
 
 
 @dataclass
@@ -50,193 +70,232 @@ class Record:
     source: Path
 
 
-def load_records(input_path: Path) -> List[Record]:
-    records: List[Record] = []
-    if input_path.is_file() and input_path.suffix.lower() == ".json":
-        records.extend(_records_from_file(input_path))
-        return records
+@dataclass
+class FileResult:
+    path: Path
+    records: int
+    seconds: float
+    warnings: List[str]
+    rows: List[Tuple[str, List[Any]]]
+    diagnostics: List[Dict[str, Any]] = field(default_factory=list)
 
+
+def input_files(input_path: Path) -> List[Path]:
+    if input_path.is_file() and input_path.suffix.lower() == ".json":
+        return [input_path]
     if not input_path.exists():
         raise FileNotFoundError(f"Input path not found: {input_path}")
+    return sorted(input_path.glob("*.json"))
 
-    json_files = sorted(input_path.glob("*.json"))
-    for json_file in json_files:
-        records.extend(_records_from_file(json_file))
-    return records
 
+def iter_records(input_path: Path) -> Iterator[Record]:
+    """Stream records from one export or every `*.json` in a directory.
 
-def _records_from_file(path: Path) -> List[Record]:
-    with path.open(encoding="utf-8") as f:
-        payload = json.load(f)
+    Files may hold a plain array, concatenated arrays or the
+    `{"entries": [[...]]}` envelope; see `json_stream.iter_json_records`.
+    """
+    for json_file in input_files(input_path):
+        yield from iter_file_records(json_file)
 
-    if isinstance(payload, dict):
-        payload = [payload]
-    if not isinstance(payload, list):
-        raise ValueError(f"JSON root must be dict or list in {path}")
 
-    records: List[Record] = []
-    for idx, item in enumerate(payload):
-        if not isinstance(item, dict):
-            raise ValueError(f"Entry {idx} in {path} is not an object")
-        records.append(Record(item, path))
-    return records
+def iter_file_records(path: Path) -> Iterator[Record]:
+    # Misspelt records still arrive (and fail the `required` check); entries
+    # that are not objects at all cannot be validated.
+    for index, data in enumerate(iter_json_records(path)):
+        if not isinstance(data, dict):
+            raise ValueError(f"Entry {index} in {path} is not an object")
+        yield Record(data, path)
 
 
-def validate_record(record: Record) -> List[str]:
+def record_diagnostics(record: Record, index: int = 0) -> List[Dict[str, Any]]:
+    """Schema problems in ``record`` as JSON-ready dicts (see `matrix_schema`)."""
     data = record.data
-    missing = REQUIRED_FIELDS - data.keys()
-    warnings: List[str] = []
-    if missing:
-        warnings.append(
-            f"{record.source.name}: missing fields {sorted(missing)} "
-            f"for ingredient '{data.get('ingredient', '<unknown>')}'"
-        )
-    for key in ("best_pairings", "surprise_pairings", "substitutes", "additional_notes"):
-        value = data.get(key)
-        if value is not None and not isinstance(value, list):
-            warnings.append(
-                f"{record.source.name}: field '{key}' expected list "
-                f"(ingredient '{data.get('ingredient', '<unknown>')}')"
-            )
-    for key in ("matrix_nodes", "matrix_edges"):
-        value = data.get(key)
-        if value is not None and not isinstance(value, list):
-            warnings.append(
-                f"{record.source.name}: field '{key}' expected list of objects "
-                f"(ingredient '{data.get('ingredient', '<unknown>')}')"
-            )
-    return warnings
+    ingredient = data.get("ingredient") if isinstance(data.get("ingredient"), str) else None
+    return [
+        {
+            "file": record.source.name,
+            "record": index,
+            "ingredient": ingredient,
+            "path": path,
+            "code": code,
+            "message": message,
+        }
+        for path, code, message in record_problems(data)
+    ]
 
 
-def ensure_output_dir(path: Path) -> None:
-    path.mkdir(parents=True, exist_ok=True)
+def format_diagnostic(diagnostic: Dict[str, Any]) -> str:
+    ingredient = diagnostic["ingredient"] or "<unknown>"
+    if diagnostic["code"] == "required" and not diagnostic["path"]:
+        return f"{diagnostic['file']}: {diagnostic['message']} for ingredient '{ingredient}'"
+    return f"{diagnostic['file']}: field '{diagnostic['path']}' {diagnostic['message']} (ingredient '{ingredient}')"
 
 
-def write_csv(path: Path, headers: Sequence[str], rows: Iterable[Sequence[Any]]) -> None:
-    ensure_output_dir(path.parent)
-    with path.open("w", encoding="utf-8", newline="") as f:
-        writer = csv.writer(f)
-        writer.writerow(headers)
-        for row in rows:
-            writer.writerow(row)
+def validate_record(record: Record) -> List[str]:
+    return [format_diagnostic(diagnostic) for diagnostic in record_diagnostics(record)]
 
 
-def build_outputs(records: List[Record]) -> Dict[str, int]:
-    ensure_output_dir(OUTPUT_DIR)
-    counts = defaultdict(int)
-
-    ingredient_rows = []
-    pairing_rows = []
-    substitute_rows = []
-    node_rows = []
-    edge_rows = []
-
-    for record in records:
-        data = record.data
-        ingredient = data.get("ingredient")
-        if not ingredient:
-            continue
-
-        page_reference = data.get("page_reference", "")
-        summary = data.get("summary", "")
-        notes = data.get("additional_notes") or []
-        note_text = " | ".join(str(note) for note in notes) if notes else ""
-        uncertainties = data.get("uncertainties") or []
-        uncertainty_text = " | ".join(str(item) for item in uncertainties)
-
-        ingredient_rows.append(
-            [
-                ingredient,
-                page_reference,
-                summary,
-                note_text,
-                uncertainty_text,
-                record.source.name,
-            ]
-        )
-        counts["ingredients"] += 1
-
-        for pairing, tier in _iter_pairings(
-            ingredient, data.get("best_pairings"), data.get("surprise_pairings")
-        ):
-            pairing_rows.append(
-                [
-                    ingredient,
-                    pairing["target"],
-                    pairing["tier"],
-                    pairing["source"],
-                ]
-            )
-            counts["pairings"] += 1
-
-        for substitute in data.get("substitutes") or []:
-            substitute_rows.append(
-                [
-                    ingredient,
-                    substitute,
-                    record.source.name,
-                ]
-            )
-            counts["substitutes"] += 1
-
-        for node in data.get("matrix_nodes") or []:
-            node_rows.append(
-                [
-                    ingredient,
-                    node.get("label", ""),
-                    node.get("color", ""),
-                    node.get("relative_size", ""),
-                    node.get("legend_code", ""),
-                    node.get("notes", ""),
-                    record.source.name,
-                ]
-            )
-            counts["matrix_nodes"] += 1
-
-        for edge in data.get("matrix_edges") or []:
-            node_rows_source = edge.get("source", "")
-            node_rows_target = edge.get("target", "")
-            edge_rows.append(
-                [
-                    ingredient,
-                    node_rows_source,
-                    node_rows_target,
-                    edge.get("color", ""),
-                    edge.get("thickness", ""),
-                    edge.get("legend_code", ""),
-                    edge.get("notes", ""),
-                    record.source.name,
-                ]
-            )
-            counts["matrix_edges"] += 1
-
-    write_csv(
-        OUTPUT_DIR / "ingredients.csv",
-        ["ingredient", "page_reference", "summary", "additional_notes", "uncertainties", "source_file"],
-        ingredient_rows,
-    )
-    write_csv(
-        OUTPUT_DIR / "pairings.csv",
-        ["ingredient", "target", "tier", "source"],
-        pairing_rows,
-    )
-    write_csv(
-        OUTPUT_DIR / "substitutes.csv",
-        ["ingredient", "substitute", "source_file"],
-        substitute_rows,
-    )
-    write_csv(
-        OUTPUT_DIR / "matrix_nodes.csv",
-        ["ingredient", "label", "color", "relative_size", "legend_code", "notes", "source_file"],
-        node_rows,
-    )
-    write_csv(
-        OUTPUT_DIR / "matrix_edges.csv",
-        ["ingredient", "source", "target", "color", "thickness", "legend_code", "notes", "source_file"],
-        edge_rows,
-    )
+def ensure_output_dir(path: Path) -> None:
+    path.mkdir(parents=True, exist_ok=True)
 
-    return counts
+
+class CsvOutputs:
+    """The five CSV outputs, written row by row as records arrive.
+
+    Rows go to temp files next to the outputs, which replace them only when
+    the block exits cleanly; a failed run leaves the previous outputs intact.
+    Node and edge rows are also fed to an `EdgeConsolidator`, whose label and
+    deduplicated edge tables are written at the same point.
+    """
+
+    def __init__(self, output_dir: Path, edges: Optional[EdgeConsolidator] = None) -> None:
+        self.output_dir = output_dir
+        self.edges = edges if edges is not None else EdgeConsolidator()
+        self.counts: Dict[str, int] = defaultdict(int)
+        self._files: List[Tuple[TextIO, Path, Path]] = []
+        self._writers: Dict[str, Any] = {}
+
+    def __enter__(self) -> "CsvOutputs":
+        ensure_output_dir(self.output_dir)
+        try:
+            for name, (filename, headers) in OUTPUT_FILES.items():
+                fd, tmp_name = tempfile.mkstemp(prefix=f".{filename}.", suffix=".tmp", dir=self.output_dir)
+                handle = os.fdopen(fd, "w", encoding="utf-8", newline="")
+                self._files.append((handle, Path(tmp_name), self.output_dir / filename))
+                os.fchmod(handle.fileno(), output_mode(self.output_dir / filename))
+                self._writers[name] = csv.writer(handle)
+                self._writers[name].writerow(headers)
+        except BaseException:
+            self._discard()
+            raise
+        return self
+
+    def __exit__(self, exc_type: object, *exc_info: object) -> None:
+        if exc_type is not None:
+            self._discard()
+            return
+        try:
+            for handle, _, _ in self._files:
+                handle.close()
+            self.counts.update(self.edges.write(self.output_dir))
+        except BaseException:
+            self._discard()
+            raise
+        for _, tmp_path, path in self._files:
+            os.replace(tmp_path, path)
+
+    def _discard(self) -> None:
+        for handle, tmp_path, _ in self._files:
+            handle.close()
+            tmp_path.unlink(missing_ok=True)
+
+    def write(self, name: str, row: Sequence[Any]) -> None:
+        self._writers[name].writerow(row)
+        self.counts[name] += 1
+        self.edges.add_row(name, row)
+
+
+def _list(value: Any) -> List[Any]:
+    # Wrongly typed fields are reported by the validator and written as empty.
+    return value if isinstance(value, list) else []
+
+
+def _objects(value: Any) -> List[Dict[str, Any]]:
+    return [item for item in _list(value) if isinstance(item, dict)]
+
+
+def record_rows(record: Record) -> Iterator[Tuple[str, List[Any]]]:
+    """Yield ``(output name, row)`` for every CSV row a record contributes."""
+    data = record.data
+    ingredient = data.get("ingredient")
+    if not ingredient:
+        return
+
+    notes = _list(data.get("additional_notes"))
+    uncertainties = _list(data.get("uncertainties"))
+    yield "ingredients", [
+        ingredient,
+        data.get("page_reference", ""),
+        data.get("summary", ""),
+        " | ".join(str(note) for note in notes) if notes else "",
+        " | ".join(str(item) for item in uncertainties),
+        record.source.name,
+    ]
+
+    for pairing in _iter_pairings(ingredient, _list(data.get("best_pairings")), _list(data.get("surprise_pairings"))):
+        yield "pairings", [ingredient, pairing["target"], pairing["tier"], pairing["source"]]
+
+    for substitute in _list(data.get("substitutes")):
+        yield "substitutes", [ingredient, substitute, record.source.name]
+
+    for node in _objects(data.get("matrix_nodes")):
+        yield "matrix_nodes", [
+            ingredient,
+            node.get("label", ""),
+            node.get("color", ""),
+            node.get("relative_size", ""),
+            node.get("legend_code", ""),
+            node.get("notes", ""),
+            record.source.name,
+        ]
+
+    for edge in _objects(data.get("matrix_edges")):
+        yield "matrix_edges", [
+            ingredient,
+            edge.get("source", ""),
+            edge.get("target", ""),
+            edge.get("color", ""),
+            edge.get("thickness", ""),
+            edge.get("legend_code", ""),
+            edge.get("notes", ""),
+            record.source.name,
+        ]
+
+
+def build_outputs(records: Iterable[Record], output_dir: Path = OUTPUT_DIR) -> Dict[str, int]:
+    with CsvOutputs(output_dir) as outputs:
+        for record in records:
+            for name, row in record_rows(record):
+                outputs.write(name, row)
+    return outputs.counts
+
+
+def process_file(path: Path, outputs: Optional[CsvOutputs] = None) -> FileResult:
+    """Parse, validate and convert one export.
+
+    With ``outputs`` the rows are written as they are produced (the serial
+    path); without, they are collected so a worker process can hand them back
+    to the parent's single writer.
+    """
+    started = time.perf_counter()
+    result = FileResult(path, 0, 0.0, [], [])
+    for index, record in enumerate(iter_file_records(path)):
+        result.records += 1
+        diagnostics = record_diagnostics(record, index)
+        result.diagnostics.extend(diagnostics)
+        result.warnings.extend(format_diagnostic(diagnostic) for diagnostic in diagnostics)
+        for name, row in record_rows(record):
+            if outputs is None:
+                result.rows.append((name, row))
+            else:
+                outputs.write(name, row)
+    result.seconds = time.perf_counter() - started
+    return result
+
+
+def process_files(paths: Sequence[Path], output_dir: Path, workers: int = 1) -> Tuple[Dict[str, int], List[FileResult]]:
+    """Convert ``paths`` into the CSV outputs, in file order whatever ``workers`` is."""
+    results: List[FileResult] = []
+    with CsvOutputs(output_dir) as outputs:
+        if workers <= 1:
+            results = [process_file(path, outputs) for path in paths]
+        else:
+            for _, result in map_chapters(process_file, paths, workers):
+                for name, row in result.rows:
+                    outputs.write(name, row)
+                result.rows = []
+                results.append(result)
+    return outputs.counts, results
 
 
 def _iter_pairings(
@@ -256,7 +315,7 @@ def _iter_pairings(
         }
 
 
-def write_report(counts: Dict[str, int], warnings: Sequence[str]) -> None:
+def write_report(counts: Dict[str, int], warnings: Sequence[str], results: Sequence[FileResult] = ()) -> None:
     ensure_output_dir(OUTPUT_DIR)
     report_path = OUTPUT_DIR / "report.txt"
     with report_path.open("w", encoding="utf-8") as f:
@@ -270,31 +329,57 @@ def write_report(counts: Dict[str, int], warnings: Sequence[str]) -> None:
                 f.write(f"- {warn}\n")
         else:
             f.write("None\n")
+        if results:
+            f.write("\nPer-file timings:\n")
+            for result in results:
+                f.write(f"- {result.path.name}: {result.records} records in {result.seconds * 1000:.1f} ms\n")
+
+
+def write_diagnostics(results: Sequence[FileResult]) -> Path:
+    diagnostics = [diagnostic for result in results for diagnostic in result.diagnostics]
+    codes: Dict[str, int] = defaultdict(int)
+    for diagnostic in diagnostics:
+        codes[diagnostic["code"]] += 1
+    payload = {
+        "records": sum(result.records for result in results),
+        "files": len(results),
+        "problems": len(diagnostics),
+        "by_code": dict(sorted(codes.items())),
+        "diagnostics": diagnostics,
+    }
+    path = OUTPUT_DIR / "diagnostics.json"
+    write_json_atomic(path, payload)
+    return path
 
 
 def main() -> None:
-    input_path = INPUT_DIR
-    if len(sys.argv) > 1:
-        input_path = Path(sys.argv[1])
+    parser = argparse.ArgumentParser(description="Convert Flavor Matrix JSON exports into CSVs.")
+    parser.add_argument("input", nargs="?", type=Path, default=INPUT_DIR, help="JSON file or directory of exports")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Parse and validate files in N worker processes (default: 1, serial)",
+    )
+    args = parser.parse_args()
+    input_path = args.input
 
     try:
-        records = load_records(input_path)
+        counts, results = process_files(input_files(input_path), OUTPUT_DIR, args.workers)
     except Exception as exc:  # pylint: disable=broad-except
         print(f"[ERROR] Failed to load records: {exc}", file=sys.stderr)
         sys.exit(1)
 
-    if not records:
+    processed = sum(result.records for result in results)
+    if not processed:
         print(f"[WARN] No JSON records found in {input_path}", file=sys.stderr)
         sys.exit(0)
 
-    warnings: List[str] = []
-    for record in records:
-        warnings.extend(validate_record(record))
-
-    counts = build_outputs(records)
-    write_report(counts, warnings)
+    warnings = [warning for result in results for warning in result.warnings]
+    write_report(counts, warnings, results)
+    write_diagnostics(results)
 
-    print(f"Processed {len(records)} ingredient entries from {input_path}")
+    print(f"Processed {processed} ingredient entries from {input_path}")
     if warnings:
         print(f"Warnings were recorded. See {OUTPUT_DIR / 'report.txt'} for details.")
     else:
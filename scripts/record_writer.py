@@ -0,0 +1,100 @@
+"""Buffered, atomic JSON output shared by the book parsers."""
+
+from __future__ import annotations
+
+import json
+import os
+import stat
+import tempfile
+from pathlib import Path
+from typing import Dict, List, Optional, Set
+
+# Read once at import: os.umask() can only be queried by setting it.
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
+
+def output_mode(path: Path) -> int:
+    """Permissions for a file replacing ``path``: its current mode, else what open() would give."""
+    try:
+        return stat.S_IMODE(path.stat().st_mode)
+    except FileNotFoundError:
+        return 0o666 & ~_UMASK
+
+
+def write_bytes_atomic(path: Path, payload: bytes) -> None:
+    """Write ``payload`` to a temp file next to ``path`` and rename it into place."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_name = tempfile.mkstemp(prefix=f".{path.name}.", suffix=".tmp", dir=path.parent)
+    try:
+        # mkstemp creates the file 0600; served outputs must stay readable.
+        os.fchmod(fd, output_mode(path))
+        with os.fdopen(fd, "wb") as handle:
+            handle.write(payload)
+        os.replace(tmp_name, path)
+    except BaseException:
+        Path(tmp_name).unlink(missing_ok=True)
+        raise
+
+
+def write_json_atomic(path: Path, payload: object) -> None:
+    """Serialize ``payload`` the way the processed datasets are stored and write it atomically."""
+    write_bytes_atomic(path, json.dumps(payload, indent=2, ensure_ascii=False).encode("utf-8"))
+
+
+class RecordWriter:
+    """Collect parsed records in memory and write the dataset once.
+
+    Existing records are loaded a single time so reruns stay idempotent via an
+    in-memory slug index. ``checkpoint_every`` flushes the full dataset after
+    that many new records (0 means only when the writer is closed). When the
+    ``with`` block raises, nothing further is written: the file keeps its
+    previous contents, or the last checkpoint.
+    """
+
+    def __init__(self, path: Path, rebuild: bool = False, checkpoint_every: int = 0) -> None:
+        self.path = path
+        self.checkpoint_every = max(checkpoint_every, 0)
+        self.records: List[Dict[str, object]] = []
+        self.slugs: Set[str] = set()
+        self._pending = 0
+        self._dirty = rebuild
+        if not rebuild and path.exists():
+            for record in json.loads(path.read_text(encoding="utf-8")):
+                self.records.append(record)
+                self.slugs.add(record.get("slug"))
+
+    def __contains__(self, slug: object) -> bool:
+        return slug in self.slugs
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def add(self, record: Dict[str, object]) -> bool:
+        slug = record["slug"]
+        if slug in self.slugs:
+            return False
+        self.records.append(record)
+        self.slugs.add(slug)
+        self._pending += 1
+        self._dirty = True
+        if self.checkpoint_every and self._pending >= self.checkpoint_every:
+            self.flush()
+        return True
+
+    def flush(self) -> None:
+        if not self._dirty:
+            return
+        write_json_atomic(self.path, self.records)
+        self._pending = 0
+        self._dirty = False
+
+    def close(self) -> None:
+        self.flush()
+
+    def __enter__(self) -> "RecordWriter":
+        return self
+
+    def __exit__(self, exc_type: Optional[type], exc: Optional[BaseException], tb: object) -> None:
+        if exc_type is None:
+            self.close()
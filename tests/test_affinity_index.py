@@ -0,0 +1,54 @@
+"""Affinity set index: merging of repeated sets and the bitset queries."""
+
+from itertools import combinations
+
+import pytest
+
+from affinity_index import AffinityIndex
+
+
+def affinities(*sets):
+    return {"ingredient": "x", "flavor_affinities": [{"items": list(items)} for items in sets]}
+
+
+@pytest.fixture
+def index():
+    index = AffinityIndex()
+    anchovies = ("anchovies", "lemon", "olive oil", "rosemary")
+    garlic = ("lemon", "olive oil", "garlic")
+    index.add_records([affinities(anchovies, garlic, garlic), affinities(garlic, ("lemon", "thyme"))], "flavor-bible")
+    index.add_records([affinities(("rosemary", "olive oil", "lemon", "anchovies"), ("mint", "mint"))], "vegetarian-flavor-bible")
+    return index
+
+
+def test_repeated_sets_are_merged_with_count_and_sources(index):
+    assert len(index) == 3
+    first, second, third = (index.affinity_set(set_id) for set_id in range(3))
+    assert first.items == ("anchovies", "lemon", "olive oil", "rosemary")
+    assert (first.occurrences, first.sources) == (2, ["flavor-bible", "vegetarian-flavor-bible"])
+    assert (second.occurrences, second.sources) == (3, ["flavor-bible"])
+    assert third.items == ("lemon", "thyme")
+    assert index.add_set(["mint", "mint", ""], "flavor-bible") is None
+
+
+def test_containing_matches_a_scan_of_every_set(index):
+    for size in (1, 2, 3):
+        for names in combinations(sorted(index.names), size):
+            expected = [set_id for set_id, members in enumerate(index.sets) if set(names) <= {index.names[m] for m in members}]
+            assert [item.items for item in index.containing(names)] == [index.affinity_set(s).items for s in expected]
+            assert index.count_containing(names) == len(expected)
+    assert index.containing([]) == []
+    assert index.containing(["lemon", "saffron"]) == []
+
+
+def test_complete_ranks_by_support_then_distinct_sets_then_name(index):
+    assert index.complete(["lemon", "olive oil"]) == [("garlic", 3, 1), ("anchovies", 2, 1), ("rosemary", 2, 1)]
+    assert [item.ingredient for item in index.complete(["lemon"], limit=2)] == ["olive oil", "garlic"]
+    assert index.complete(["saffron"]) == []
+
+
+def test_pairs_and_co_occurrence(index):
+    assert index.co_occurrence("lemon", "olive oil") == 2
+    assert index.co_occurrence("thyme", "garlic") == 0
+    assert list(index.iter_pairs(["thyme"])) == [("lemon", "thyme", 2)]
+    assert len(list(index.iter_pairs())) == 6 + 3 + 1
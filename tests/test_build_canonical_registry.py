@@ -0,0 +1,28 @@
+"""Near-duplicate ranking of canonical names."""
+
+from build_canonical_registry import find_near_duplicates, near_duplicate_score
+
+
+def test_near_duplicates_keep_reordered_names_and_drop_loose_matches():
+    names = [
+        "portobello mushrooms",
+        "mushrooms - portobello",
+        "quince",
+        "quinces",
+        "chile peppers",
+        "white pepper",
+        "pumpkin seeds",
+        "pumpkin seed oil",
+        "celery",
+        "celery root",
+    ]
+    pairs = [item["names"] for item in find_near_duplicates(names)]
+    assert pairs == [["mushrooms - portobello", "portobello mushrooms"], ["quince", "quinces"]]
+
+
+def test_plural_spelling_and_class_noun_variants_are_reported():
+    names = ["kale", "greens kale", "chile peppers", "chili pepper", "pineapple", "pineapples", "coffee", "toffee"]
+    pairs = [item["names"] for item in find_near_duplicates(names)]
+    assert pairs == [["chile peppers", "chili pepper"], ["pineapple", "pineapples"], ["greens kale", "kale"]]
+    assert near_duplicate_score("coffee", "toffee") < 0.9
+    assert near_duplicate_score("green cabbage", "cabbage") < 0.9
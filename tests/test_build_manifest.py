@@ -0,0 +1,118 @@
+"""Incremental rebuilds must reuse unchanged chapters and match a full rebuild byte for byte."""
+
+import json
+from pathlib import Path
+
+import parse_vegetarian_flavor_bible as vegetarian
+from build_manifest import incremental_build
+from record_writer import write_json_atomic
+
+FIXTURES = Path(__file__).parent / "fixtures" / "vegetarian"
+
+
+class LineParser:
+    """``slug=value`` per line; records which files were parsed."""
+
+    def __init__(self):
+        self.parsed = []
+
+    def __call__(self, path):
+        self.parsed.append(path.name)
+        records = []
+        for line in path.read_text(encoding="utf-8").splitlines():
+            slug, _, value = line.partition("=")
+            records.append({"slug": slug, "value": value, "file": path.name})
+        return records
+
+
+def full_rebuild(paths, parse_file, output):
+    records, seen = [], set()
+    for path in paths:
+        for record in parse_file(path):
+            if record["slug"] not in seen:
+                seen.add(record["slug"])
+                records.append(record)
+    write_json_atomic(output, records)
+    return output.read_bytes()
+
+
+def chapters(directory, contents):
+    paths = []
+    for name, lines in contents.items():
+        path = directory / name
+        path.write_text("\n".join(lines), encoding="utf-8")
+        paths.append(path)
+    return paths
+
+
+def build(paths, output, parser):
+    parser.parsed.clear()
+    return incremental_build(paths, output, "rules", parser)
+
+
+def assert_matches_full_rebuild(paths, output, tmp_path):
+    assert output.read_bytes() == full_rebuild(paths, LineParser(), tmp_path / "full.json")
+
+
+def test_edited_chapter_is_reparsed_and_the_others_reused(tmp_path):
+    paths = chapters(tmp_path, {"a": ["basil=1"], "b": ["mint=1"], "c": ["sage=1"]})
+    output, parser = tmp_path / "out.json", LineParser()
+    assert build(paths, output, parser).reparsed == ["a", "b", "c"]
+
+    assert build(paths, output, parser).reparsed == []
+    assert parser.parsed == []
+
+    chapters(tmp_path, {"b": ["mint=2"]})
+    assert build(paths, output, parser).reparsed == ["b"]
+    assert parser.parsed == ["b"]
+    assert_matches_full_rebuild(paths, output, tmp_path)
+
+
+def test_deleted_chapter_drops_its_records(tmp_path):
+    paths = chapters(tmp_path, {"a": ["basil=1"], "b": ["mint=b", "thyme=1"], "c": ["sage=1", "mint=c"]})
+    output, parser = tmp_path / "out.json", LineParser()
+    build(paths, output, parser)
+
+    # Only "c" shares a slug with the deleted chapter, so only it is reparsed.
+    remaining = [paths[0], paths[2]]
+    assert build(remaining, output, parser).reparsed == ["c"]
+    records = json.loads(output.read_text(encoding="utf-8"))
+    assert [(record["slug"], record["file"]) for record in records] == [("basil", "a"), ("sage", "c"), ("mint", "c")]
+    assert_matches_full_rebuild(remaining, output, tmp_path)
+
+
+def test_slug_moving_between_chapters_is_not_duplicated(tmp_path):
+    paths = chapters(tmp_path, {"a": ["basil=1", "mint=a"], "b": ["mint=b", "sage=1"]})
+    output, parser = tmp_path / "out.json", LineParser()
+    build(paths, output, parser)
+
+    # "a" drops mint: the copy "b" always had (shadowed until now) takes over
+    # even though "b" itself did not change.
+    chapters(tmp_path, {"a": ["basil=1"]})
+    result = build(paths, output, parser)
+    assert result.reparsed == ["a", "b"]
+    records = json.loads(output.read_text(encoding="utf-8"))
+    assert [(record["slug"], record["value"]) for record in records] == [("basil", "1"), ("mint", "b"), ("sage", "1")]
+    assert_matches_full_rebuild(paths, output, tmp_path)
+
+    # And back: "a" claims mint again, "b" keeps only sage in the output.
+    chapters(tmp_path, {"a": ["basil=1", "mint=a2"]})
+    build(paths, output, parser)
+    slugs = [record["slug"] for record in json.loads(output.read_text(encoding="utf-8"))]
+    assert slugs == ["basil", "mint", "sage"]
+    assert_matches_full_rebuild(paths, output, tmp_path)
+
+
+def test_vegetarian_parser_incremental_output_matches_full_rebuild(tmp_path):
+    source = (FIXTURES / "chapter003a.xhtml").read_text(encoding="utf-8")
+    first, second = tmp_path / "chapter003a.xhtml", tmp_path / "chapter003b.xhtml"
+    first.write_text(source, encoding="utf-8")
+    second.write_text(source, encoding="utf-8")
+    paths = [first, second]
+    output = tmp_path / "vegetarian.json"
+    incremental_build(paths, output, "rules", vegetarian.parse_chapter)
+
+    first.write_text(source.replace("</body>", "<!-- edited --></body>"), encoding="utf-8")
+    result = incremental_build(paths, output, "rules", vegetarian.parse_chapter)
+    assert result.reparsed == ["chapter003a.xhtml", "chapter003b.xhtml"]
+    assert output.read_bytes() == full_rebuild(paths, vegetarian.parse_chapter, tmp_path / "full.json")
@@ -0,0 +1,68 @@
+"""Dangling-reference counts and the --max-dangling gate on a tiny book."""
+
+import json
+import sys
+
+import pytest
+
+import check_pairing_integrity
+from build_canonical_registry import normalized_key
+from check_pairing_integrity import check_integrity
+from ingredient_resolver import IngredientResolver
+
+
+def entry(canonical, aliases=()):
+    return {
+        "canonical": canonical,
+        "display_names": [canonical.upper()],
+        "aliases": list(aliases),
+        "normalized_key": normalized_key(canonical),
+    }
+
+
+REGISTRY = [entry("basil"), entry("tomatoes"), entry("garlic"), entry("scallions", ["green onions"])]
+RECORDS = [
+    {
+        "ingredient": "basil",
+        "pairings": [{"ingredient": "tomatoes"}, {"ingredient": "green onions"}, {"ingredient": "zucchini blossoms"}],
+        "flavor_affinities": [{"items": ["basil", "garlic", "pine nuts"]}],
+        "avoid": ["cilantro"],
+        "metadata": {"possible_substitutes": ["zucchini blossoms", "garlic"]},
+    }
+]
+
+
+@pytest.fixture
+def book(tmp_path):
+    path = tmp_path / "book.json"
+    path.write_text(json.dumps(RECORDS), encoding="utf-8")
+    return [("flavor-bible", path)]
+
+
+def test_dangling_references_are_counted_per_kind(book):
+    report = check_integrity(IngredientResolver(REGISTRY), book)
+    assert (report["references"], report["dangling"], report["distinct_dangling"]) == (9, 4, 3)
+    assert report["dangling_ratio"] == round(4 / 9, 4)
+    assert report["by_kind"] == {
+        "pairing": {"references": 3, "dangling": 1},
+        "affinity": {"references": 3, "dangling": 1},
+        "avoid": {"references": 1, "dangling": 1},
+        "substitute": {"references": 2, "dangling": 1},
+    }
+    first = report["top_offenders"][0]
+    assert (first["target"], first["mentions"], first["kinds"]) == ("zucchini blossoms", 2, {"pairing": 1, "substitute": 1})
+
+
+@pytest.mark.parametrize("limit, fails", [("0.5", False), ("0.44", True)])
+def test_max_dangling_gates_the_exit_status(book, tmp_path, monkeypatch, limit, fails):
+    output = tmp_path / "report.json"
+    monkeypatch.setattr(check_pairing_integrity, "SOURCE_FILES", book)
+    monkeypatch.setattr(IngredientResolver, "load", classmethod(lambda cls: cls(REGISTRY)))
+    monkeypatch.setattr(sys, "argv", ["check_pairing_integrity.py", "--output", str(output), "--max-dangling", limit])
+    if fails:
+        with pytest.raises(SystemExit) as raised:
+            check_pairing_integrity.main()
+        assert raised.value.code == 1
+    else:
+        check_pairing_integrity.main()
+    assert json.loads(output.read_text(encoding="utf-8"))["dangling"] == 4
@@ -0,0 +1,71 @@
+"""The offline import check must reject the files neo4j-admin would reject."""
+
+import csv
+import gzip
+import shutil
+from pathlib import Path
+
+import pytest
+
+from export_to_neo4j import NODE_FILES, RELATIONSHIP_FILES, export, iter_csv_gz, validate_import
+
+BOOK = Path(__file__).parent / "fixtures" / "vegetarian" / "expected.json"
+INGREDIENTS = NODE_FILES["Ingredient"][0]
+PAIRS_WITH = RELATIONSHIP_FILES["PAIRS_WITH"][0]
+
+
+@pytest.fixture(scope="module")
+def clean_export(tmp_path_factory):
+    output = tmp_path_factory.mktemp("neo4j-import")
+    export(output, [], [("vegetarian-flavor-bible", BOOK)])
+    return output
+
+
+@pytest.fixture
+def export_dir(clean_export, tmp_path):
+    output = tmp_path / "import"
+    shutil.copytree(clean_export, output)
+    return output
+
+
+def rewrite(path, edit):
+    rows = list(iter_csv_gz(path))
+    edit(rows)
+    with gzip.open(path, "wt", encoding="utf-8", newline="") as handle:
+        csv.writer(handle).writerows(rows)
+
+
+def test_clean_export_passes(export_dir):
+    assert validate_import(export_dir) == []
+
+
+def test_dangling_end_id_is_rejected(export_dir):
+    rewrite(export_dir / PAIRS_WITH, lambda rows: rows.append([rows[1][0], "999999999", *rows[1][2:]]))
+    errors = validate_import(export_dir)
+    assert len(errors) == 1
+    assert f"{PAIRS_WITH}:" in errors[0] and ":END_ID 999999999 not found in Ingredient" in errors[0]
+
+
+def test_duplicate_id_is_rejected(export_dir):
+    rewrite(export_dir / INGREDIENTS, lambda rows: rows.append(list(rows[1])))
+    rows = list(iter_csv_gz(export_dir / INGREDIENTS))
+    assert validate_import(export_dir) == [f"{INGREDIENTS}:{len(rows)}: duplicate ID {rows[1][0]}"]
+
+
+def test_header_mismatch_is_rejected(export_dir):
+    def rename(rows):
+        rows[0][1] = "slug:integer"
+
+    rewrite(export_dir / INGREDIENTS, rename)
+    errors = validate_import(export_dir)
+    assert any("does not match" in error for error in errors)
+    assert any("unknown column type in 'slug:integer'" in error for error in errors)
+
+
+def test_column_count_mismatch_is_rejected(export_dir):
+    def truncate(rows):
+        rows[2] = rows[2][:-1]
+
+    rewrite(export_dir / PAIRS_WITH, truncate)
+    errors = validate_import(export_dir)
+    assert errors == [f"{PAIRS_WITH}:3: 4 fields, header has 5"]
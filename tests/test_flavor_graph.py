@@ -0,0 +1,80 @@
+"""CSR pairing graph: ranking, reverse lookups and source merging."""
+
+import json
+from pathlib import Path
+
+import pytest
+
+from flavor_graph import MATRIX_SOURCE, TIER_WEIGHTS, FlavorGraph
+
+BOOK = Path(__file__).parent / "fixtures" / "vegetarian" / "expected.json"
+
+
+def pairing(name, tier="recommended"):
+    return {"ingredient": name, "tier": tier}
+
+
+@pytest.fixture
+def graph(tmp_path):
+    first = tmp_path / "first.json"
+    first.write_text(
+        json.dumps(
+            [
+                {"ingredient": "basil", "pairings": [pairing("tomatoes", "classic"), pairing("garlic"), pairing("mint")]},
+                {"ingredient": "tomatoes", "pairings": [pairing("basil", "frequent")]},
+            ]
+        ),
+        encoding="utf-8",
+    )
+    second = tmp_path / "second.json"
+    second.write_text(
+        json.dumps([{"ingredient": "basil", "pairings": [pairing("garlic"), pairing("tomatoes", "recommended")]}]),
+        encoding="utf-8",
+    )
+    matrix_dir = tmp_path / "matrix"
+    matrix_dir.mkdir()
+    # Concatenated arrays, as in the real exports.
+    (matrix_dir / "page.json").write_text(
+        '[{"ingredient": "Basil", "best_pairings": [], "surprise_pairings": ["Lemon"]}]\n'
+        '[{"ingredient": "Lemon", "best_pairings": ["Basil"]}]\n',
+        encoding="utf-8",
+    )
+    return FlavorGraph.load([("flavor-bible", first), ("vegetarian-flavor-bible", second)], matrix_dir)
+
+
+def test_edges_keep_the_strongest_tier_and_every_source(graph):
+    tomatoes = graph.edge("basil", "tomatoes")
+    assert tomatoes.weight == TIER_WEIGHTS["classic"]
+    assert tomatoes.sources == ["flavor-bible", "vegetarian-flavor-bible"]
+    assert graph.edge("basil", "lemon").sources == [MATRIX_SOURCE]
+    assert graph.edge("garlic", "basil") is None
+
+
+def test_top_pairings_rank_by_tier_then_source_count_then_name(graph):
+    assert [item.ingredient for item in graph.top_pairings("Basil", None)] == ["tomatoes", "garlic", "lemon", "mint"]
+    assert [item.ingredient for item in graph.top_pairings("basil", 2)] == ["tomatoes", "garlic"]
+    assert graph.top_pairings("saffron") == []
+
+
+def test_reverse_and_mutual_lookups(graph):
+    assert [item.ingredient for item in graph.paired_by("basil")] == ["lemon", "tomatoes"]
+    assert graph.in_degree("basil") == 2 and graph.out_degree("basil") == 4
+    assert graph.is_mutual("basil", "tomatoes") and graph.is_mutual("lemon", "basil")
+    assert not graph.is_mutual("basil", "garlic")
+    assert [item.ingredient for item in graph.mutual_pairings("basil")] == ["tomatoes", "lemon"]
+
+
+def test_csr_rows_match_the_records():
+    records = json.loads(BOOK.read_text(encoding="utf-8"))
+    graph = FlavorGraph.load([("vegetarian-flavor-bible", BOOK)], None)
+    for record in records:
+        expected = {}
+        for item in record.get("pairings") or []:
+            if item["ingredient"] and item["ingredient"] != record["ingredient"]:
+                weight = TIER_WEIGHTS.get(item.get("tier"), TIER_WEIGHTS["recommended"])
+                expected[item["ingredient"]] = max(expected.get(item["ingredient"], 0), weight)
+        ranked = graph.top_pairings(record["ingredient"], None)
+        assert {item.ingredient: item.weight for item in ranked} == expected
+        assert [item.weight for item in ranked] == sorted((item.weight for item in ranked), reverse=True)
+        for item in ranked:
+            assert record["ingredient"] in {other.ingredient for other in graph.paired_by(item.ingredient)}
@@ -0,0 +1,45 @@
+"""Exact, alias and fuzzy resolution against a small hand-written registry."""
+
+from build_canonical_registry import normalized_key
+from ingredient_resolver import IngredientResolver
+
+
+def entry(canonical, display_name, aliases=()):
+    return {
+        "canonical": canonical,
+        "display_names": [display_name],
+        "aliases": list(aliases),
+        "normalized_key": normalized_key(canonical),
+    }
+
+
+REGISTRY = [
+    entry("walnuts", "WALNUTS"),
+    entry("nut oil", "OIL, NUT (see OIL, ALMOND; OIL, WALNUT)", ["almond", "oil", "see oil", "walnut"]),
+    entry("butter lettuce", "LETTUCE, BUTTER (aka BIBB LETTUCE)", ["bibb lettuce", "butter", "lettuce"]),
+    entry("chile peppers", "CHILE PEPPERS"),
+    entry("scallions", "SCALLIONS (aka GREEN ONIONS)", ["green onions"]),
+]
+
+
+def test_own_normalized_key_beats_cross_reference_alias():
+    resolver = IngredientResolver(REGISTRY)
+    assert resolver.resolve("walnut").canonical == "walnuts"
+    assert resolver.resolve("almond").canonical is None
+    assert "oil" not in resolver.aliases
+
+
+def test_aka_aliases_resolve_but_heading_fragments_do_not():
+    resolver = IngredientResolver(REGISTRY)
+    assert resolver.resolve("Green Onions").canonical == "scallions"
+    assert resolver.resolve("bibb lettuce").canonical == "butter lettuce"
+    assert resolver.resolve("lettuce").canonical is None
+
+
+def test_fuzzy_results_do_not_leak_into_exact_lookups():
+    resolver = IngredientResolver(REGISTRY)
+    fuzzy = resolver.resolve("chilli peppers", fuzzy=True, threshold=0.5)
+    assert (fuzzy.canonical, fuzzy.method) == ("chile peppers", "fuzzy")
+    assert resolver.resolve("chilli peppers").canonical is None
+    assert resolver.resolve("chilli peppers", fuzzy=True, threshold=0.99).canonical is None
+    assert resolver.resolve("chilli peppers", fuzzy=True, threshold=0.5) == fuzzy
@@ -0,0 +1,85 @@
+"""Streaming record reader: the entries must not depend on chunk boundaries."""
+
+import io
+import json
+from pathlib import Path
+
+import pytest
+
+from json_stream import iter_stream_records
+from process_flavor_matrix import process_file
+
+CHUNK_SIZES = [1, 2, 3, 5, 7, 64, 1 << 16]
+ENVELOPE = Path(__file__).resolve().parents[1] / "docs" / "flavor-matrix-processed" / "flavor_matrix_fixed.json"
+
+DOCUMENT = """
+[{"ingredient": "a", "matrix_nodes": [{"ingredient": "inner", "label": "x"}], "summary": "s"}]
+{"entries": [[{"ingredient": "b"}], [{"Green Bean": {"ingredient": "c"}, "Kiwi": {"ingredient": "d"}}]]}
+[{"ingrediant": "typo", "summary": "s"}, 7, {}]
+"""
+
+EXPECTED = [
+    {"ingredient": "a", "matrix_nodes": [{"ingredient": "inner", "label": "x"}], "summary": "s"},
+    {"ingredient": "b"},
+    {"ingredient": "c"},
+    {"ingredient": "d"},
+    {"ingrediant": "typo", "summary": "s"},
+    7,
+    {},
+]
+
+
+@pytest.mark.parametrize("chunk_size", CHUNK_SIZES)
+def test_entries_are_the_same_for_every_chunk_size(chunk_size):
+    assert list(iter_stream_records(io.StringIO(DOCUMENT), chunk_size=chunk_size)) == EXPECTED
+
+
+class CountingReader(io.StringIO):
+    def __init__(self, text):
+        super().__init__(text)
+        self.consumed = 0
+
+    def read(self, size=-1):
+        chunk = super().read(size)
+        self.consumed += len(chunk)
+        return chunk
+
+
+def test_envelope_entries_stream_before_the_envelope_closes():
+    text = ENVELOPE.read_text(encoding="utf-8")
+    assert list(json.loads(text)) == ["entries"]
+    reader = CountingReader(text)
+    records = iter_stream_records(reader, chunk_size=4096)
+    first = next(records)
+    assert first["ingredient"] and reader.consumed <= 2 * 4096 < len(text)
+    rest = list(records)
+    assert reader.consumed == len(text)
+    assert len(rest) + 1 == sum(len(page) for page in json.loads(text)["entries"])
+
+
+@pytest.mark.parametrize("chunk_size", [1, 3, 1 << 16])
+@pytest.mark.parametrize(
+    "text",
+    [
+        '[{"ingredient": "a"} {"ingredient": "b" "q": 1}]',
+        '[{"ingredient": "a", "q" 1}]',
+        '[{"ingredient": "a",}]',
+        '[1 2]',
+        '[, 1]',
+    ],
+)
+def test_missing_or_stray_separators_are_errors(text, chunk_size):
+    with pytest.raises(json.JSONDecodeError):
+        list(iter_stream_records(io.StringIO(text), chunk_size=chunk_size))
+
+
+def test_misspelt_record_is_reported_and_non_object_entry_is_rejected(tmp_path):
+    path = tmp_path / "page.json"
+    path.write_text('[{"ingrediant": "basil", "summary": "s"}]', encoding="utf-8")
+    result = process_file(path)
+    assert result.records == 1
+    assert "missing fields" in result.warnings[0] and "'ingredient'" in result.warnings[0]
+
+    path.write_text('[{"ingredient": "basil"}, "thyme"]', encoding="utf-8")
+    with pytest.raises(ValueError, match="Entry 1"):
+        process_file(path)
@@ -0,0 +1,57 @@
+"""Exercise the batched loader against `RecordingDriver` instead of a live Neo4j."""
+
+import math
+from collections import Counter
+from pathlib import Path
+
+import pytest
+
+from export_to_neo4j import NODE_FILES, RELATIONSHIP_FILES, export
+from load_to_neo4j import Loader, RecordingDriver, constraint_query
+
+BOOK = Path(__file__).parent / "fixtures" / "vegetarian" / "expected.json"
+BATCH_SIZE = 3
+
+
+@pytest.fixture(scope="module")
+def export_dir(tmp_path_factory):
+    output = tmp_path_factory.mktemp("neo4j-import")
+    counts = export(output, [], [("vegetarian-flavor-bible", BOOK)])
+    return output, counts
+
+
+def run(export_dir, parallel):
+    output, _ = export_dir
+    driver = RecordingDriver()
+    loader = Loader(driver, output, BATCH_SIZE)
+    loader.create_constraints()
+    results = loader.load_nodes() + loader.load_relationships(parallel=parallel)
+    return driver, results
+
+
+def test_batches_cover_every_exported_row(export_dir):
+    _, counts = export_dir
+    driver, results = run(export_dir, parallel=True)
+
+    assert [query for query, _ in driver.transactions[: len(NODE_FILES)]] == [
+        constraint_query(label) for label in NODE_FILES
+    ]
+    by_stage = {result.name: result for result in results}
+    assert set(by_stage) == set(NODE_FILES) | set(RELATIONSHIP_FILES)
+    for name, result in by_stage.items():
+        assert result.rows == counts[name]
+        assert result.batches == math.ceil(counts[name] / BATCH_SIZE)
+    assert counts["PAIRS_WITH"] > BATCH_SIZE
+    assert all(0 < rows <= BATCH_SIZE for _, rows in driver.transactions[len(NODE_FILES) :])
+
+
+def test_nodes_are_merged_before_relationships(export_dir):
+    driver, _ = run(export_dir, parallel=True)
+    kinds = ["MATCH (a:" in query for query, _ in driver.transactions[len(NODE_FILES) :]]
+    assert kinds == sorted(kinds)
+
+
+def test_parallel_and_serial_send_the_same_transactions(export_dir):
+    parallel, _ = run(export_dir, parallel=True)
+    serial, _ = run(export_dir, parallel=False)
+    assert Counter(parallel.transactions) == Counter(serial.transactions)
@@ -0,0 +1,16 @@
+"""Edge consolidation copes with the values the validator only warns about."""
+
+from matrix_edges import EdgeConsolidator
+
+
+def test_non_string_ingredients_are_keyed_by_their_text():
+    edges = EdgeConsolidator()
+    edges.add_node(["basil"], "Green", 2)
+    edges.add_edge(["basil"], "Green", "Tomato", thickness=1)
+    edges.add_node({"name": "mint"}, "Green", 3)
+    edges.add_edge({"name": "mint"}, "Green", "Tomato", thickness=3)
+    edges.add_edge("basil", "green", "tomato")
+
+    (stats,) = edges.edges.values()
+    assert stats.occurrences == 3
+    assert stats.pages == {"['basil']", "{'name': 'mint'}", "basil"}
@@ -0,0 +1,73 @@
+"""Scoring of merged pairings over a hand-written registry and tiny books."""
+
+from build_canonical_registry import normalized_key
+from flavor_graph import MATRIX_SOURCE
+from ingredient_resolver import IngredientResolver
+from pairing_scores import DEFAULT_TIER_WEIGHTS, ScoreTable
+
+
+def entry(canonical, aliases=()):
+    return {
+        "canonical": canonical,
+        "display_names": [canonical.upper()],
+        "aliases": list(aliases),
+        "normalized_key": normalized_key(canonical),
+    }
+
+
+REGISTRY = [entry("basil"), entry("tomatoes"), entry("garlic"), entry("scallions", ["green onions"])]
+
+
+def table():
+    scores = ScoreTable(IngredientResolver(REGISTRY))
+    scores.add_book(
+        [
+            {
+                "ingredient": "basil",
+                "pairings": [
+                    {"ingredient": "Tomatoes", "tier": "classic"},
+                    {"ingredient": "tomatoes", "tier": "recommended"},
+                    {"ingredient": "green onions", "tier": "frequent"},
+                    {"ingredient": "zucchini blossoms"},
+                ],
+            }
+        ],
+        "flavor-bible",
+    )
+    scores.add_book(
+        [{"ingredient": "basil", "pairings": [{"ingredient": "tomatoes", "tier": "ethereal"}]}],
+        "vegetarian-flavor-bible",
+    )
+    scores.add_matrix([{"ingredient": "Basil", "best_pairings": ["Garlic", "Tomato"], "surprise_pairings": []}])
+    return scores
+
+
+def test_each_source_counts_its_strongest_tier_once():
+    scores = table()
+    result = dict(scores.top("basil", scores.score()))
+    # classic (3) beats recommended from the same book; ethereal (4) from the
+    # other book; best_pairings (3) times the matrix weight (0.75).
+    assert result["tomatoes"] == 3.0 + 4.0 + 0.75 * DEFAULT_TIER_WEIGHTS["best_pairings"]
+    assert result["scallions"] == DEFAULT_TIER_WEIGHTS["frequent"]
+    assert result["garlic"] == 0.75 * 3.0
+    assert scores.listings(scores._edges[(scores.ids["basil"], scores.ids["tomatoes"])]) == [
+        ("flavor-bible", "classic"),
+        ("vegetarian-flavor-bible", "ethereal"),
+        (MATRIX_SOURCE, "best_pairings"),
+    ]
+
+
+def test_weights_rescore_without_reloading():
+    scores = table()
+    result = dict(scores.top("basil", scores.score({MATRIX_SOURCE: 0.0}, {"ethereal": 10.0})))
+    assert result["tomatoes"] == 3.0 + 10.0
+    assert "garlic" in result and result["garlic"] == 0.0
+
+
+def test_queries_do_not_change_the_unresolved_counts():
+    scores = table()
+    before = dict(scores.unresolved)
+    assert before == {"zucchini blossoms": 1}
+    scores.top("zucchini blossoms", scores.score())
+    scores.top("unknown herb", scores.score())
+    assert scores.unresolved == before
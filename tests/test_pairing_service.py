@@ -0,0 +1,66 @@
+"""Connection handling of the pairing service, with a stub in place of the loaded indexes."""
+
+import asyncio
+
+from pairing_service import MAX_HEADER_LINES, handle_connection
+
+
+class StubService:
+    def respond(self, target):
+        return 200, b'{"data":[]}', '"stub"'
+
+
+async def exchange(request, token=None):
+    server = await asyncio.start_server(
+        lambda r, w: handle_connection(StubService(), r, w, token), "127.0.0.1", 0
+    )
+    port = server.sockets[0].getsockname()[1]
+    async with server:
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        writer.write(request)
+        await writer.drain()
+        status_line = await asyncio.wait_for(reader.readline(), 5)
+        writer.close()
+    return int(status_line.split()[1])
+
+
+async def responses(request):
+    """Status of every response sent before the server closes the connection."""
+    server = await asyncio.start_server(lambda r, w: handle_connection(StubService(), r, w), "127.0.0.1", 0)
+    port = server.sockets[0].getsockname()[1]
+    async with server:
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        writer.write(request)
+        await writer.drain()
+        data = await asyncio.wait_for(reader.read(), 5)
+        writer.close()
+    return [int(line.split()[1]) for line in data.split(b"\r\n") if line.startswith(b"HTTP/1.1 ")]
+
+
+def status(request, token=None):
+    return asyncio.run(exchange(request.encode("latin-1"), token))
+
+
+def test_malformed_content_length_is_a_bad_request():
+    assert status("GET /pairings/basil HTTP/1.1\r\nContent-Length: abc\r\n\r\n") == 400
+    assert status("GET /pairings/basil HTTP/1.1\r\nContent-Length: -5\r\n\r\n") == 400
+
+
+def test_bearer_token_is_enforced_when_configured():
+    request = "GET /pairings/basil HTTP/1.1\r\nConnection: close\r\n{}\r\n"
+    assert status(request.format(""), token="s3cret") == 401
+    assert status(request.format("Authorization: Bearer wrong\r\n"), token="s3cret") == 401
+    assert status(request.format("Authorization: Bearer s3cret\r\n"), token="s3cret") == 200
+    assert status(request.format(""), token=None) == 200
+    assert status("GET /health HTTP/1.1\r\nConnection: close\r\n\r\n", token="s3cret") == 200
+
+
+def test_oversized_request_line_or_header_line_is_rejected():
+    assert status("GET /" + "a" * (1 << 17) + " HTTP/1.1\r\n\r\n") == 400
+    assert status("GET /pairings/basil HTTP/1.1\r\nX-Big: " + "a" * (1 << 17) + "\r\n\r\n") == 431
+
+
+def test_too_many_header_lines_close_the_connection():
+    headers = "".join(f"X-{index}: {index}\r\n" for index in range(MAX_HEADER_LINES + 5))
+    request = f"GET /pairings/basil HTTP/1.1\r\n{headers}\r\nGET /pairings/mint HTTP/1.1\r\n\r\n"
+    assert asyncio.run(responses(request.encode("latin-1"))) == [431]
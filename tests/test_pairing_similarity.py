@@ -0,0 +1,56 @@
+"""Similarity scores on a hand-built graph, and the sparse rows against brute force."""
+
+import math
+import random
+
+import pytest
+
+from flavor_graph import SOURCE_BITS, GraphBuilder
+from pairing_similarity import METRICS, SimilarityIndex
+
+
+@pytest.fixture
+def index():
+    builder = GraphBuilder()
+    bit = SOURCE_BITS["flavor-bible"]
+    for source, target, weight in [("a", "x", 4), ("a", "y", 1), ("b", "x", 2), ("y", "b", 1), ("c", "x", 1), ("d", "y", 1)]:
+        builder.add_edge(source, target, weight, bit)
+    return SimilarityIndex(builder.build())
+
+
+def test_cosine_and_jaccard_use_both_edge_directions(index):
+    assert index.similarity("a", "b") == pytest.approx(9 / math.sqrt(17 * 5))
+    assert index.similarity("a", "b", "jaccard") == 1.0
+    assert index.similarity("a", "c", "jaccard") == 0.5
+    assert index.similarity("a", "x") == 0.0
+    assert index.similarity("a", "saffron") == 0.0
+
+
+def test_similar_filters_by_shared_partners_and_breaks_ties_by_name(index):
+    assert [(item.ingredient, item.shared) for item in index.similar("a")] == [("b", 2)]
+    ranked = index.similar("a", metric="jaccard", min_shared=1)
+    assert [(item.ingredient, item.score) for item in ranked] == [("b", 1.0), ("c", 0.5), ("d", 0.5)]
+    assert [item.ingredient for item in index.similar("a", limit=2, min_shared=1)] == ["b", "c"]
+    assert index.similar("saffron") == []
+
+
+@pytest.mark.parametrize("metric", METRICS)
+def test_sparse_rows_match_pairwise_scores(metric):
+    rng = random.Random(7)
+    builder = GraphBuilder()
+    for _ in range(600):
+        builder.add_edge(f"n{rng.randrange(80)}", f"n{rng.randrange(80)}", rng.randint(1, 4), SOURCE_BITS["vegetarian-flavor-bible"])
+    index = SimilarityIndex(builder.build())
+    partners = {name: index.vectors[index.graph.node_id(name)].keys() for name in index.names}
+    checked = 0
+    for name in index.names:
+        expected = sorted(
+            (-index.similarity(name, other, metric), other)
+            for other in index.names
+            if other != name and len(partners[name] & partners[other]) >= 2
+        )[:10]
+        result = index.similar(name, 10, metric)
+        assert [item.ingredient for item in result] == [other for _, other in expected]
+        assert [item.score for item in result] == pytest.approx([-score for score, _ in expected])
+        checked += len(result) == 10
+    assert checked > 40
@@ -0,0 +1,30 @@
+"""The vegetarian parser must keep producing the records the original tree walk did.
+
+`fixtures/vegetarian/expected.json` was generated by the baseline
+`iter_entries()` (every descendant buffered) over `chapter003a.xhtml`.
+"""
+
+import json
+from pathlib import Path
+
+import pytest
+
+import parse_vegetarian_flavor_bible as parser
+
+FIXTURES = Path(__file__).parent / "fixtures" / "vegetarian"
+
+
+@pytest.mark.parametrize("stream", [False, True], ids=["tree", "stream"])
+def test_records_match_golden(stream):
+    expected = json.loads((FIXTURES / "expected.json").read_text(encoding="utf-8"))
+    entries = parser.iter_chapter_entries(FIXTURES / "chapter003a.xhtml", stream)
+    records = [record for record in map(parser.parse_entry, entries) if record is not None]
+    assert records == expected
+
+
+@pytest.mark.parametrize("stream", [False, True], ids=["tree", "stream"])
+def test_malformed_file_is_skipped_whole(tmp_path, stream):
+    source = (FIXTURES / "chapter003a.xhtml").read_text(encoding="utf-8")
+    broken = tmp_path / "chapter003b.xhtml"
+    broken.write_text(source.replace("</body>", '<p class="ingredient">oops</b></body>'), encoding="utf-8")
+    assert list(parser.iter_chapter_entries(broken, stream)) == []
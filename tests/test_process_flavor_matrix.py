@@ -0,0 +1,39 @@
+"""A failed Flavor Matrix run must leave the previous outputs untouched."""
+
+import stat
+
+import pytest
+
+import record_writer
+from matrix_edges import LABELS_FILE, UNIQUE_EDGES_FILE
+from process_flavor_matrix import OUTPUT_FILES, process_files
+
+
+def test_failed_run_keeps_previous_outputs(tmp_path):
+    output_dir = tmp_path / "out"
+    output_dir.mkdir()
+    names = [filename for filename, _ in OUTPUT_FILES.values()] + [LABELS_FILE, UNIQUE_EDGES_FILE]
+    for name in names:
+        (output_dir / name).write_text("previous\n", encoding="utf-8")
+
+    good = tmp_path / "a.json"
+    good.write_text('[{"ingredient": "basil", "best_pairings": ["tomato"]}]', encoding="utf-8")
+    bad = tmp_path / "b.json"
+    bad.write_text('[{"ingredient": "thyme"}, 42]', encoding="utf-8")
+
+    with pytest.raises(ValueError):
+        process_files([good, bad], output_dir)
+
+    assert sorted(path.name for path in output_dir.iterdir()) == sorted(names)
+    for name in names:
+        assert (output_dir / name).read_text(encoding="utf-8") == "previous\n"
+
+
+def test_new_outputs_get_umask_permissions(tmp_path, monkeypatch):
+    monkeypatch.setattr(record_writer, "_UMASK", 0o022)
+    source = tmp_path / "a.json"
+    source.write_text('[{"ingredient": "basil", "best_pairings": ["tomato"]}]', encoding="utf-8")
+    output_dir = tmp_path / "out"
+    process_files([source], output_dir)
+    modes = {path.name: stat.S_IMODE(path.stat().st_mode) for path in output_dir.iterdir()}
+    assert set(modes.values()) == {0o644}, modes
@@ -0,0 +1,45 @@
+"""Atomic dataset writes: permissions and failed runs."""
+
+import json
+import stat
+
+import pytest
+
+import record_writer
+from record_writer import RecordWriter, write_bytes_atomic
+
+
+def mode(path):
+    return stat.S_IMODE(path.stat().st_mode)
+
+
+def test_new_files_get_umask_permissions_and_replacements_keep_theirs(tmp_path, monkeypatch):
+    monkeypatch.setattr(record_writer, "_UMASK", 0o022)
+    path = tmp_path / "page.json"
+    write_bytes_atomic(path, b"{}")
+    assert mode(path) == 0o644
+    path.chmod(0o640)
+    write_bytes_atomic(path, b"[]")
+    assert mode(path) == 0o640
+
+
+def test_error_inside_the_block_keeps_the_previous_dataset(tmp_path):
+    path = tmp_path / "dataset.json"
+    previous = [{"slug": "basil"}, {"slug": "mint"}]
+    path.write_text(json.dumps(previous), encoding="utf-8")
+
+    with pytest.raises(RuntimeError):
+        with RecordWriter(path, rebuild=True) as writer:
+            writer.add({"slug": "thyme"})
+            raise RuntimeError("parser crashed")
+    assert json.loads(path.read_text(encoding="utf-8")) == previous
+
+
+def test_error_after_a_checkpoint_keeps_the_checkpoint(tmp_path):
+    path = tmp_path / "dataset.json"
+    with pytest.raises(KeyboardInterrupt):
+        with RecordWriter(path, rebuild=True, checkpoint_every=2) as writer:
+            for slug in ("a", "b", "c"):
+                writer.add({"slug": slug})
+            raise KeyboardInterrupt
+    assert [record["slug"] for record in json.loads(path.read_text(encoding="utf-8"))] == ["a", "b"]